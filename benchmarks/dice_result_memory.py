@@ -0,0 +1,89 @@
+"""Per-roll memory footprint of DiceResult, before and after the slotted layout.
+
+Run from the repository root: ``python -m benchmarks.dice_result_memory``
+"""
+
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from utils.dice_engines import DiceEngine
+
+RESULTS = 10_000
+
+@dataclass
+class LegacyDiceResult:
+    """The pre-slots DiceResult layout: list of dice plus a details dict."""
+    rolls: List[int]
+    total: int
+    successes: int = 0
+    complications: int = 0
+    botch: bool = False
+    exploded_dice: List[int] = None
+    system: str = 'standard'
+    details: Dict[str, Any] = None
+
+    def __post_init__(self):
+        if self.exploded_dice is None:
+            self.exploded_dice = []
+        if self.details is None:
+            self.details = {}
+
+def legacy_dune(result) -> LegacyDiceResult:
+    rolls = list(result.rolls)
+    return LegacyDiceResult(
+        rolls=rolls,
+        total=result.total,
+        successes=result.successes,
+        complications=result.complications,
+        system='dune',
+        details={
+            'target': result.target,
+            'bonus_dice': result.bonus_dice,
+            'main_rolls': sorted(rolls)[:2],
+            'all_successes': result.all_successes,
+            'all_complications': result.all_complications
+        }
+    )
+
+def legacy_wod(result) -> LegacyDiceResult:
+    return LegacyDiceResult(
+        rolls=list(result.rolls),
+        total=result.total,
+        successes=result.successes,
+        botch=result.botch,
+        system='wod',
+        details={
+            'difficulty': result.difficulty,
+            'ones': result.ones,
+            'raw_successes': result.raw_successes,
+            'specialty': result.specialty
+        }
+    )
+
+def measure(build) -> float:
+    """Bytes retained per result while RESULTS of them are alive."""
+    tracemalloc.start()
+    kept = [build() for _ in range(RESULTS)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / RESULTS
+
+def main():
+    # Pre-roll so only result construction is measured
+    dune = [DiceEngine.dune_2d20_roll(12, 3) for _ in range(RESULTS)]
+    wod = [DiceEngine.world_of_darkness_roll(8, 6) for _ in range(RESULTS)]
+
+    cases = [
+        ('dune 5d20', lambda it=iter(dune): legacy_dune(next(it)), lambda: DiceEngine.dune_2d20_roll(12, 3)),
+        ('wod 8d10', lambda it=iter(wod): legacy_wod(next(it)), lambda: DiceEngine.world_of_darkness_roll(8, 6)),
+    ]
+    print(f"{'roll':<10} {'before B':>9} {'after B':>8} {'saved':>6}")
+    for name, before, after in cases:
+        legacy_bytes = measure(before)
+        slotted_bytes = measure(after)
+        print(f"{name:<10} {legacy_bytes:>9.0f} {slotted_bytes:>8.0f} {1 - slotted_bytes / legacy_bytes:>6.0%}")
+
+if __name__ == '__main__':
+    main()
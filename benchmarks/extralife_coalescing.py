@@ -0,0 +1,100 @@
+"""Cold-cache stampede and hot reads of the Extra-Life cache.
+
+Fires concurrent ``/extralife stats`` lookups at an empty cache, once with
+every caller fetching on its own and once through the scheduler's
+single-flight fetches, and counts the requests reaching a local stub API. Then times hot cache reads
+from memory against re-reading ``extralife_cache.json``. Exits non-zero if
+the coalesced run made more than one request per endpoint.
+
+Run from the repository root: ``python -m benchmarks.extralife_coalescing``
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from benchmarks.extralife_fetch import StubAPI, fetch_all
+from utils.database import EXTRALIFE_CACHE_FILE
+from utils.extralife_api import ExtraLifeClient
+from utils.extralife_scheduler import ExtraLifeScheduler, guild_endpoints
+from utils.http import create_http_session
+from utils.storage_service import StorageService
+
+CALLERS = 50
+ENDPOINTS = guild_endpoints(1, 2)
+LATENCY = 0.2
+HOT_READS = 10_000
+
+async def stampede(stub: StubAPI, session, coalesce: bool) -> tuple:
+    """Requests reaching the API and wall time for CALLERS concurrent lookups."""
+    with tempfile.TemporaryDirectory() as directory:
+        storage = StorageService(directory, database_url=None, commit_interval=0.05)
+        await storage.start()
+        client = ExtraLifeClient(session)
+        scheduler = ExtraLifeScheduler(client, storage, stub.base, rate_limit=1000)
+
+        async def fetch():
+            data = await fetch_all(client, stub.urls())
+            await storage.save_extralife_cache({ENDPOINTS[name]: payload for name, payload in data.items()})
+            return data
+
+        async def stats():
+            # The cog's show_stats: cached data if fresh, else fetch
+            data = await scheduler.cached(ENDPOINTS)
+            if data is None:
+                data = (await scheduler.fetch(ENDPOINTS))[0] if coalesce else await fetch()
+            return data
+
+        before = stub.requests
+        start = time.perf_counter()
+        results = await asyncio.gather(*(stats() for _ in range(CALLERS)))
+        elapsed = time.perf_counter() - start
+        await storage.close()
+    assert all(len(data) == 2 for data in results)
+    return stub.requests - before, elapsed
+
+async def hot_reads(stub: StubAPI, session) -> tuple:
+    """Microseconds per fresh-cache read from memory and from the file."""
+    with tempfile.TemporaryDirectory() as directory:
+        storage = StorageService(directory, database_url=None)
+        await storage.start()
+        data = await fetch_all(ExtraLifeClient(session), stub.urls())
+        await storage.save_extralife_cache({ENDPOINTS[name]: payload for name, payload in data.items()})
+        await storage.flush()
+
+        start = time.perf_counter()
+        for _ in range(HOT_READS):
+            await storage.load_extralife_cache(list(ENDPOINTS.values()))
+        memory_us = (time.perf_counter() - start) / HOT_READS * 1e6
+
+        start = time.perf_counter()
+        for _ in range(HOT_READS):
+            await storage._run(storage.sync.load_json, EXTRALIFE_CACHE_FILE)
+        file_us = (time.perf_counter() - start) / HOT_READS * 1e6
+        await storage.close()
+    return memory_us, file_us
+
+async def main() -> int:
+    stub = StubAPI()
+    await stub.start()
+    session = create_http_session()
+    try:
+        stub.delays = {'teams': LATENCY, 'participants': LATENCY}
+        print(f"{CALLERS} concurrent lookups on a cold cache, {LATENCY * 1000:.0f} ms API latency\n")
+        print(f"{'':<14} {'API requests':>13} {'ms':>8}")
+        plain, plain_s = await stampede(stub, session, coalesce=False)
+        print(f"{'independent':<14} {plain:>13} {plain_s * 1000:>8.0f}")
+        coalesced, coalesced_s = await stampede(stub, session, coalesce=True)
+        print(f"{'single-flight':<14} {coalesced:>13} {coalesced_s * 1000:>8.0f}")
+
+        stub.delays = {'teams': 0.0, 'participants': 0.0}
+        memory_us, file_us = await hot_reads(stub, session)
+        print(f"\nHot cache read: {memory_us:.1f} us from memory, {file_us:.1f} us re-reading the file")
+    finally:
+        await session.close()
+        await stub.stop()
+    return 0 if coalesced == len(stub.urls()) else 1
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,151 @@
+"""Extra-Life donation feed over a simulated 24-hour marathon.
+
+Serves a growing donation list from a local stub API, newest first and
+paged with ``limit``/``offset`` like DonorDrive, and polls it once per
+simulated minute through ``DonationFeed``. Checks that:
+
+- the first poll only sets the cursor and announces nothing,
+- every later donation is announced exactly once, oldest first,
+- a quiet minute costs one 304 and no body bytes,
+- pages read per poll follow the new donations, not the total so far,
+- the stored cursor stays small all day.
+
+Exits non-zero if a check fails.
+
+Run from the repository root: ``python -m benchmarks.extralife_donations``
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from aiohttp import web
+
+from benchmarks.extralife_fetch import StubAPI
+from utils.extralife_api import ExtraLifeClient
+from utils.extralife_donations import DONATION_BATCH_SIZE, DonationFeed, batches
+from utils.extralife_scheduler import ExtraLifeScheduler, endpoint_key
+from utils.http import create_http_session
+from utils.storage_service import StorageService
+
+MINUTES = 24 * 60
+# Donations already made before the bot's first poll
+HISTORY = 200
+# Minutes with a burst of donations, e.g. a stream milestone
+BURSTS = {360: 60, 720: 90, 1080: 40}
+
+class DonationStubAPI(StubAPI):
+    """``StubAPI`` plus ``/<kind>/<id>/donations``, newest first, with ETags per page."""
+
+    def __init__(self):
+        super().__init__()
+        # Oldest first; served reversed
+        self.donations: List[dict] = []
+        self.app.router.add_get('/api/{kind}/{id}/donations', self.handle_donations)
+
+    def donate(self, when: datetime, amount: float):
+        number = len(self.donations)
+        self.donations.append({
+            'donationID': f"D{number:06d}", 'displayName': f"Donor {number}", 'amount': amount,
+            'message': f"Go team! #{number}", 'createdDateUTC': when.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+        })
+
+    async def handle_donations(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        limit = int(request.query.get('limit', 100))
+        offset = int(request.query.get('offset', 0))
+        newest_first = self.donations[::-1]
+        body = json.dumps(newest_first[offset:offset + limit]).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+async def main() -> int:
+    stub = DonationStubAPI()
+    await stub.start()
+    session = create_http_session()
+    rng = random.Random(24)
+    start_time = datetime(2025, 11, 1, 12, 0, 0)
+    for i in range(HISTORY):
+        stub.donate(start_time - timedelta(minutes=HISTORY - i), 25.0)
+
+    results = []
+    announced: List[str] = []
+    expected: List[str] = []
+    pages_per_poll = []
+    cursor_bytes = []
+    # Pages a poller would read if it fetched the whole list every minute
+    naive_pages = 0
+    quiet_requests = quiet_bytes = quiet_polls = 0
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = StorageService(directory, database_url=None)
+            await storage.start()
+            client = ExtraLifeClient(session)
+            scheduler = ExtraLifeScheduler(client, storage, stub.base, rate_limit=1000)
+            feed = DonationFeed(scheduler, storage)
+            endpoint = endpoint_key('team', 1)
+
+            elapsed = time.perf_counter()
+            for minute in range(MINUTES):
+                now = start_time + timedelta(minutes=minute)
+                new = BURSTS.get(minute, 0)
+                if minute and not new and rng.random() < 0.3:
+                    new = rng.randint(1, 4)
+                for second in sorted(rng.randrange(60) for _ in range(new)):
+                    # Several donations can share a timestamp
+                    stub.donate(now + timedelta(seconds=second), rng.choice([5.0, 10.0, 25.0, 100.0]))
+                if minute and new:
+                    expected.extend(donation['donationID'] for donation in stub.donations[-new:])
+                naive_pages += -(-len(stub.donations) // feed.page_size)
+
+                requests, received, pages = stub.requests, client.bytes_received, feed.pages
+                async for batch in batches(feed.stream(endpoint), DONATION_BATCH_SIZE):
+                    results.append(len(batch) <= DONATION_BATCH_SIZE)
+                    announced.extend(donation['donationID'] for donation in batch)
+                pages_per_poll.append((new, feed.pages - pages))
+                if minute and not new:
+                    quiet_polls += 1
+                    quiet_requests += stub.requests - requests
+                    quiet_bytes += client.bytes_received - received
+                if minute == 0:
+                    results.append(not announced)
+                cursor_bytes.append(len(json.dumps(feed.cursors[endpoint])))
+            elapsed = time.perf_counter() - elapsed
+            await storage.close()
+
+            stored = json.loads(open(f"{directory}/extralife_donations.json").read())
+            results.append(stored[endpoint]['created'] == stub.donations[-1]['createdDateUTC'])
+    finally:
+        await session.close()
+        await stub.stop()
+
+    page_size = feed.page_size
+    bounded = all(pages <= new // page_size + 1 for new, pages in pages_per_poll if new)
+    print(f"{MINUTES} polls over {len(stub.donations) - HISTORY} new donations "
+          f"({HISTORY} before the first poll) in {elapsed:.1f}s\n")
+    print(f"announced:         {len(announced)} of {len(expected)}, "
+          f"{'in order, once each' if announced == expected else 'WRONG'}")
+    print(f"quiet polls:       {quiet_polls}, {quiet_requests} requests, {quiet_bytes} body bytes")
+    print(f"pages read:        {feed.pages} (re-reading the whole list every poll: about {naive_pages:,})")
+    print(f"largest poll:      {max(pages for _, pages in pages_per_poll)} pages "
+          f"for {max(BURSTS.values())} new donations")
+    print(f"cursor size:       {min(cursor_bytes)}-{max(cursor_bytes)} bytes")
+    results.append(announced == expected)
+    results.append(quiet_requests == quiet_polls and quiet_bytes == 0)
+    results.append(bounded)
+    # A timestamp and the few IDs at it, whatever the number of donations
+    results.append(max(cursor_bytes) < 512)
+
+    print("\nOK" if all(results) else f"\nFAIL: {results}")
+    return 0 if all(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
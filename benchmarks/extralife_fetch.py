@@ -0,0 +1,173 @@
+"""Extra-Life fetch latency and timeouts against a local stub API.
+
+Starts an aiohttp server on localhost that serves team and participant JSON
+after an injected delay, then checks that:
+
+- both endpoints are fetched concurrently (about one delay, not two),
+- a hung endpoint is cut off by the per-request timeout and the rest is kept,
+- the total timeout bounds a fetch even when per-request timeouts are long,
+- the shared session reuses keep-alive connections across fetches,
+- polls with cached validators get 304s and count the body bytes saved.
+
+Exits non-zero if a check fails.
+
+Run from the repository root: ``python -m benchmarks.extralife_fetch``
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from typing import Any, Dict
+
+import aiohttp
+from aiohttp import web
+
+from utils.extralife_api import ExtraLifeClient
+from utils.http import create_http_session
+
+LATENCY = 0.3
+HUNG = 30.0
+FETCHES = 50
+# Recent donations make a realistic team payload size
+DONATIONS = 100
+
+class StubAPI:
+    """Serves /teams/<id> and /participants/<id> after ``delays[kind]`` seconds."""
+
+    def __init__(self):
+        self.delays: Dict[str, float] = {'teams': 0.0, 'participants': 0.0}
+        self.connections = set()
+        self.requests = 0
+        self.request_times = []
+        # (kind, id) -> response body
+        self.bodies: Dict[tuple, bytes] = {}
+        self.app = web.Application()
+        self.app.router.add_get('/api/{kind}/{id}', self.handle)
+        self.runner = web.AppRunner(self.app)
+        self.base = ''
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base = f"http://127.0.0.1:{port}/api"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def body(self, kind: str, extralife_id: str) -> bytes:
+        if (kind, extralife_id) not in self.bodies:
+            if kind == 'teams':
+                payload = {
+                    'teamID': int(extralife_id), 'name': f"Stub Team {extralife_id}",
+                    'fundraisingGoal': 1000.0, 'sumDonations': 250.0,
+                    'donations': [{'displayName': f"Donor {i}", 'amount': 10.0 + i} for i in range(DONATIONS)]
+                }
+            else:
+                payload = {'participantID': int(extralife_id), 'displayName': f"Stub Participant {extralife_id}",
+                           'sumDonations': 50.0}
+            self.bodies[(kind, extralife_id)] = json.dumps(payload).encode()
+        return self.bodies[(kind, extralife_id)]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        kind = request.match_info['kind']
+        self.requests += 1
+        self.request_times.append(time.monotonic())
+        self.connections.add(id(request.transport))
+        await asyncio.sleep(self.delays.get(kind, 0.0))
+        body = self.body(kind, request.match_info['id'])
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        headers = {'ETag': etag, 'Last-Modified': "Sat, 01 Nov 2025 12:00:00 GMT"}
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    def urls(self) -> Dict[str, str]:
+        return {'team': f"{self.base}/teams/1", 'participant': f"{self.base}/participants/2"}
+
+async def sequential(session: aiohttp.ClientSession, urls: Dict[str, str]) -> dict:
+    """One request after the other, as the cog used to fetch."""
+    data = {}
+    for name, url in urls.items():
+        async with session.get(url) as response:
+            data[name] = await response.json()
+    return data
+
+async def fetch_all(client: ExtraLifeClient, urls: Dict[str, str]) -> Dict[str, Any]:
+    """Fetch every ``name -> url`` at once, unconditionally; returns JSON bodies by name."""
+    return {name: result.data for name, result in (await client.fetch_many(urls)).items()}
+
+def report(label: str, elapsed: float, data: dict, ok: bool) -> bool:
+    print(f"{label:<40} {elapsed * 1000:>8.0f} ms  {','.join(sorted(data)) or '-':<18} {'OK' if ok else 'FAIL'}")
+    return ok
+
+async def main() -> int:
+    stub = StubAPI()
+    await stub.start()
+    session = create_http_session()
+    results = []
+    try:
+        urls = stub.urls()
+        print(f"Stub API at {stub.base}, injected latency {LATENCY * 1000:.0f} ms\n")
+
+        stub.delays = {'teams': LATENCY, 'participants': LATENCY}
+        start = time.perf_counter()
+        data = await sequential(session, urls)
+        elapsed = time.perf_counter() - start
+        results.append(report("sequential (old)", elapsed, data, len(data) == 2))
+
+        client = ExtraLifeClient(session, request_timeout=2.0, total_timeout=4.0)
+        start = time.perf_counter()
+        data = await fetch_all(client, urls)
+        elapsed = time.perf_counter() - start
+        results.append(report("concurrent", elapsed, data, len(data) == 2 and elapsed < LATENCY * 1.8))
+
+        stub.delays = {'teams': LATENCY, 'participants': HUNG}
+        client = ExtraLifeClient(session, request_timeout=1.0, total_timeout=4.0)
+        start = time.perf_counter()
+        data = await fetch_all(client, urls)
+        elapsed = time.perf_counter() - start
+        results.append(report("participant hung, 1s request timeout", elapsed, data,
+                              set(data) == {'team'} and elapsed < 1.5))
+
+        client = ExtraLifeClient(session, request_timeout=10.0, total_timeout=1.0)
+        start = time.perf_counter()
+        data = await fetch_all(client, urls)
+        elapsed = time.perf_counter() - start
+        results.append(report("participant hung, 1s total timeout", elapsed, data,
+                              set(data) == {'team'} and elapsed < 1.5))
+
+        stub.delays = {'teams': 0.0, 'participants': 0.0}
+        client = ExtraLifeClient(session)
+        before = len(stub.connections)
+        start = time.perf_counter()
+        for _ in range(FETCHES):
+            data = await fetch_all(client, urls)
+        elapsed = time.perf_counter() - start
+        opened = len(stub.connections) - before
+        # Two endpoints fetched at once need at most two connections
+        results.append(report(f"{FETCHES} fetches, {opened} new connections", elapsed, data, opened <= 2))
+
+        client = ExtraLifeClient(session)
+        first = await client.fetch_many(urls)
+        validators = {name: result.validators for name, result in first.items()}
+        start = time.perf_counter()
+        for _ in range(FETCHES):
+            polled = await client.fetch_many(urls, validators)
+        elapsed = time.perf_counter() - start
+        full_size = len(stub.body('teams', '1')) + len(stub.body('participants', '2'))
+        ok = (all(result.not_modified for result in polled.values())
+              and client.bytes_saved == FETCHES * full_size)
+        results.append(report(f"{FETCHES} conditional polls, all 304", elapsed, polled, ok))
+        print(f"\nConditional polls: {client.not_modified} not modified, "
+              f"{client.bytes_received:,} bytes received, {client.bytes_saved:,} bytes saved")
+    finally:
+        await session.close()
+        await stub.stop()
+    return 0 if all(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
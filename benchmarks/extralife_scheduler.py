@@ -0,0 +1,100 @@
+"""Multi-guild Extra-Life polling: API load against guild count.
+
+Subscribes many guilds that share a smaller set of teams and participants,
+polls once through ``ExtraLifeScheduler`` against a local stub API, and
+checks that:
+
+- each unique endpoint is requested once, whatever the number of guilds,
+- requests reaching the server never exceed the global rate limit in any
+  window, although only 10 connections per host are pooled,
+- every guild receives its own team's and participant's data,
+- a second poll is all 304s and edits nothing.
+
+Exits non-zero if a check fails.
+
+Run from the repository root: ``python -m benchmarks.extralife_scheduler``
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from benchmarks.extralife_fetch import StubAPI
+from utils.extralife_api import ExtraLifeClient
+from utils.extralife_scheduler import ExtraLifeScheduler, guild_endpoints
+from utils.http import create_http_session
+from utils.storage_service import StorageService
+
+GUILDS = 500
+TEAMS = 20
+PARTICIPANTS = 40
+RATE_LIMIT = 25
+LATENCY = 0.05
+
+def max_in_window(times, period: float) -> int:
+    """Most requests started within any ``period`` seconds."""
+    most, start = 0, 0
+    for end in range(len(times)):
+        while times[end] - times[start] > period:
+            start += 1
+        most = max(most, end - start + 1)
+    return most
+
+async def main() -> int:
+    stub = StubAPI()
+    await stub.start()
+    stub.delays = {'teams': LATENCY, 'participants': LATENCY}
+    session = create_http_session()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = StorageService(directory, database_url=None)
+            await storage.start()
+            client = ExtraLifeClient(session)
+            scheduler = ExtraLifeScheduler(client, storage, stub.base, rate_limit=RATE_LIMIT)
+            for guild_id in range(GUILDS):
+                scheduler.subscribe(guild_id, guild_endpoints(1000 + guild_id % TEAMS, 5000 + guild_id % PARTICIPANTS))
+            unique = len(scheduler.unique_endpoints)
+            print(f"{GUILDS} guilds, {unique} unique endpoints, limit {RATE_LIMIT} requests/s\n")
+
+            delivered = {}
+
+            async def deliver(guild_id, data, changed):
+                delivered[guild_id] = (data, changed)
+
+            start = time.perf_counter()
+            await scheduler.poll(deliver)
+            elapsed = time.perf_counter() - start
+            peak = max_in_window(sorted(stub.request_times), 1.0)
+            correct = all(
+                data['team']['teamID'] == 1000 + guild_id % TEAMS
+                and data['participant']['participantID'] == 5000 + guild_id % PARTICIPANTS and changed
+                for guild_id, (data, changed) in delivered.items()
+            )
+            print(f"first poll:  {stub.requests} requests in {elapsed:.2f}s, peak {peak} in any second")
+            results.append(stub.requests == unique)
+            results.append(peak <= RATE_LIMIT)
+            results.append(len(delivered) == GUILDS and correct)
+
+            before = stub.requests
+            delivered.clear()
+            start = time.perf_counter()
+            await scheduler.poll(deliver)
+            elapsed = time.perf_counter() - start
+            unchanged = all(not changed for _, changed in delivered.values())
+            print(f"second poll: {stub.requests - before} requests in {elapsed:.2f}s, "
+                  f"{client.not_modified} not modified, {client.bytes_saved:,} bytes saved")
+            results.append(stub.requests - before == unique and unchanged and len(delivered) == GUILDS)
+            # Across both polls too, so the slots released after the first count
+            results.append(max_in_window(sorted(stub.request_times), 1.0) <= RATE_LIMIT)
+            await storage.close()
+    finally:
+        await session.close()
+        await stub.stop()
+
+    print("\nOK" if all(results) else f"\nFAIL: {results}")
+    return 0 if all(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
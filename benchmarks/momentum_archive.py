@@ -0,0 +1,84 @@
+"""Hot-store load time before and after archiving idle momentum pools.
+
+Seeds pools where most channels have been idle for months, archives them and
+compares a cold load of the live store, plus the archive's size on disk and
+how long a fresh process takes to list a guild's pools.
+
+Run from the repository root: ``python -m benchmarks.momentum_archive``
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.codecs import CODECS
+from utils.database import DataManager
+from utils.momentum_archive import MOMENTUM_ARCHIVE_FILE
+from utils.momentum_store import MOMENTUM_POOLS_FILE
+
+POOLS = 100_000
+# One channel in this many is still in use
+ACTIVE_EVERY = 10
+ARCHIVE_DAYS = 30
+# Has pools in no seeded channel, so nothing of it is archived
+UNARCHIVED_GUILD = 42
+
+def seed(directory: str):
+    now = datetime.now()
+    idle = now - timedelta(days=90)
+    pools = {}
+    for i in range(POOLS):
+        guild_id, channel_id = 10**17 + i // 50, 10**18 + i
+        pools[f"{guild_id}_{channel_id}"] = {
+            'guild_id': guild_id, 'channel_id': channel_id, 'momentum': i % 6, 'threat': i % 9,
+            'last_updated': (now if i % ACTIVE_EVERY == 0 else idle).isoformat()
+        }
+    CODECS['json'].save(os.path.join(directory, MOMENTUM_POOLS_FILE), pools)
+
+def cold_load_ms(directory: str) -> float:
+    manager = DataManager(directory, database_url=None)
+    start = time.perf_counter()
+    manager.load_momentum_pools()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        seed(directory)
+        pools_path = os.path.join(directory, MOMENTUM_POOLS_FILE)
+        before_ms, before_size = cold_load_ms(directory), os.path.getsize(pools_path)
+
+        manager = DataManager(directory, database_url=None)
+        start = time.perf_counter()
+        archived = manager.archive_idle_pools(ARCHIVE_DAYS)
+        manager.close()
+        sweep_ms = (time.perf_counter() - start) * 1000
+
+        after_ms, after_size = cold_load_ms(directory), os.path.getsize(pools_path)
+        archive_size = os.path.getsize(os.path.join(directory, MOMENTUM_ARCHIVE_FILE))
+
+        manager = DataManager(directory, database_url=None)
+        start = time.perf_counter()
+        manager.get_momentum_pool(10**17 + 1 // 50, 10**18 + 1)
+        restore_ms = (time.perf_counter() - start) * 1000
+
+        # A guild with no archived pools, then one with some
+        manager = DataManager(directory, database_url=None)
+        start = time.perf_counter()
+        manager.get_all_momentum_pools(UNARCHIVED_GUILD)
+        unarchived_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        manager.get_all_momentum_pools(10**17)
+        archived_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{POOLS:,} pools, {archived:,} idle for over {ARCHIVE_DAYS} days (sweep {sweep_ms:.0f} ms)\n")
+    print(f"{'':<16} {'load ms':>9} {'size KiB':>10}")
+    print(f"{'before':<16} {before_ms:>9.1f} {before_size / 1024:>10.1f}")
+    print(f"{'after':<16} {after_ms:>9.1f} {after_size / 1024:>10.1f}")
+    print(f"{'archive (gzip)':<16} {'':>9} {archive_size / 1024:>10.1f}")
+    print(f"\nFirst read of an archived pool: {restore_ms:.1f} ms (later reads are in memory)")
+    print(f"Listing a guild with nothing archived: {unarchived_ms:.1f} ms, "
+          f"then one with archived pools: {archived_ms:.1f} ms")
+
+if __name__ == '__main__':
+    main()
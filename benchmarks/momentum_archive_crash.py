@@ -0,0 +1,116 @@
+"""Crashes during an archive sweep never lose a momentum pool.
+
+For every storage layout, seeds idle and active pools, then runs
+``archive_idle_pools`` in a child process that dies with ``os._exit`` at
+one step of the sweep: after the archive is saved, partway through the
+store's removals (journal and file layouts), and after the removals. A
+fresh ``DataManager`` must then find every pool, in the store or the
+archive, with its values. A sweep left to finish must archive every idle
+pool.
+
+Exits non-zero if a check fails.
+
+Run from the repository root: ``python -m benchmarks.momentum_archive_crash``
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from utils.database import DataManager
+
+POOLS = 200
+# One channel in this many is still in use
+ACTIVE_EVERY = 4
+ARCHIVE_DAYS = 30
+
+# Steps the child dies after; None lets the sweep finish. 'some removals'
+# needs the store's per-pool removal hook, which shards and SQLite lack.
+CRASH_POINTS = ['archive saved', 'some removals', 'store expired', None]
+ALL_BUT_REMOVALS = [point for point in CRASH_POINTS if point != 'some removals']
+
+# (name, storage_mode, database_url, crash points)
+LAYOUTS = [
+    ('file', 'file', None, CRASH_POINTS),
+    ('journal', 'journal', None, CRASH_POINTS),
+    ('sharded', 'sharded', None, ALL_BUT_REMOVALS),
+    ('sqlite', 'file', 'sqlite:///{directory}/momentum.db', ALL_BUT_REMOVALS),
+]
+
+def open_manager(directory: str, mode: str, url: str) -> DataManager:
+    return DataManager(directory, database_url=url.format(directory=directory) if url else None,
+                       storage_mode=mode)
+
+def expected_pools():
+    now = datetime.now()
+    idle = (now - timedelta(days=90)).isoformat()
+    return {
+        (1000 + i // 20, 5000 + i): {
+            'guild_id': 1000 + i // 20, 'channel_id': 5000 + i, 'momentum': i % 6, 'threat': i % 9,
+            'last_updated': now.isoformat() if i % ACTIVE_EVERY == 0 else idle
+        }
+        for i in range(POOLS)
+    }
+
+def crash_after(obj, name: str, calls: int = 1):
+    """Make ``obj.name`` kill the process once it has returned ``calls`` times."""
+    original = getattr(obj, name)
+    count = [0]
+
+    def wrapper(*args, **kwargs):
+        result = original(*args, **kwargs)
+        count[0] += 1
+        if count[0] >= calls:
+            os._exit(0)
+        return result
+
+    setattr(obj, name, wrapper)
+
+def sweep(directory: str, mode: str, url: str, point):
+    manager = open_manager(directory, mode, url)
+    if point == 'archive saved':
+        crash_after(manager.momentum_archive, 'save')
+    elif point == 'some removals':
+        crash_after(manager.momentum_store, '_removed', calls=POOLS // 4)
+    elif point == 'store expired':
+        crash_after(manager.momentum_store, 'expire')
+    manager.archive_idle_pools(ARCHIVE_DAYS)
+    manager.close()
+    os._exit(0)
+
+def check(name: str, mode: str, url: str, point) -> bool:
+    pools = expected_pools()
+    with tempfile.TemporaryDirectory() as directory:
+        manager = open_manager(directory, mode, url)
+        for pool in pools.values():
+            manager.momentum_store.put(pool)
+        manager.close()
+
+        child = multiprocessing.get_context('fork').Process(target=sweep, args=(directory, mode, url, point))
+        child.start()
+        child.join()
+
+        manager = open_manager(directory, mode, url)
+        found = {key: manager._pool_data(*key) for key in pools}
+        lost = [key for key, pool in found.items() if pool is None]
+        wrong = [key for key, pool in found.items() if pool is not None and pool != pools[key]]
+        archived = sum(manager.momentum_archive.get(*key) is not None for key in pools)
+        in_store = sum(manager.momentum_store.get(*key) is not None for key in pools)
+        manager.close()
+
+    idle = sum(i % ACTIVE_EVERY != 0 for i in range(POOLS))
+    ok = not lost and not wrong and (point is not None or (archived == idle and in_store == POOLS - idle))
+    print(f"{name:<8} {point or 'no crash':<14} {in_store:>6} {archived:>9} {len(lost):>5}  {'OK' if ok else 'FAIL'}")
+    return ok
+
+def main() -> int:
+    print(f"{POOLS} pools, 1 in {ACTIVE_EVERY} active\n")
+    print(f"{'layout':<8} {'crash after':<14} {'store':>6} {'archived':>9} {'lost':>5}")
+    results = [check(name, mode, url, point) for name, mode, url, points in LAYOUTS for point in points]
+    print("\nOK" if all(results) else "\nFAIL")
+    return 0 if all(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
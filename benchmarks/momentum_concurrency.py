@@ -0,0 +1,97 @@
+"""Concurrency stress check for momentum updates.
+
+Fires thousands of concurrent ``update_momentum`` calls at a handful of
+channels, flushing and compacting while they run, and checks that no update was lost in
+memory or on disk. Exits non-zero on a mismatch.
+
+Run from the repository root: ``python -m benchmarks.momentum_concurrency``
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.database import AsyncDataManager, DataManager
+
+UPDATES = 5_000
+GUILDS = 3
+CHANNELS_PER_GUILD = 4
+THREADS = 16
+
+def plan(seed: int):
+    """Random (guild, channel, momentum, threat) updates and their expected totals."""
+    rng = random.Random(seed)
+    updates = []
+    expected = {}
+    for _ in range(UPDATES):
+        key = (rng.randint(1, GUILDS), rng.randint(1, CHANNELS_PER_GUILD))
+        # Increments only, so the floor at zero cannot make totals order-dependent
+        momentum, threat = rng.randint(0, 3), rng.randint(0, 3)
+        updates.append((*key, momentum, threat))
+        total = expected.get(key, (0, 0))
+        expected[key] = (total[0] + momentum, total[1] + threat)
+    return updates, expected
+
+def check(name: str, manager: DataManager, expected: dict, elapsed: float = 0) -> bool:
+    actual = {}
+    for guild_id in range(1, GUILDS + 1):
+        for channel_id, pool in manager.get_all_momentum_pools(guild_id).items():
+            actual[(guild_id, channel_id)] = (pool.momentum, pool.threat)
+    ok = actual == expected
+    rate = f"{UPDATES / elapsed:>10,.0f} updates/s" if elapsed else ' ' * 20
+    print(f"{name:<28} {rate}  {'OK' if ok else 'LOST UPDATES'}")
+    if not ok:
+        for key in sorted(expected):
+            if actual.get(key) != expected[key]:
+                print(f"  {key}: expected {expected[key]}, got {actual.get(key)}")
+    return ok
+
+def stress_threads(directory: str, database_url, mode, updates, expected) -> bool:
+    manager = DataManager(directory, database_url, mode)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(manager.update_momentum, g, c, m, t) for g, c, m, t in updates]
+        # Flush while updates are still landing
+        futures += [executor.submit(manager.flush) for _ in range(50)]
+        futures += [executor.submit(manager.compact) for _ in range(10)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    manager.close()
+    return check('threads', manager, expected, elapsed) and \
+        check('threads, reopened', DataManager(directory, database_url, mode), expected)
+
+async def stress_async(directory: str, database_url, mode, updates, expected) -> bool:
+    manager = AsyncDataManager(directory, database_url, mode)
+    start = time.perf_counter()
+    calls = [manager.update_momentum(g, c, m, t) for g, c, m, t in updates]
+    calls += [manager.flush() for _ in range(50)]
+    calls += [manager.compact() for _ in range(10)]
+    random.Random(1).shuffle(calls)
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+    await manager.close()
+    return check('asyncio', manager.sync, expected, elapsed) and \
+        check('asyncio, reopened', DataManager(directory, database_url, mode), expected)
+
+def main() -> int:
+    updates, expected = plan(seed=42)
+    ok = True
+    for store in ('file', 'journal', 'sharded', 'sqlite'):
+        print(f"-- {store} store, {UPDATES:,} updates over {GUILDS * CHANNELS_PER_GUILD} channels")
+        for runner in (stress_threads, stress_async):
+            with tempfile.TemporaryDirectory() as directory:
+                database_url = f"sqlite:///{os.path.join(directory, 'stress.db')}" if store == 'sqlite' else None
+                mode = 'file' if store == 'sqlite' else store
+                result = runner(directory, database_url, mode, updates, expected)
+                if asyncio.iscoroutine(result):
+                    result = asyncio.run(result)
+                ok = ok and result
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Momentum storage at 100k channels: JSON write-back cache, journal, guild shards and SQLite.
+
+Run from the repository root: ``python -m benchmarks.momentum_storage``
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from utils.momentum_store import (
+    MOMENTUM_POOLS_FILE, JournaledMomentumStore, JSONMomentumStore, ShardedMomentumStore, SQLiteMomentumStore
+)
+
+GUILDS = 1_000
+CHANNELS_PER_GUILD = 100
+OPERATIONS = 20_000
+GUILD_SCANS = 500
+
+def build_pools() -> dict:
+    timestamp = datetime.now().isoformat()
+    pools = {}
+    for guild_id in range(1, GUILDS + 1):
+        for channel_id in range(1, CHANNELS_PER_GUILD + 1):
+            pools[f"{guild_id}_{channel_id}"] = {
+                'guild_id': guild_id, 'channel_id': channel_id,
+                'momentum': random.randint(0, 6), 'threat': random.randint(0, 6),
+                'last_updated': timestamp
+            }
+    return pools
+
+def run(name: str, store, flush_every: int = 0):
+    random.seed(7)
+    keys = [(random.randint(1, GUILDS), random.randint(1, CHANNELS_PER_GUILD)) for _ in range(OPERATIONS)]
+    timestamp = datetime.now().isoformat()
+
+    start = time.perf_counter()
+    store.load()
+    opened = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for guild_id, channel_id in keys:
+        store.get(guild_id, channel_id)
+    reads = OPERATIONS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i, (guild_id, channel_id) in enumerate(keys, 1):
+        store.add(guild_id, channel_id, 1, -1, timestamp)
+        if flush_every and i % flush_every == 0:
+            store.flush()
+    store.flush()
+    writes = OPERATIONS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for guild_id in range(1, GUILD_SCANS + 1):
+        store.guild_pools(guild_id)
+    scan_ms = (time.perf_counter() - start) / GUILD_SCANS * 1000
+
+    print(f"{name:<22} {opened * 1000:>9.1f} {reads:>12,.0f} {writes:>12,.0f} {scan_ms:>11.3f}")
+
+def main():
+    pools = build_pools()
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, MOMENTUM_POOLS_FILE)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(pools, f)
+
+        sqlite_store = SQLiteMomentumStore(os.path.join(directory, 'bench.db'), import_from=json_path)
+        start = time.perf_counter()
+        sqlite_store.load()
+        print(f"Imported {len(pools):,} pools into SQLite in {time.perf_counter() - start:.2f}s\n")
+        sqlite_store.close()
+
+        print(f"{'store':<22} {'open ms':>9} {'reads/s':>12} {'writes/s':>12} {'guild scan ms':>11}")
+        # The bot flushes on a timer; one flush per 500 writes approximates a busy server
+        run('json write-back', JSONMomentumStore(json_path), flush_every=500)
+        journal = JournaledMomentumStore(json_path)
+        run('json journal', journal, flush_every=500)
+        start = time.perf_counter()
+        journal.compact()
+        print(f"{'':<22} journal compaction took {(time.perf_counter() - start) * 1000:.0f} ms")
+        journal.close()
+        shards = ShardedMomentumStore(os.path.join(directory, 'guilds'), import_from=json_path)
+        run('json guild shards', shards, flush_every=500)
+        print(f"{'':<22} {shards.open_shards} shards open after the run")
+        shards.close()
+        # Uniformly random guilds thrash a 256-shard LRU; with room for every guild only reads hit disk once
+        run('json shards, no evict', ShardedMomentumStore(os.path.join(directory, 'guilds'), max_open=GUILDS),
+            flush_every=500)
+        run('sqlite wal', SQLiteMomentumStore(os.path.join(directory, 'bench.db')))
+
+if __name__ == '__main__':
+    main()
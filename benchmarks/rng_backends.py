@@ -0,0 +1,28 @@
+"""Throughput and fairness of the dice RNG backends.
+
+Run from the repository root: ``python -m benchmarks.rng_backends``
+"""
+
+import time
+
+from utils.dice_engines import DiceEngine
+from utils.dice_rng import BufferedBackend, PCGBackend, SecretsBackend, StdlibBackend, chi_square_fairness, use_rng
+
+ROLLS = 200_000
+DICE_PER_ROLL = 3
+
+def main():
+    backends = [StdlibBackend(), BufferedBackend(), SecretsBackend(), PCGBackend(seed=1234, stream=1)]
+    print(f"{'backend':<10} {'dice/s':>12} {'chi2 d6':>9} {'p':>7} {'chi2 d20':>9} {'p':>7}")
+    for backend in backends:
+        with use_rng(backend):
+            start = time.perf_counter()
+            for _ in range(ROLLS // DICE_PER_ROLL):
+                DiceEngine.roll_dice(DICE_PER_ROLL, 6)
+            elapsed = time.perf_counter() - start
+        d6, p6 = chi_square_fairness(backend, 6)
+        d20, p20 = chi_square_fairness(backend, 20)
+        print(f"{backend.name:<10} {ROLLS / elapsed:>12,.0f} {d6:>9.2f} {p6:>7.3f} {d20:>9.2f} {p20:>7.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Vectorized ``DiceEngine.roll_batch`` against its pure-Python fallback.
+
+Rolls the same batches through the NumPy path and the fallback built from
+the single-roll engines, times both, and checks with a chi-square test of
+homogeneity that each column (totals, successes, complications, botches)
+has the same distribution either way. Both paths draw from seeded PCG
+streams, so a run is reproducible.
+
+Exits non-zero if a check fails or NumPy is not installed.
+
+Run from the repository root: ``python -m benchmarks.roll_batch``
+"""
+
+import math
+import sys
+import time
+from collections import Counter
+
+from utils.dice_engines import MAX_EXPLOSIONS, DiceEngine, DiceSystem, np
+from utils.dice_rng import PCGBackend, use_rng
+
+ROLLS = 50_000
+# Samples with a p-value below this are reported as different distributions
+ALPHA = 0.001
+# Outcomes seen fewer times than this in both samples are pooled into one bin
+MIN_BIN = 20
+
+# (label, system, roll_batch keyword arguments)
+CASES = [
+    ('standard 3d6+2', DiceSystem.STANDARD, {'count': 3, 'sides': 6, 'modifier': 2}),
+    ('exploding 4d6!>=5', DiceSystem.EXPLODING, {'count': 4, 'sides': 6, 'threshold': 5,
+                                                 'explode_mode': 'explode'}),
+    ('exploding 3d10!p', DiceSystem.EXPLODING, {'count': 3, 'sides': 10, 'explode_mode': 'penetrate'}),
+    ('wod 7d10 diff 7', DiceSystem.WORLD_OF_DARKNESS, {'count': 7, 'difficulty': 7}),
+    ('wod 5d10 specialty', DiceSystem.WORLD_OF_DARKNESS, {'count': 5, 'difficulty': 6, 'specialty': True}),
+    ('dune 2d20+2 vs 12', DiceSystem.DUNE_2D20, {'target': 12, 'bonus_dice': 2}),
+]
+
+COLUMNS = ('totals', 'successes', 'complications', 'botches')
+
+def homogeneity(first, second) -> float:
+    """p-value of a chi-square test that two samples share one distribution."""
+    a, b = Counter(int(x) for x in first), Counter(int(x) for x in second)
+    bins, pooled = [], [0, 0]
+    for value in sorted(set(a) | set(b)):
+        if a[value] + b[value] < MIN_BIN:
+            pooled[0] += a[value]
+            pooled[1] += b[value]
+        else:
+            bins.append((a[value], b[value]))
+    if sum(pooled):
+        bins.append(tuple(pooled))
+    if len(bins) < 2:
+        return 1.0
+    n_a, n_b = len(first), len(second)
+    statistic = 0.0
+    for count_a, count_b in bins:
+        total = count_a + count_b
+        for count, n in ((count_a, n_a), (count_b, n_b)):
+            expected = total * n / (n_a + n_b)
+            statistic += (count - expected) ** 2 / expected
+    # Wilson-Hilferty approximation, as in chi_square_fairness
+    df = len(bins) - 1
+    z = ((statistic / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def python_batch(system: DiceSystem, rolls: int, options: dict):
+    """The fallback ``roll_batch`` uses when NumPy is missing."""
+    return DiceEngine._roll_batch_python(
+        system, rolls, options.get('count', 1), options.get('sides', 6), options.get('modifier', 0),
+        options.get('difficulty', 6), options.get('specialty', False), options.get('target', 10),
+        options.get('bonus_dice', 0), options.get('threshold', options.get('sides', 6)),
+        options.get('explode_mode', 'compound'), MAX_EXPLOSIONS
+    )
+
+def main() -> int:
+    if np is None:
+        print("NumPy is not installed; there is no vectorized path to compare")
+        return 1
+    print(f"{ROLLS:,} rolls per path\n")
+    print(f"{'case':<22} {'numpy ms':>9} {'python ms':>10} {'min p':>8}")
+    results = []
+    for seed, (label, system, options) in enumerate(CASES):
+        with use_rng(PCGBackend(seed, stream=1)):
+            start = time.perf_counter()
+            vectorized = DiceEngine.roll_batch(system, ROLLS, **options)
+            numpy_ms = (time.perf_counter() - start) * 1000
+        with use_rng(PCGBackend(seed, stream=2)):
+            start = time.perf_counter()
+            fallback = python_batch(system, ROLLS, options)
+            python_ms = (time.perf_counter() - start) * 1000
+        p = min(homogeneity(getattr(vectorized, column), getattr(fallback, column)) for column in COLUMNS)
+        ok = p >= ALPHA
+        results.append(ok)
+        print(f"{label:<22} {numpy_ms:>9.1f} {python_ms:>10.1f} {p:>8.3f}  {'OK' if ok else 'FAIL'}")
+
+    print("\nOK" if all(results) else "\nFAIL")
+    return 0 if all(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Save/load time and file size per storage codec.
+
+Covers momentum pool files at 1k/10k/100k channels and an Extra-Life cache
+with a team, a participant and a page of recent donations. Codecs whose
+library is not installed are skipped.
+
+Run from the repository root: ``python -m benchmarks.storage_codecs``
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.codecs import CODECS, load_file
+
+POOL_COUNTS = (1_000, 10_000, 100_000)
+DONATIONS = 100
+REPEATS = 5
+
+def momentum_pools(count: int) -> dict:
+    timestamp = datetime.now().isoformat()
+    pools = {}
+    for i in range(count):
+        guild_id, channel_id = 10**17 + i // 50, 10**18 + i
+        pools[f"{guild_id}_{channel_id}"] = {
+            'guild_id': guild_id, 'channel_id': channel_id,
+            'momentum': random.randint(0, 6), 'threat': random.randint(0, 12),
+            'last_updated': timestamp
+        }
+    return pools
+
+def extralife_cache() -> dict:
+    now = datetime.now()
+    donations = [{
+        'displayName': f"Donor {i}",
+        'message': "For the kids! Go team go!" if i % 3 else None,
+        'amount': round(random.uniform(5, 250), 2),
+        'donorID': f"{random.getrandbits(64):X}",
+        'createdDateUTC': (now - timedelta(minutes=i * 7)).isoformat() + 'Z',
+        'avatarImageURL': "https://assets.donordrive.com/clients/extralife/img/avatar-constituent-default.gif"
+    } for i in range(DONATIONS)]
+    team = {
+        'name': "Arrakis Gaming Collective", 'fundraisingGoal': 10000.0, 'sumDonations': 7342.5,
+        'numMembers': 24, 'numDonations': 311, 'teamID': 65432, 'eventName': "Extra Life 2026",
+        'avatarImageURL': "https://assets.donordrive.com/clients/extralife/img/avatar-team-default.gif"
+    }
+    participant = dict(team, displayName="Duncan Idaho", participantID=543210, isTeamCaptain=True)
+    return {'data': {'team': team, 'participant': participant, 'donations': donations},
+            'timestamp': now.isoformat()}
+
+def measure(codec, data, path: str):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        codec.save(path, data)
+    save_ms = (time.perf_counter() - start) / REPEATS * 1000
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        loaded = load_file(path)
+    load_ms = (time.perf_counter() - start) / REPEATS * 1000
+    assert loaded == data
+    return save_ms, load_ms, os.path.getsize(path)
+
+def main():
+    random.seed(3)
+    datasets = [(f"{count:,} pools", momentum_pools(count)) for count in POOL_COUNTS]
+    datasets.append(("extralife cache", extralife_cache()))
+    codecs = [codec for codec in CODECS.values() if codec.available]
+    skipped = [codec.name for codec in CODECS.values() if not codec.available]
+    if skipped:
+        print(f"Skipping codecs that are not installed: {', '.join(skipped)}\n")
+
+    print(f"{'data':<16} {'codec':<8} {'save ms':>9} {'load ms':>9} {'size KiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.bin')
+        for label, data in datasets:
+            for codec in codecs:
+                save_ms, load_ms, size = measure(codec, data, path)
+                print(f"{label:<16} {codec.name:<8} {save_ms:>9.2f} {load_ms:>9.2f} {size / 1024:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Burst writes: a commit per write vs the group-committing StorageService.
+
+Run from the repository root: ``python -m benchmarks.storage_group_commit``
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from utils.database import AsyncDataManager
+from utils.storage_service import StorageService
+
+BURSTS = 20
+BURST_SIZE = 500
+COMMIT_INTERVAL = 0.05
+
+STORES = (
+    ('journal', None, 'journal'),
+    ('sharded', None, 'sharded'),
+    ('sqlite', 'sqlite:///{directory}/bench.db', 'file'),
+)
+
+async def per_write(directory: str, database_url, mode) -> tuple:
+    """Every update is committed before it is acknowledged."""
+    manager = AsyncDataManager(directory, database_url, mode)
+    await manager.load_momentum_pools()
+    commits = 0
+
+    async def update(i: int):
+        nonlocal commits
+        await manager.update_momentum(i % 10, i % 7, momentum_change=1)
+        # A per-write transaction is the SQLite commit; file stores need a flush
+        flushed = await manager.flush()
+        if flushed or database_url:
+            commits += 1
+
+    start = time.perf_counter()
+    for _ in range(BURSTS):
+        await asyncio.gather(*(update(i) for i in range(BURST_SIZE)))
+    elapsed = time.perf_counter() - start
+    await manager.close()
+    return elapsed, commits
+
+async def grouped(directory: str, database_url, mode) -> tuple:
+    service = StorageService(directory, database_url, mode, commit_interval=COMMIT_INTERVAL)
+    await service.start()
+    start = time.perf_counter()
+    for _ in range(BURSTS):
+        await asyncio.gather(*(service.update_momentum(i % 10, i % 7, momentum_change=1) for i in range(BURST_SIZE)))
+    elapsed = time.perf_counter() - start
+    await service.close()
+    # Each SQLite group is one transaction; file stores commit on flush
+    commits = service.groups if database_url else service.commits
+    return elapsed, commits
+
+async def main():
+    total = BURSTS * BURST_SIZE
+    print(f"{BURSTS} bursts of {BURST_SIZE} concurrent updates\n")
+    print(f"{'store':<9} {'mode':<11} {'updates/s':>10} {'commits':>8}")
+    for name, url, mode in STORES:
+        for label, runner in (('per-write', per_write), ('grouped', grouped)):
+            with tempfile.TemporaryDirectory() as directory:
+                database_url = url.format(directory=directory) if url else None
+                elapsed, commits = await runner(directory, database_url, mode)
+            print(f"{name:<9} {label:<11} {total / elapsed:>10,.0f} {commits:>8,}")
+
+if __name__ == '__main__':
+    asyncio.run(main())
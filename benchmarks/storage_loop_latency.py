@@ -0,0 +1,75 @@
+"""Event-loop stalls from storage calls, inline vs on the storage executor.
+
+Run from the repository root: ``python -m benchmarks.storage_loop_latency``
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from utils.database import AsyncDataManager, DataManager
+from utils.momentum_store import MOMENTUM_POOLS_FILE
+
+POOL_COUNTS = (1_000, 10_000, 100_000)
+OPERATIONS = 50
+TICK = 0.001
+
+async def watch_loop(stalls: list, stop: asyncio.Event):
+    """Record how late each 1 ms sleep wakes up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stalls.append(time.perf_counter() - start - TICK)
+
+async def measure(workload) -> float:
+    stalls, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stalls, stop))
+    await asyncio.sleep(TICK)
+    await workload()
+    stop.set()
+    await watcher
+    return max(stalls) * 1000
+
+def write_pools(directory: str, count: int):
+    pools = {
+        f"1_{i}": {'guild_id': 1, 'channel_id': i, 'momentum': 0, 'threat': 0, 'last_updated': ''}
+        for i in range(count)
+    }
+    with open(os.path.join(directory, MOMENTUM_POOLS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(pools, f)
+
+async def main():
+    print(f"{'pools':>8} {'inline max stall ms':>20} {'executor max stall ms':>22}")
+    for count in POOL_COUNTS:
+        with tempfile.TemporaryDirectory() as directory:
+            write_pools(directory, count)
+            inline = DataManager(directory)
+
+            async def inline_workload():
+                inline.load_momentum_pools()
+                for i in range(OPERATIONS):
+                    inline.update_momentum(1, i, momentum_change=1)
+                    inline.flush()
+                    await asyncio.sleep(0)
+
+            inline_stall = await measure(inline_workload)
+
+        with tempfile.TemporaryDirectory() as directory:
+            write_pools(directory, count)
+            offloaded = AsyncDataManager(directory)
+
+            async def executor_workload():
+                await offloaded.load_momentum_pools()
+                for i in range(OPERATIONS):
+                    await offloaded.update_momentum(1, i, momentum_change=1)
+                    await offloaded.flush()
+
+            executor_stall = await measure(executor_workload)
+            await offloaded.close()
+
+        print(f"{count:>8,} {inline_stall:>20.1f} {executor_stall:>22.1f}")
+
+if __name__ == '__main__':
+    asyncio.run(main())
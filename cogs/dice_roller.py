@@ -1,10 +1,22 @@
 """Universal dice roller cog supporting multiple RPG systems."""
 
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import Optional, Literal
-from utils.dice_engines import DiceEngine, DiceParser, DiceSystem, DiceResult
+from utils.dice_engines import DiceEngine, DiceParser, DiceSystem, DiceResult, MAX_DICE, MAX_EXPLOSIONS
+from utils.dice_results import LargePoolResult
+from utils.dice_probability import DiceProbability
+from utils.dice_rng import DiceRNG, use_rng
+
+# Rolls with more dice than this show a summary instead of each die
+MAX_DISPLAYED_DICE = 10
+
+# Exploding odds have no closed form; /odds simulates about this many dice,
+# and at least ODDS_MIN_ROLLS rolls, in one batch
+ODDS_SIMULATED_DICE = 200_000
+ODDS_MIN_ROLLS = 2_000
 
 class DiceRoller(commands.Cog):
     """Universal dice rolling commands."""
@@ -14,7 +26,7 @@ class DiceRoller(commands.Cog):
     
     @app_commands.command(name="roll", description="Roll dice using various RPG systems")
     @app_commands.describe(
-        dice="Dice notation (e.g., 3d6, 2d10+5)",
+        dice="Dice notation (e.g., 3d6, 2d10+5, 2d6+1d4, 4d6kh3)",
         system="Dice system to use",
         difficulty="Difficulty for WoD system (1-10)",
         specialty="Use specialty rules for WoD (10s count double)"
@@ -29,20 +41,35 @@ class DiceRoller(commands.Cog):
     ):
         """Universal dice rolling command."""
         try:
-            # Parse dice notation
-            count, sides, modifier = DiceParser.parse_standard_notation(dice)
-            DiceParser.validate_dice_parameters(count, sides)
+            guild_id = interaction.guild_id if interaction.guild else 0
+            rng = DiceRNG.for_channel(guild_id, interaction.channel_id)
             
-            # Roll based on system
+            # Roll based on system; standard rolls accept full expressions
             if system == "standard":
-                result = DiceEngine.standard_roll(count, sides, modifier)
+                expression = DiceParser.compile(dice, large_pool=True)
+                if expression.total_dice > MAX_DICE:
+                    term, modifier = expression.single_term()
+                    with use_rng(rng):
+                        result = DiceEngine.large_pool_roll(term.count, term.sides, modifier, term.keep)
+                else:
+                    with use_rng(rng):
+                        result = DiceEngine.expression_roll(expression)
             elif system == "exploding":
-                result = DiceEngine.exploding_roll(count, sides, modifier)
+                count, sides, modifier, mode, threshold = DiceParser.parse_exploding_notation(dice)
+                DiceParser.validate_dice_parameters(count, sides)
+                with use_rng(rng):
+                    result = DiceEngine.exploding_roll(count, sides, modifier, threshold, mode)
             elif system == "wod":
+                count, sides, modifier = DiceParser.parse_standard_notation(dice)
+                DiceParser.validate_dice_parameters(count, sides, large_pool=True)
+                
                 if difficulty < 1 or difficulty > 10:
                     await interaction.response.send_message("❌ WoD difficulty must be between 1 and 10.", ephemeral=True)
                     return
-                result = DiceEngine.world_of_darkness_roll(count, difficulty, specialty)
+                # Pools too big to list are drawn as success counts directly
+                show_dice = count <= MAX_DISPLAYED_DICE
+                with use_rng(rng):
+                    result = DiceEngine.world_of_darkness_roll(count, difficulty, specialty, show_dice)
             else:
                 await interaction.response.send_message("❌ Invalid dice system.", ephemeral=True)
                 return
@@ -91,18 +118,21 @@ class DiceRoller(commands.Cog):
         # System-specific results
         if result.system == DiceSystem.STANDARD:
             embed.add_field(name="Total", value=f"**{result.total}**", inline=True)
-            if result.details.get('modifier', 0) != 0:
-                mod = result.details['modifier']
+            if result.modifier != 0:
+                mod = result.modifier
                 embed.add_field(name="Modifier", value=f"{mod:+d}", inline=True)
         
         elif result.system == DiceSystem.EXPLODING:
             embed.add_field(name="Total", value=f"**{result.total}**", inline=True)
             if result.exploded_dice:
-                embed.add_field(name="Exploded", value=f"{len(result.exploded_dice)} dice", inline=True)
+                exploded = f"{len(result.exploded_dice)} dice"
+                if result.mode != 'compound':
+                    exploded += f" ({result.mode})"
+                embed.add_field(name="Exploded", value=exploded, inline=True)
         
         elif result.system == DiceSystem.WORLD_OF_DARKNESS:
             embed.add_field(name="Successes", value=f"**{result.successes}**", inline=True)
-            embed.add_field(name="Difficulty", value=f"{result.details['difficulty']}", inline=True)
+            embed.add_field(name="Difficulty", value=f"{result.difficulty}", inline=True)
             
             if result.botch:
                 embed.add_field(name="Result", value="💀 **BOTCH!**", inline=False)
@@ -115,19 +145,23 @@ class DiceRoller(commands.Cog):
             else:
                 embed.add_field(name="Result", value="❌ **Failure**", inline=False)
             
-            if result.details.get('ones', 0) > 0:
-                embed.add_field(name="Ones", value=f"{result.details['ones']}", inline=True)
+            if result.ones > 0:
+                embed.add_field(name="Ones", value=f"{result.ones}", inline=True)
         
         return embed
     
     def format_rolls(self, result: DiceResult) -> str:
         """Format individual dice rolls for display."""
-        if len(result.rolls) <= 10:
+        if isinstance(result, LargePoolResult):
+            return self.format_histogram(result)
+        if result.rolls and len(result.rolls) <= MAX_DISPLAYED_DICE:
             # Show individual rolls
             formatted_rolls = []
-            for roll in result.rolls:
-                if result.system == DiceSystem.WORLD_OF_DARKNESS:
-                    difficulty = result.details['difficulty']
+            for i, roll in enumerate(result.rolls):
+                if result.system == DiceSystem.STANDARD and result.is_dropped(i):
+                    formatted_rolls.append(f"~~{roll}~~")  # Dropped by keep/drop
+                elif result.system == DiceSystem.WORLD_OF_DARKNESS:
+                    difficulty = result.difficulty
                     if roll >= difficulty:
                         formatted_rolls.append(f"**{roll}**")  # Success
                     elif roll == 1:
@@ -139,7 +173,114 @@ class DiceRoller(commands.Cog):
             return f"[{', '.join(formatted_rolls)}]"
         else:
             # Too many rolls, show summary
-            return f"[{len(result.rolls)} dice rolled]"
+            dice_count = result.dice_count if result.system == DiceSystem.WORLD_OF_DARKNESS else len(result.rolls)
+            return f"[{dice_count:,} dice rolled]"
+    
+    def format_histogram(self, result: LargePoolResult, max_rows: int = 10) -> str:
+        """Summarize a large pool as face counts, bucketing faces when there are many."""
+        histogram = result.histogram
+        sides = len(histogram)
+        bucket = -(-sides // max_rows)  # Ceiling division
+        
+        lines = []
+        for start in range(0, sides, bucket):
+            end = min(start + bucket, sides)
+            faces = f"{start + 1}" if end - start == 1 else f"{start + 1}–{end}"
+            lines.append(f"{faces}: {sum(histogram[start:end]):,}")
+        
+        summary = f"{result.dice_count:,} dice"
+        if result.keep:
+            summary += f", {result.kept_count:,} kept"
+        return f"{summary}\n```\n" + "\n".join(lines) + "\n```"
+    
+    @app_commands.command(name="odds", description="Show the odds for a roll")
+    @app_commands.describe(
+        dice="Dice notation (e.g., 3d6, 2d10+5, 3d6!>=5 for exploding, 5d10 for WoD)",
+        system="Dice system to use",
+        target="Standard: total to meet or beat. Dune: target number (1-20)",
+        difficulty="Difficulty for WoD system (1-10)",
+        specialty="Use specialty rules for WoD (10s count double)",
+        bonus="Bonus dice for Dune system (0-5)"
+    )
+    async def odds(
+        self,
+        interaction: discord.Interaction,
+        dice: str = "2d20",
+        system: Literal["standard", "exploding", "wod", "dune"] = "standard",
+        target: Optional[int] = None,
+        difficulty: Optional[int] = 6,
+        specialty: bool = False,
+        bonus: int = 0
+    ):
+        """Show the exact outcome distribution for a roll, or a simulated one for exploding dice."""
+        try:
+            embed = discord.Embed(
+                title=f"📈 {system.title()} Odds",
+                color=discord.Color.purple()
+            )
+            
+            if system == "dune":
+                if target is None or target < 1 or target > 20:
+                    await interaction.response.send_message("❌ Dune odds need a target between 1 and 20.", ephemeral=True)
+                    return
+                if bonus < 0 or bonus > 5:
+                    await interaction.response.send_message("❌ Bonus dice must be between 0 and 5.", ephemeral=True)
+                    return
+                odds = DiceProbability.dune_2d20(target, bonus)
+                embed.add_field(name="Roll", value=f"`{2 + bonus}d20` vs {target}", inline=False)
+                embed.add_field(name="Success", value=f"{odds.success_chance:.1%}", inline=True)
+                embed.add_field(name="Critical", value=f"{odds.critical_chance:.1%}", inline=True)
+                embed.add_field(name="Complication", value=f"{odds.complication_chance:.1%}", inline=True)
+            
+            elif system == "exploding":
+                count, sides, modifier, mode, threshold = DiceParser.parse_exploding_notation(dice)
+                DiceParser.validate_dice_parameters(count, sides)
+                rolls = max(ODDS_MIN_ROLLS, ODDS_SIMULATED_DICE // count)
+                batch = await asyncio.to_thread(
+                    DiceEngine.roll_batch, DiceSystem.EXPLODING, rolls, count=count, sides=sides,
+                    modifier=modifier, threshold=threshold, explode_mode=mode
+                )
+                totals = batch.totals
+                embed.description = f"Estimated from {rolls:,} simulated rolls"
+                embed.add_field(name="Dice", value=f"`{dice}`", inline=False)
+                embed.add_field(name="Average", value=f"{sum(totals) / rolls:.2f}", inline=True)
+                embed.add_field(name="Explosions per Roll", value=f"{sum(batch.details['exploded_count']) / rolls:.2f}",
+                                inline=True)
+                if target is not None:
+                    hits = sum(1 for total in totals if total >= target)
+                    embed.add_field(name=f"Total ≥ {target}", value=f"{hits / rolls:.1%}", inline=True)
+            
+            else:
+                count, sides, modifier = DiceParser.parse_standard_notation(dice)
+                DiceParser.validate_dice_parameters(count, sides)
+                
+                if system == "wod":
+                    if difficulty < 1 or difficulty > 10:
+                        await interaction.response.send_message("❌ WoD difficulty must be between 1 and 10.", ephemeral=True)
+                        return
+                    # Large pools take a while to tabulate, so off the event loop too
+                    odds = await asyncio.to_thread(DiceProbability.world_of_darkness, count, difficulty, specialty)
+                    embed.add_field(name="Pool", value=f"`{count}d10` at difficulty {difficulty}", inline=False)
+                    embed.add_field(name="Success", value=f"{odds.success_chance:.1%}", inline=True)
+                    embed.add_field(name="3+ Successes", value=f"{odds.successes.at_least(3):.1%}", inline=True)
+                    embed.add_field(name="Botch", value=f"{odds.botch_chance:.1%}", inline=True)
+                    embed.add_field(name="Average Successes", value=f"{odds.successes.mean:.2f}", inline=True)
+                
+                else:
+                    # Large pools are convolved off the event loop
+                    distribution = await asyncio.to_thread(DiceProbability.standard, count, sides, modifier)
+                    embed.add_field(name="Dice", value=f"`{dice}`", inline=False)
+                    embed.add_field(name="Range", value=f"{distribution.minimum}–{distribution.maximum}", inline=True)
+                    embed.add_field(name="Average", value=f"{distribution.mean:.2f}", inline=True)
+                    if target is not None:
+                        embed.add_field(name=f"Total ≥ {target}", value=f"{distribution.at_least(target):.1%}", inline=True)
+            
+            await interaction.response.send_message(embed=embed)
+            
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Unexpected error: {str(e)}", ephemeral=True)
     
     @app_commands.command(name="roll-help", description="Show help for dice rolling systems")
     async def roll_help(self, interaction: discord.Interaction):
@@ -156,7 +297,11 @@ class DiceRoller(commands.Cog):
                 "`3d6` - Roll 3 six-sided dice\n"
                 "`2d10+5` - Roll 2d10, add 5\n"
                 "`1d20-2` - Roll 1d20, subtract 2\n"
-                "`d6` - Roll 1 six-sided die"
+                "`d6` - Roll 1 six-sided die\n"
+                "`2d6+1d4+2` - Mix several dice terms\n"
+                "`4d6kh3` - Keep highest 3 (`kl`, `dh`, `dl` also work)\n"
+                "`10d6r1` - Reroll 1s (`ro1` rerolls once)\n"
+                "`100000d6kh10` - Pools over 100 dice show a face histogram"
             ),
             inline=False
         )
@@ -176,7 +321,10 @@ class DiceRoller(commands.Cog):
             value=(
                 "Dice explode on maximum roll\n"
                 "**Example:** `/roll 3d6 system:exploding`\n"
-                "Reroll and add when you roll max value"
+                "Reroll and add when you roll max value\n"
+                "`3d6!>=5` explodes on 5+, `3d6!` lists each extra die, "
+                "`3d6!p` penetrates (extra dice -1)\n"
+                f"Each die explodes at most {MAX_EXPLOSIONS} times"
             ),
             inline=False
         )
@@ -192,6 +340,15 @@ class DiceRoller(commands.Cog):
             inline=False
         )
         
+        embed.add_field(
+            name="📈 Odds",
+            value=(
+                "Exact chances for any roll; exploding dice are simulated\n"
+                "**Example:** `/odds 3d6 target:12` or `/odds system:dune target:12 bonus:1`"
+            ),
+            inline=False
+        )
+        
         embed.set_footer(text="For Dune 2d20 system, use /dune-roll command")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
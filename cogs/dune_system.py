@@ -3,16 +3,26 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
-from utils.dice_engines import DiceEngine, DiceResult
-from utils.database import DataManager
+from typing import List, Optional, Tuple, Union
+from utils.dice_engines import DiceEngine
+from utils.dice_results import DuneResult, DuneGroupResult
+from utils.storage_service import StorageService
+from utils.dice_probability import DuneOutcomeTable
+from utils.dice_rng import channel_rng
+from utils.momentum_history import MomentumChange
+
+# Changes shown per page of /momentum history
+HISTORY_PAGE_SIZE = 10
 
 class DuneSystem(commands.Cog):
     """Dune: Adventures in the Imperium 2d20 system."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.data_manager = DataManager()
+        # Bot-wide storage service (see DuneBot.storage)
+        self.data_manager = bot.storage
+        # Every valid (target, bonus) pair, so embeds never do per-roll math
+        self.outcome_table = DuneOutcomeTable.build()
     
     @app_commands.command(name="dune-roll", description="Roll dice using Dune 2d20 system")
     @app_commands.describe(
@@ -43,12 +53,13 @@ class DuneSystem(commands.Cog):
                 return
             
             # Perform the roll
-            result = DiceEngine.dune_2d20_roll(target, bonus)
-            
-            # Get current momentum pool
             guild_id = interaction.guild_id if interaction.guild else 0
             channel_id = interaction.channel_id
-            momentum_pool = self.data_manager.get_momentum_pool(guild_id, channel_id)
+            with channel_rng(guild_id, channel_id):
+                result = DiceEngine.dune_2d20_roll(target, bonus)
+            
+            # Get current momentum pool
+            momentum_pool = await self.data_manager.get_momentum_pool(guild_id, channel_id)
             
             # Create response embed
             embed = self.create_dune_embed(result, skill, drive, target, bonus, description, interaction.user)
@@ -70,7 +81,7 @@ class DuneSystem(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
     
-    def create_dune_embed(self, result: DiceResult, skill: str, drive: str, target: int, 
+    def create_dune_embed(self, result: DuneResult, skill: str, drive: str, target: int, 
                          bonus: int, description: Optional[str], user: discord.User) -> discord.Embed:
         """Create formatted embed for Dune 2d20 results."""
         # Color based on success level
@@ -102,6 +113,17 @@ class DuneSystem(commands.Cog):
         rolls_display = self.format_dune_rolls(result, target)
         embed.add_field(name="🎲 Rolls", value=rolls_display, inline=False)
         
+        # Odds for this target and bonus
+        outcome = self.outcome_table.lookup(target, bonus)
+        embed.add_field(
+            name="📈 Odds",
+            value=(
+                f"Success {outcome.success:.0%} | Crit {outcome.critical:.0%} | "
+                f"Complication {outcome.complication:.0%}"
+            ),
+            inline=False
+        )
+        
         # Success/Failure
         success_text = self.get_success_text(result.successes)
         embed.add_field(name="📊 Result", value=success_text, inline=True)
@@ -113,17 +135,14 @@ class DuneSystem(commands.Cog):
         
         return embed
     
-    def format_dune_rolls(self, result: DiceResult, target: int) -> str:
+    def format_dune_rolls(self, result: DuneResult, target: int) -> str:
         """Format Dune dice rolls for display."""
         formatted_rolls = []
         
-        if result.details.get('bonus_dice', 0) > 0:
+        if result.bonus_dice > 0:
             # Show which rolls were used vs bonus
-            main_rolls = result.details.get('main_rolls', result.rolls[:2])
-            all_rolls = result.rolls
-            
-            for i, roll in enumerate(all_rolls):
-                if roll in main_rolls and main_rolls.count(roll) > 0:
+            for i, roll in enumerate(result.rolls):
+                if result.is_used(i):
                     # This is a main roll
                     if roll <= target:
                         formatted_rolls.append(f"**{roll}**✅")
@@ -131,8 +150,6 @@ class DuneSystem(commands.Cog):
                         formatted_rolls.append(f"**{roll}**⚠️")
                     else:
                         formatted_rolls.append(f"**{roll}**")
-                    # Remove one instance from main_rolls to handle duplicates
-                    main_rolls.remove(roll)
                 else:
                     # This is a bonus roll (not used)
                     if roll <= target:
@@ -162,23 +179,164 @@ class DuneSystem(commands.Cog):
         else:
             return "❌ **Failure** (0 successes)"
     
+    @app_commands.command(name="dune-group-roll", description="Leader and assistants roll together (2d20 assist rules)")
+    @app_commands.describe(
+        skill="Leader's skill name (e.g., Battle, Communicate)",
+        drive="Leader's drive name (e.g., Justice, Faith, Duty)",
+        target="Leader's target number",
+        assistants="Assistant targets, with optional focus: e.g. '12/3, 10, 11/2'",
+        focus="Leader's skill rating if a focus applies (rolls at or under it score 2)",
+        bonus="Leader's bonus dice from momentum/assets",
+        description="Description of the action"
+    )
+    async def dune_group_roll(
+        self,
+        interaction: discord.Interaction,
+        skill: str,
+        drive: str,
+        target: int,
+        assistants: str,
+        focus: Optional[int] = None,
+        bonus: int = 0,
+        description: Optional[str] = None
+    ):
+        """Assisted Dune roll: every die in one engine call, one pool read."""
+        try:
+            if target < 1 or target > 20:
+                await interaction.response.send_message("❌ Target must be between 1 and 20.", ephemeral=True)
+                return
+            
+            if focus is not None and (focus < 1 or focus > target):
+                await interaction.response.send_message("❌ Focus must be between 1 and the target.", ephemeral=True)
+                return
+            
+            if bonus < 0 or bonus > 5:
+                await interaction.response.send_message("❌ Bonus dice must be between 0 and 5.", ephemeral=True)
+                return
+            
+            try:
+                helpers = self.parse_assistants(assistants)
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+                return
+            
+            guild_id = interaction.guild_id if interaction.guild else 0
+            channel_id = interaction.channel_id
+            with channel_rng(guild_id, channel_id):
+                result = DiceEngine.dune_group_roll(target, focus, bonus, helpers)
+            
+            momentum_pool = await self.data_manager.get_momentum_pool(guild_id, channel_id)
+            
+            embed = self.create_group_embed(result, skill, drive, description, interaction.user)
+            embed.add_field(
+                name="💫 Current Pools",
+                value=f"Momentum: {momentum_pool.momentum} | Threat: {momentum_pool.threat}",
+                inline=False
+            )
+            
+            view = None
+            if result.successes > 0 or result.complications > 0:
+                view = DuneMomentumView(self.data_manager, guild_id, channel_id, result)
+            
+            await interaction.response.send_message(embed=embed, view=view)
+            
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+    
+    def parse_assistants(self, assistants: str) -> List[Tuple[int, Optional[int]]]:
+        """Parse 'target[/focus]' entries separated by commas."""
+        helpers = []
+        for entry in assistants.replace(' ', '').split(','):
+            if not entry:
+                continue
+            target_text, _, focus_text = entry.partition('/')
+            try:
+                assist_target = int(target_text)
+                assist_focus = int(focus_text) if focus_text else None
+            except ValueError:
+                raise ValueError(f"Invalid assistant '{entry}'. Use target or target/focus, e.g. 12/3.")
+            if assist_target < 1 or assist_target > 20:
+                raise ValueError("Assistant targets must be between 1 and 20.")
+            if assist_focus is not None and (assist_focus < 1 or assist_focus > assist_target):
+                raise ValueError("Assistant focus must be between 1 and their target.")
+            helpers.append((assist_target, assist_focus))
+        
+        if not helpers:
+            raise ValueError("Give at least one assistant target, e.g. '12, 10/2'.")
+        if len(helpers) > 5:
+            raise ValueError("At most 5 assistants can help.")
+        return helpers
+    
+    def create_group_embed(self, result: DuneGroupResult, skill: str, drive: str,
+                           description: Optional[str], user: discord.User) -> discord.Embed:
+        """Create formatted embed for an assisted Dune roll."""
+        if result.successes >= 2:
+            color = discord.Color.gold()
+        elif result.successes == 1:
+            color = discord.Color.green()
+        else:
+            color = discord.Color.red()
+        
+        embed = discord.Embed(
+            title=f"⚔️ Dune 2d20 Group Roll ({len(result.assistants)} assisting)",
+            color=color,
+            timestamp=discord.utils.utcnow()
+        )
+        embed.set_author(name=user.display_name, icon_url=user.display_avatar.url)
+        
+        if description:
+            embed.description = f"*{description}*"
+        
+        leader = result.leader
+        embed.add_field(name="🎯 Skill + Drive", value=f"{skill} + {drive}", inline=True)
+        embed.add_field(name="🎲 Target", value=f"{leader.target}", inline=True)
+        embed.add_field(name="➕ Bonus Dice", value=f"{leader.bonus_dice}", inline=True)
+        
+        embed.add_field(
+            name="👑 Leader",
+            value=f"{self.format_dune_rolls(leader, leader.target)} — {leader.successes} successes",
+            inline=False
+        )
+        
+        assist_lines = []
+        for i, assistant in enumerate(result.assistants, start=1):
+            focus = f", focus {assistant.focus}" if assistant.focus else ""
+            assist_lines.append(
+                f"#{i} (target {assistant.target}{focus}): "
+                f"{self.format_dune_rolls(assistant, assistant.target)} — {assistant.successes}"
+            )
+        embed.add_field(name="🤝 Assistants", value="\n".join(assist_lines), inline=False)
+        
+        success_text = self.get_success_text(result.successes)
+        if leader.successes == 0 and result.assisted_successes > 0:
+            success_text += "\n*Leader failed, so assistance is lost*"
+        embed.add_field(name="📊 Result", value=success_text, inline=True)
+        
+        if result.complications > 0:
+            complication_text = f"⚠️ {result.complications} Complication{'s' if result.complications > 1 else ''}"
+            embed.add_field(name="⚠️ Complications", value=complication_text, inline=True)
+        
+        return embed
+    
     @app_commands.command(name="momentum", description="Manage momentum and threat pools")
     @app_commands.describe(
-        action="Action to perform",
-        amount="Amount to add/subtract"
+        action="Action to perform: show, reset or history",
+        amount="Amount to add/subtract",
+        page="History page to start on (1 is the newest)"
     )
     async def momentum_command(
         self,
         interaction: discord.Interaction,
         action: Optional[str] = "show",
-        amount: Optional[int] = 1
+        amount: Optional[int] = 1,
+        page: Optional[int] = 1
     ):
         """Manage momentum and threat pools."""
         guild_id = interaction.guild_id if interaction.guild else 0
         channel_id = interaction.channel_id
         
         if action == "show" or action is None:
-            pool = self.data_manager.get_momentum_pool(guild_id, channel_id)
+            pool = await self.data_manager.get_momentum_pool(guild_id, channel_id)
             embed = discord.Embed(
                 title="💫 Momentum & Threat Pools",
                 color=discord.Color.blue()
@@ -188,15 +346,24 @@ class DuneSystem(commands.Cog):
             embed.set_footer(text=f"Last updated: {pool.last_updated}")
             
         elif action == "reset":
-            pool = self.data_manager.reset_momentum_pool(guild_id, channel_id)
+            pool = await self.data_manager.reset_momentum_pool(guild_id, channel_id, user_id=interaction.user.id)
             embed = discord.Embed(
                 title="💫 Pools Reset",
                 description="Momentum and Threat pools have been reset to 0.",
                 color=discord.Color.green()
             )
             
+        elif action == "history":
+            changes = await self.data_manager.get_momentum_history(guild_id, channel_id)
+            if not changes:
+                await interaction.response.send_message("📜 No momentum or threat changes recorded here yet.", ephemeral=True)
+                return
+            view = MomentumHistoryView(changes, (page or 1) - 1)
+            await interaction.response.send_message(embed=view.create_embed(), view=view)
+            return
+            
         else:
-            await interaction.response.send_message("❌ Invalid action. Use 'show' or 'reset'.", ephemeral=True)
+            await interaction.response.send_message("❌ Invalid action. Use 'show', 'reset' or 'history'.", ephemeral=True)
             return
         
         await interaction.response.send_message(embed=embed)
@@ -236,11 +403,22 @@ class DuneSystem(commands.Cog):
                 "Momentum: Player resource pool\n"
                 "Threat: GM resource pool\n"
                 "Use `/momentum show` to check current pools\n"
+                "Use `/momentum history` to see how they changed\n"
                 "Use buttons after rolls to adjust pools"
             ),
             inline=False
         )
         
+        embed.add_field(
+            name="🤝 Group Rolls",
+            value=(
+                "`/dune-group-roll skill:Battle drive:Duty target:12 assistants:10, 11/2`\n"
+                "Each assistant rolls 1d20 (`target/focus`)\n"
+                "Their successes count only if the leader succeeds"
+            ),
+            inline=False
+        )
+        
         embed.add_field(
             name="📊 Success Levels",
             value=(
@@ -257,7 +435,8 @@ class DuneSystem(commands.Cog):
 class DuneMomentumView(discord.ui.View):
     """Interactive buttons for managing momentum and threat."""
     
-    def __init__(self, data_manager: DataManager, guild_id: int, channel_id: int, result: DiceResult):
+    def __init__(self, data_manager: StorageService, guild_id: int, channel_id: int,
+                 result: Union[DuneResult, DuneGroupResult]):
         super().__init__(timeout=300)  # 5 minute timeout
         self.data_manager = data_manager
         self.guild_id = guild_id
@@ -267,7 +446,9 @@ class DuneMomentumView(discord.ui.View):
     @discord.ui.button(label="Spend Momentum", style=discord.ButtonStyle.primary, emoji="💫")
     async def spend_momentum(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Spend momentum for additional effects."""
-        pool = self.data_manager.update_momentum(self.guild_id, self.channel_id, momentum_change=-1)
+        pool = await self.data_manager.update_momentum(
+            self.guild_id, self.channel_id, momentum_change=-1, user_id=interaction.user.id
+        )
         
         embed = discord.Embed(
             title="💫 Momentum Spent",
@@ -283,7 +464,9 @@ class DuneMomentumView(discord.ui.View):
     async def add_threat(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Add threat from complications."""
         threat_to_add = self.result.complications
-        pool = self.data_manager.update_momentum(self.guild_id, self.channel_id, threat_change=threat_to_add)
+        pool = await self.data_manager.update_momentum(
+            self.guild_id, self.channel_id, threat_change=threat_to_add, user_id=interaction.user.id
+        )
         
         embed = discord.Embed(
             title="⚠️ Threat Added",
@@ -300,7 +483,9 @@ class DuneMomentumView(discord.ui.View):
         """Generate momentum from unused successes."""
         if self.result.successes > 1:
             momentum_to_add = self.result.successes - 1  # Keep 1 success, convert rest to momentum
-            pool = self.data_manager.update_momentum(self.guild_id, self.channel_id, momentum_change=momentum_to_add)
+            pool = await self.data_manager.update_momentum(
+                self.guild_id, self.channel_id, momentum_change=momentum_to_add, user_id=interaction.user.id
+            )
             
             embed = discord.Embed(
                 title="✨ Momentum Generated",
@@ -314,6 +499,53 @@ class DuneMomentumView(discord.ui.View):
         else:
             await interaction.response.send_message("❌ Need 2+ successes to generate momentum.", ephemeral=True)
 
+class MomentumHistoryView(discord.ui.View):
+    """Paged list of a channel's recorded momentum and threat changes."""
+    
+    def __init__(self, changes: List[MomentumChange], page: int = 0):
+        super().__init__(timeout=300)  # 5 minute timeout
+        self.changes = changes
+        self.page_count = max(1, -(-len(changes) // HISTORY_PAGE_SIZE))
+        self.page = min(max(0, page), self.page_count - 1)
+        self.update_buttons()
+    
+    def update_buttons(self):
+        self.newer.disabled = self.page == 0
+        self.older.disabled = self.page >= self.page_count - 1
+    
+    def create_embed(self) -> discord.Embed:
+        """Embed for the current page, newest change first."""
+        start = self.page * HISTORY_PAGE_SIZE
+        lines = []
+        for change in self.changes[start:start + HISTORY_PAGE_SIZE]:
+            parts = []
+            if change.momentum_change:
+                parts.append(f"Momentum {change.momentum_change:+d}")
+            if change.threat_change:
+                parts.append(f"Threat {change.threat_change:+d}")
+            who = f" by <@{change.user_id}>" if change.user_id else ""
+            lines.append(f"<t:{int(change.timestamp)}:t> {', '.join(parts) or 'No change'}{who}")
+        
+        embed = discord.Embed(
+            title="📜 Momentum & Threat History",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count} • {len(self.changes)} changes")
+        return embed
+    
+    @discord.ui.button(label="Newer", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.create_embed(), view=self)
+    
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.create_embed(), view=self)
+
 async def setup(bot):
     """Setup function for the cog."""
     await bot.add_cog(DuneSystem(bot))
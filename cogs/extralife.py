@@ -3,47 +3,99 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiohttp
-import asyncio
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
 from config import Config
-from utils.database import DataManager
+from utils.extralife_api import ExtraLifeClient
+from utils.extralife_donations import DONATION_BATCH_SIZE, DonationFeed, batches
+from utils.extralife_scheduler import ExtraLifeScheduler, guild_endpoints
 
 class ExtraLife(commands.Cog):
-    """Extra-Life charity event integration."""
+    """Extra-Life charity event integration.
+    
+    Each guild can register its own team and participant; guilds without a
+    registration use the IDs from the configuration. One scheduler polls
+    every registered endpoint for all guilds.
+    """
     
     def __init__(self, bot):
         self.bot = bot
-        self.data_manager = DataManager()
-        self.session = None
-        self.announcement_channel = None
-        self.pinned_message = None
-        
-        # Start background tasks
-        if Config.EXTRALIFE_TEAM_ID or Config.EXTRALIFE_PARTICIPANT_ID:
-            self.update_stats.start()
+        # Bot-wide storage service (see DuneBot.storage)
+        self.data_manager = bot.storage
+        # Bot-wide HTTP session (see DuneBot.http_session)
+        self.client = ExtraLifeClient(
+            bot.http_session,
+            request_timeout=Config.EXTRALIFE_REQUEST_TIMEOUT,
+            total_timeout=Config.EXTRALIFE_TOTAL_TIMEOUT
+        )
+        self.scheduler = ExtraLifeScheduler(
+            self.client,
+            self.data_manager,
+            Config.EXTRALIFE_API_BASE,
+            rate_limit=Config.EXTRALIFE_RATE_LIMIT
+        )
+        self.donations = DonationFeed(self.scheduler, self.data_manager)
+        # guild_id -> {'team_id', 'participant_id', 'announcement_channel_id'}
+        self.registrations: Dict[int, Dict[str, Any]] = {}
+        # guild_id -> pinned announcement kept up to date by the poller
+        self.pinned_messages: Dict[int, discord.Message] = {}
     
     async def cog_load(self):
-        """Initialize HTTP session when cog loads."""
-        self.session = aiohttp.ClientSession()
+        """Subscribe registered guilds and start polling."""
+        self.registrations = await self.data_manager.load_extralife_registrations()
+        for guild_id in self.registrations:
+            self.scheduler.subscribe(guild_id, self.guild_endpoints(guild_id))
+        self.update_stats.start()
+        self.poll_donations.start()
     
     async def cog_unload(self):
-        """Clean up HTTP session when cog unloads."""
-        if self.session:
-            await self.session.close()
+        """Stop the background tasks; the bot closes the shared session."""
         self.update_stats.cancel()
+        self.poll_donations.cancel()
+    
+    def guild_endpoints(self, guild_id: Optional[int]) -> Dict[str, str]:
+        """Endpoint keys for a guild: its registration, else the configured IDs."""
+        registration = self.registrations.get(guild_id) or {}
+        if registration.get('team_id') or registration.get('participant_id'):
+            return guild_endpoints(registration.get('team_id'), registration.get('participant_id'))
+        return guild_endpoints(Config.EXTRALIFE_TEAM_ID, Config.EXTRALIFE_PARTICIPANT_ID)
+    
+    def announcement_channel(self, guild_id: Optional[int]) -> Optional[discord.abc.Messageable]:
+        """The guild's announcement channel, if one is set up and still visible."""
+        channel_id = (self.registrations.get(guild_id) or {}).get('announcement_channel_id')
+        return self.bot.get_channel(channel_id) if channel_id else None
+    
+    async def update_registration(self, guild_id: int, **changes):
+        """Apply changes to a guild's registration, persist it and resubscribe."""
+        registration = {**self.registrations.get(guild_id, {}), **changes}
+        registration = {key: value for key, value in registration.items() if value}
+        if registration:
+            self.registrations[guild_id] = registration
+        else:
+            self.registrations.pop(guild_id, None)
+        await self.data_manager.save_extralife_registration(guild_id, registration or None)
+        
+        if registration:
+            dropped = self.scheduler.subscribe(guild_id, self.guild_endpoints(guild_id))
+        else:
+            dropped = self.scheduler.unsubscribe(guild_id)
+        if dropped:
+            await self.data_manager.forget_extralife_cache(sorted(dropped))
     
     @app_commands.command(name="extralife", description="Extra-Life charity integration commands")
     @app_commands.describe(
         action="Action to perform",
-        channel="Channel for announcements (admin only)"
+        channel="Channel for announcements (admin only)",
+        team_id="Extra-Life team ID to register for this server (admin only)",
+        participant_id="Extra-Life participant ID to register for this server (admin only)"
     )
     async def extralife_command(
         self,
         interaction: discord.Interaction,
         action: str = "stats",
-        channel: Optional[discord.TextChannel] = None
+        channel: Optional[discord.TextChannel] = None,
+        team_id: Optional[str] = None,
+        participant_id: Optional[str] = None
     ):
         """Main Extra-Life command."""
         if action == "stats":
@@ -54,9 +106,11 @@ class ExtraLife(commands.Cog):
             await self.post_announcement(interaction)
         elif action == "refresh":
             await self.refresh_stats(interaction)
+        elif action == "register":
+            await self.register_guild(interaction, team_id, participant_id)
         else:
             await interaction.response.send_message(
-                "❌ Invalid action. Use: `stats`, `setup`, `announce`, or `refresh`",
+                "❌ Invalid action. Use: `stats`, `setup`, `announce`, `refresh`, or `register`",
                 ephemeral=True
             )
     
@@ -65,14 +119,11 @@ class ExtraLife(commands.Cog):
         await interaction.response.defer()
         
         try:
+            endpoints = self.guild_endpoints(interaction.guild_id)
             # Try to get cached data first
-            cached_data = self.data_manager.load_extralife_cache()
-            if cached_data:
-                data = cached_data
-            else:
-                data = await self.fetch_extralife_data()
-                if data:
-                    self.data_manager.save_extralife_cache(data)
+            data = await self.scheduler.cached(endpoints)
+            if not data:
+                data, _ = await self.fetch_extralife_data(interaction.guild_id)
             
             if not data:
                 await interaction.followup.send("❌ Unable to fetch Extra-Life data. Check configuration.", ephemeral=True)
@@ -93,7 +144,7 @@ class ExtraLife(commands.Cog):
         if not channel:
             channel = interaction.channel
         
-        self.announcement_channel = channel
+        await self.update_registration(interaction.guild_id, announcement_channel_id=channel.id)
         
         embed = discord.Embed(
             title="🎮 Extra-Life Setup Complete",
@@ -103,9 +154,38 @@ class ExtraLife(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
+    async def register_guild(self, interaction: discord.Interaction, team_id: Optional[str],
+                             participant_id: Optional[str]):
+        """Register this server's team and participant (admin only); no IDs clears them."""
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Administrator permissions required.", ephemeral=True)
+            return
+        
+        for value in (team_id, participant_id):
+            if value and not value.isdigit():
+                await interaction.response.send_message(f"❌ `{value}` is not an Extra-Life ID.", ephemeral=True)
+                return
+        
+        await self.update_registration(interaction.guild_id, team_id=team_id, participant_id=participant_id)
+        
+        if team_id or participant_id:
+            registered = ", ".join(
+                f"{kind} `{value}`" for kind, value in (("team", team_id), ("participant", participant_id)) if value
+            )
+            description = f"This server now follows {registered}."
+        else:
+            description = "Registration cleared; this server uses the bot's default team and participant."
+        embed = discord.Embed(
+            title="🎮 Extra-Life Registration Updated",
+            description=description,
+            color=discord.Color.green()
+        )
+        await interaction.response.send_message(embed=embed)
+    
     async def post_announcement(self, interaction: discord.Interaction):
         """Post Extra-Life event announcement."""
-        if not self.announcement_channel:
+        announcement_channel = self.announcement_channel(interaction.guild_id)
+        if not announcement_channel:
             await interaction.response.send_message(
                 "❌ No announcement channel set. Use `/extralife setup` first.",
                 ephemeral=True
@@ -115,7 +195,7 @@ class ExtraLife(commands.Cog):
         await interaction.response.defer()
         
         try:
-            data = await self.fetch_extralife_data()
+            data, _ = await self.fetch_extralife_data(interaction.guild_id)
             if not data:
                 await interaction.followup.send("❌ Unable to fetch Extra-Life data.", ephemeral=True)
                 return
@@ -123,16 +203,16 @@ class ExtraLife(commands.Cog):
             embed = self.create_announcement_embed(data)
             
             # Post to announcement channel
-            message = await self.announcement_channel.send(embed=embed)
+            message = await announcement_channel.send(embed=embed)
             
             # Try to pin the message
             try:
                 await message.pin()
-                self.pinned_message = message
+                self.pinned_messages[interaction.guild_id] = message
             except discord.Forbidden:
                 pass  # No permission to pin
             
-            await interaction.followup.send(f"✅ Announcement posted in {self.announcement_channel.mention}")
+            await interaction.followup.send(f"✅ Announcement posted in {announcement_channel.mention}")
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error posting announcement: {str(e)}", ephemeral=True)
@@ -142,9 +222,8 @@ class ExtraLife(commands.Cog):
         await interaction.response.defer()
         
         try:
-            data = await self.fetch_extralife_data()
+            data, _ = await self.fetch_extralife_data(interaction.guild_id)
             if data:
-                self.data_manager.save_extralife_cache(data)
                 embed = self.create_stats_embed(data)
                 await interaction.followup.send("✅ Stats refreshed!", embed=embed)
             else:
@@ -153,33 +232,20 @@ class ExtraLife(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"❌ Error refreshing: {str(e)}", ephemeral=True)
     
-    async def fetch_extralife_data(self) -> Optional[Dict[str, Any]]:
-        """Fetch data from Extra-Life API."""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
-        data = {}
+    async def fetch_extralife_data(self, guild_id: Optional[int]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Fetch a guild's endpoints through the shared scheduler and update the cache.
         
+        Requests are conditional on the cached validators, and a guild
+        asking for an endpoint that is already being fetched, for it or any
+        other guild, waits for that request. Returns the data and whether
+        any endpoint changed.
+        """
         try:
-            # Fetch team data
-            if Config.EXTRALIFE_TEAM_ID:
-                team_url = Config.get_extralife_team_url()
-                async with self.session.get(team_url) as response:
-                    if response.status == 200:
-                        data['team'] = await response.json()
-            
-            # Fetch participant data
-            if Config.EXTRALIFE_PARTICIPANT_ID:
-                participant_url = Config.get_extralife_participant_url()
-                async with self.session.get(participant_url) as response:
-                    if response.status == 200:
-                        data['participant'] = await response.json()
-            
-            return data if data else None
+            return await self.scheduler.fetch(self.guild_endpoints(guild_id))
             
         except Exception as e:
             print(f"Error fetching Extra-Life data: {e}")
-            return None
+            return None, False
     
     def create_stats_embed(self, data: Dict[str, Any]) -> discord.Embed:
         """Create embed showing current statistics."""
@@ -274,8 +340,9 @@ class ExtraLife(commands.Cog):
             inline=False
         )
         
-        if Config.EXTRALIFE_TEAM_ID:
-            team_page = f"https://www.extra-life.org/team/{Config.EXTRALIFE_TEAM_ID}"
+        team_id = data.get('team', {}).get('teamID') or Config.EXTRALIFE_TEAM_ID
+        if team_id:
+            team_page = f"https://www.extra-life.org/team/{team_id}"
             embed.add_field(
                 name="🔗 Donation Link",
                 value=f"[Visit Our Team Page]({team_page})",
@@ -288,28 +355,87 @@ class ExtraLife(commands.Cog):
     
     @tasks.loop(minutes=5)
     async def update_stats(self):
-        """Background task to update statistics."""
+        """Background task to update statistics for every subscribed guild."""
         try:
-            data = await self.fetch_extralife_data()
-            if data:
-                self.data_manager.save_extralife_cache(data)
-                
-                # Update pinned message if it exists
-                if self.pinned_message and self.announcement_channel:
-                    try:
-                        embed = self.create_announcement_embed(data)
-                        await self.pinned_message.edit(embed=embed)
-                    except (discord.NotFound, discord.Forbidden):
-                        self.pinned_message = None
-                        
+            await self.scheduler.poll(self.deliver_update)
         except Exception as e:
             print(f"Error in background stats update: {e}")
     
+    async def deliver_update(self, guild_id: int, data: Dict[str, Any], changed: bool):
+        """Update a guild's pinned announcement; unchanged totals need no edit."""
+        pinned_message = self.pinned_messages.get(guild_id)
+        if not changed or not pinned_message:
+            return
+        try:
+            embed = self.create_announcement_embed(data)
+            await pinned_message.edit(embed=embed)
+        except (discord.NotFound, discord.Forbidden):
+            del self.pinned_messages[guild_id]
+    
     @update_stats.before_loop
     async def before_update_stats(self):
         """Wait for bot to be ready before starting background task."""
         await self.bot.wait_until_ready()
     
+    @tasks.loop(seconds=Config.EXTRALIFE_DONATION_INTERVAL)
+    async def poll_donations(self):
+        """Background task to announce new donations in each announcement channel."""
+        # One stream per endpoint, however many guilds follow it
+        channels: Dict[str, List[discord.abc.Messageable]] = {}
+        for guild_id in self.registrations:
+            channel = self.announcement_channel(guild_id)
+            endpoint = self.donation_endpoint(guild_id)
+            if channel and endpoint:
+                channels.setdefault(endpoint, []).append(channel)
+        
+        for endpoint, endpoint_channels in channels.items():
+            try:
+                async for batch in batches(self.donations.stream(endpoint), DONATION_BATCH_SIZE):
+                    embed = self.create_donations_embed(batch)
+                    for channel in endpoint_channels:
+                        try:
+                            await channel.send(embed=embed)
+                        except discord.HTTPException as e:
+                            print(f"Error announcing donations in channel {channel.id}: {e}")
+            except Exception as e:
+                print(f"Error polling donations for {endpoint}: {e}")
+    
+    @poll_donations.before_loop
+    async def before_poll_donations(self):
+        """Wait for bot to be ready before starting background task."""
+        await self.bot.wait_until_ready()
+    
+    def donation_endpoint(self, guild_id: int) -> Optional[str]:
+        """Endpoint whose donations a guild announces: its team, else its participant."""
+        endpoints = self.guild_endpoints(guild_id)
+        return endpoints.get('team') or endpoints.get('participant')
+    
+    def create_donations_embed(self, donations: List[Dict[str, Any]]) -> discord.Embed:
+        """Create embed announcing a batch of donations, oldest first."""
+        total = sum(donation.get('amount') or 0 for donation in donations)
+        embed = discord.Embed(
+            title="💙 New Extra-Life Donations!" if len(donations) > 1 else "💙 New Extra-Life Donation!",
+            description=f"**${total:,.2f}** for Children's Miracle Network Hospitals",
+            color=discord.Color.gold(),
+            timestamp=datetime.utcnow()
+        )
+        
+        for donation in donations:
+            amount = donation.get('amount')
+            message = donation.get('message') or "\u200b"
+            embed.add_field(
+                name=(
+                    f"{donation.get('displayName') or 'Anonymous'}"
+                    + (f" • ${amount:,.2f}" if amount is not None else "")
+                )[:256],
+                value=message[:1024],
+                inline=False
+            )
+        
+        embed.set_footer(text="Thank you for supporting children's hospitals! 💙")
+        
+        return embed
+    
     @app_commands.command(name="extralife-help", description="Show Extra-Life integration help")
     async def extralife_help(self, interaction: discord.Interaction):
         """Show help for Extra-Life commands."""
@@ -327,7 +453,7 @@ class ExtraLife(commands.Cog):
         
         embed.add_field(
             name="⚙️ `/extralife setup`",
-            value="Setup announcement channel (admin only)",
+            value="Setup announcement channel for events and new donations (admin only)",
             inline=False
         )
         
@@ -343,13 +469,20 @@ class ExtraLife(commands.Cog):
             inline=False
         )
         
+        embed.add_field(
+            name="📝 `/extralife register`",
+            value="Follow this server's own `team_id` and/or `participant_id` (admin only); no IDs resets",
+            inline=False
+        )
+        
         embed.add_field(
             name="🔧 Configuration",
             value=(
                 "Set these in your `.env` file:\n"
                 "• `EXTRALIFE_TEAM_ID`\n"
                 "• `EXTRALIFE_PARTICIPANT_ID`\n"
-                "Stats auto-update every 5 minutes"
+                "These are the default for servers without a registration.\n"
+                "Stats auto-update every 5 minutes; new donations are announced as they arrive"
             ),
             inline=False
         )
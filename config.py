@@ -19,16 +19,42 @@ class Config:
     EXTRALIFE_TEAM_ID: Optional[str] = os.getenv('EXTRALIFE_TEAM_ID')
     EXTRALIFE_PARTICIPANT_ID: Optional[str] = os.getenv('EXTRALIFE_PARTICIPANT_ID')
     EXTRALIFE_API_BASE: str = os.getenv('EXTRALIFE_API_BASE', 'https://www.extra-life.org/api')
+    # Seconds allowed for one API request, and for fetching every endpoint
+    EXTRALIFE_REQUEST_TIMEOUT: float = float(os.getenv('EXTRALIFE_REQUEST_TIMEOUT', '5'))
+    EXTRALIFE_TOTAL_TIMEOUT: float = float(os.getenv('EXTRALIFE_TOTAL_TIMEOUT', '8'))
+    # API requests per second across every guild
+    EXTRALIFE_RATE_LIMIT: int = int(os.getenv('EXTRALIFE_RATE_LIMIT', '2'))
+    # Seconds between checks for new donations to announce
+    EXTRALIFE_DONATION_INTERVAL: float = float(os.getenv('EXTRALIFE_DONATION_INTERVAL', '60'))
     
     # Bot Settings
     DEBUG_MODE: bool = os.getenv('DEBUG_MODE', 'False').lower() == 'true'
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     DATABASE_URL: str = os.getenv('DATABASE_URL', 'sqlite:///bot_data.db')
     
+    # Dice RNG Settings
+    # stdlib, buffered, secrets, or pcg (seeded stream per guild/channel)
+    DICE_RNG_BACKEND: str = os.getenv('DICE_RNG_BACKEND', 'stdlib')
+    DICE_RNG_SEED: Optional[int] = int(os.getenv('DICE_RNG_SEED')) if os.getenv('DICE_RNG_SEED') else None
+    
     # Data Paths
     DATA_DIR: str = 'data'
     MOMENTUM_POOLS_FILE: str = os.path.join(DATA_DIR, 'momentum_pools.json')
     
+    # Storage Settings
+    # Seconds between group commits of queued storage writes
+    MOMENTUM_FLUSH_INTERVAL: float = float(os.getenv('MOMENTUM_FLUSH_INTERVAL', '5'))
+    # Layout of JSON storage when DATABASE_URL is empty: file, journal or sharded
+    MOMENTUM_STORAGE_MODE: str = os.getenv('MOMENTUM_STORAGE_MODE', 'file')
+    # Data file format: json (indented), orjson (compact JSON) or msgpack; needs the library installed
+    STORAGE_CODEC: str = os.getenv('STORAGE_CODEC', 'json')
+    # Seconds between compactions of the momentum journal or SQLite WAL
+    MOMENTUM_COMPACT_INTERVAL: float = float(os.getenv('MOMENTUM_COMPACT_INTERVAL', '300'))
+    # Days without an update before a momentum pool is archived (0 keeps every pool)
+    MOMENTUM_ARCHIVE_DAYS: float = float(os.getenv('MOMENTUM_ARCHIVE_DAYS', '30'))
+    # Seconds between sweeps for idle momentum pools
+    MOMENTUM_ARCHIVE_INTERVAL: float = float(os.getenv('MOMENTUM_ARCHIVE_INTERVAL', '3600'))
+    
     @classmethod
     def validate(cls) -> bool:
         """Validate required configuration."""
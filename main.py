@@ -11,6 +11,9 @@ import asyncio
 import logging
 import os
 from config import Config
+from utils.dice_rng import DiceRNG
+from utils.http import create_http_session
+from utils.storage_service import StorageService
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +44,20 @@ class DuneBot(commands.Bot):
             case_insensitive=True
         )
         
+        # Shared by every cog; started in setup_hook, closed after the cogs unload
+        self.storage = StorageService(
+            Config.DATA_DIR,
+            database_url=Config.DATABASE_URL,
+            storage_mode=Config.MOMENTUM_STORAGE_MODE,
+            codec=Config.STORAGE_CODEC,
+            commit_interval=Config.MOMENTUM_FLUSH_INTERVAL,
+            compact_interval=Config.MOMENTUM_COMPACT_INTERVAL,
+            archive_after_days=Config.MOMENTUM_ARCHIVE_DAYS,
+            archive_interval=Config.MOMENTUM_ARCHIVE_INTERVAL
+        )
+        # Shared HTTP session for every cog; created in setup_hook inside the event loop
+        self.http_session = None
+        
         self.initial_extensions = [
             'cogs.dice_roller',
             'cogs.dune_system',
@@ -55,6 +72,14 @@ class DuneBot(commands.Bot):
         if not os.path.exists(Config.DATA_DIR):
             os.makedirs(Config.DATA_DIR)
         
+        # Open storage before any cog needs it
+        await self.storage.start()
+        self.http_session = create_http_session()
+        
+        # Select the dice RNG backend
+        DiceRNG.configure(Config.DICE_RNG_BACKEND, Config.DICE_RNG_SEED)
+        logger.info(f"Dice RNG backend: {Config.DICE_RNG_BACKEND}")
+        
         # Load all cogs
         for extension in self.initial_extensions:
             try:
@@ -73,6 +98,16 @@ class DuneBot(commands.Bot):
             await self.tree.sync()
             logger.info("Synced commands globally")
     
+    async def close(self):
+        """Unload cogs and disconnect, then close the HTTP session and storage."""
+        try:
+            await super().close()
+        finally:
+            if self.http_session is not None:
+                await self.http_session.close()
+            await self.storage.close()
+            logger.info("Storage closed")
+    
     async def on_ready(self):
         """Called when bot is ready and connected."""
         logger.info(f"Bot is ready! Logged in as {self.user} (ID: {self.user.id})")
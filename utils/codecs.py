@@ -0,0 +1,116 @@
+"""Serialization codecs for persisted data files.
+
+Files written by a binary codec start with that codec's marker; anything
+else is JSON. Readers detect the format, so a file written by any codec
+loads wherever that codec's library is installed, and JSON loads everywhere.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+from utils.files import write_bytes_atomic
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; JSON falls back to the stdlib
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; the codec is unavailable without it
+    msgpack = None
+
+class Codec(ABC):
+    """Turns data into file bytes and back."""
+
+    name = 'base'
+    # Leading bytes identifying the format; empty for JSON
+    marker = b''
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def encode(self, data: Any) -> bytes:
+        """File contents for ``data``, marker included."""
+        return self.marker + self._encode(data)
+
+    @abstractmethod
+    def _encode(self, data: Any) -> bytes:
+        """``data`` in this codec's format, without the marker."""
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Any:
+        """Data from file contents with the marker already stripped."""
+
+    def save(self, path: str, data: Any):
+        """Atomically replace ``path`` with ``data``. Raises OSError on failure."""
+        write_bytes_atomic(path, self.encode(data))
+
+class JSONCodec(Codec):
+    """Indented stdlib JSON, readable by hand; the historical format."""
+
+    name = 'json'
+
+    def _encode(self, data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def decode(self, payload: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+class OrjsonCodec(JSONCodec):
+    """Compact JSON through orjson; the files are still plain JSON."""
+
+    name = 'orjson'
+
+    @property
+    def available(self) -> bool:
+        return orjson is not None
+
+    def _encode(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+class MsgpackCodec(Codec):
+    """Binary MessagePack behind a marker."""
+
+    name = 'msgpack'
+    marker = b'MSGPACK1\n'
+
+    @property
+    def available(self) -> bool:
+        return msgpack is not None
+
+    def _encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, payload: bytes) -> Any:
+        if msgpack is None:
+            raise ValueError("File is in MessagePack format but msgpack is not installed")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+CODECS: Dict[str, Codec] = {codec.name: codec for codec in (JSONCodec(), OrjsonCodec(), MsgpackCodec())}
+
+def get_codec(name: str) -> Codec:
+    """Codec called ``name``, or stdlib JSON if its library is not installed."""
+    if name not in CODECS:
+        raise ValueError(f"Unknown storage codec '{name}'. Use: {', '.join(CODECS)}")
+    codec = CODECS[name]
+    if not codec.available:
+        print(f"Storage codec '{name}' is not installed, using json")
+        return CODECS['json']
+    return codec
+
+def decode(contents: bytes) -> Any:
+    """Data from file contents in any codec's format."""
+    for codec in CODECS.values():
+        if codec.marker and contents.startswith(codec.marker):
+            return codec.decode(contents[len(codec.marker):])
+    return CODECS['json'].decode(contents)
+
+def load_file(path: str) -> Any:
+    """Read and decode a data file. Raises OSError or ValueError on failure."""
+    with open(path, 'rb') as f:
+        return decode(f.read())
@@ -1,10 +1,25 @@
 """Database utilities for persistent data storage."""
 
-import json
+import asyncio
+import functools
 import os
-from typing import Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass, asdict
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from utils.codecs import get_codec, load_file
+from utils.momentum_archive import MOMENTUM_ARCHIVE_FILE, MomentumArchive
+from utils.momentum_history import MOMENTUM_HISTORY_FILE, MomentumChange, MomentumHistoryStore
+from utils.momentum_store import open_momentum_store
+
+EXTRALIFE_CACHE_FILE = 'extralife_cache.json'
+EXTRALIFE_GUILDS_FILE = 'extralife_guilds.json'
+EXTRALIFE_DONATIONS_FILE = 'extralife_donations.json'
+
+# Seconds cached Extra-Life data stays fresh
+EXTRALIFE_CACHE_TTL = 300
 
 @dataclass
 class MomentumPool:
@@ -20,11 +35,31 @@ class MomentumPool:
             self.last_updated = datetime.now().isoformat()
 
 class DataManager:
-    """Manages persistent data storage using JSON files."""
+    """Manages persistent data storage.
+    
+    Momentum pools go to the store picked by ``database_url`` (see
+    ``open_momentum_store``): SQLite for ``sqlite:///`` URLs, otherwise JSON
+    files laid out per ``storage_mode``. Call ``flush()`` periodically,
+    ``compact()`` and ``archive_idle_pools()`` now and then, and ``close()``
+    on shutdown. Archived pools are read from the archive and moved back
+    into the store on their next write.
+    """
     
-    def __init__(self, data_dir: str = 'data'):
+    def __init__(self, data_dir: str = 'data', database_url: Optional[str] = None,
+                 storage_mode: str = 'file', codec: str = 'json'):
         self.data_dir = data_dir
         self.ensure_data_dir()
+        self.codec = get_codec(codec)
+        self.momentum_store = open_momentum_store(database_url, data_dir, storage_mode, self.codec)
+        self.momentum_history = MomentumHistoryStore(os.path.join(data_dir, MOMENTUM_HISTORY_FILE))
+        self.momentum_archive = MomentumArchive(os.path.join(data_dir, MOMENTUM_ARCHIVE_FILE), self.codec)
+        # Held while pools move between the store and the archive, so a
+        # reader never finds a pool in neither
+        self._archive_lock = threading.Lock()
+        # Extra-Life cache entries by endpoint; the file is read at most once
+        # and rewritten by flush()
+        self._extralife_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._extralife_dirty = False
     
     def ensure_data_dir(self):
         """Ensure data directory exists."""
@@ -32,32 +67,132 @@ class DataManager:
             os.makedirs(self.data_dir)
     
     def load_json(self, filename: str) -> Dict[str, Any]:
-        """Load data from JSON file."""
+        """Load data from a data file in any codec's format."""
         filepath = os.path.join(self.data_dir, filename)
         if os.path.exists(filepath):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
+                return load_file(filepath)
+            except (ValueError, OSError):
                 return {}
         return {}
     
-    def save_json(self, filename: str, data: Dict[str, Any]):
-        """Save data to JSON file."""
+    def save_json(self, filename: str, data: Dict[str, Any]) -> bool:
+        """Save data with the configured codec. Returns False if the write failed."""
         filepath = os.path.join(self.data_dir, filename)
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            self.codec.save(filepath, data)
+            return True
+        except OSError as e:
             print(f"Error saving {filename}: {e}")
+            return False
+    
+    def load_momentum_pools(self):
+        """Open the momentum store ahead of the first command."""
+        self.momentum_store.load()
+    
+    @property
+    def dirty(self) -> bool:
+        """Whether momentum changes are not yet persisted."""
+        return (self.momentum_store.dirty or self.momentum_history.dirty
+                or self.momentum_archive.dirty or self._extralife_dirty)
+    
+    def flush(self) -> bool:
+        """Persist pending momentum changes and the Extra-Life cache. Returns True if anything was written."""
+        # Store first: a restored pool must land there before it leaves the archive file
+        pools_written = self.momentum_store.flush()
+        history_written = self.momentum_history.flush()
+        archive_written = self.momentum_archive.flush()
+        cache_written = self._flush_extralife_cache()
+        return pools_written or history_written or archive_written or cache_written
+    
+    def compact(self) -> bool:
+        """Fold the momentum store's log into its main file. Returns True if compacted."""
+        return self.momentum_store.compact()
+    
+    def close(self):
+        """Flush and release the momentum store."""
+        self.momentum_store.close()
+        self.momentum_history.flush()
+        self.momentum_archive.flush()
+        self._flush_extralife_cache()
+    
+    def archive_idle_pools(self, max_age_days: float) -> int:
+        """Move pools not updated for ``max_age_days`` into the archive. Returns how many moved.
+        
+        Idle pools are saved to the archive before any store removes them,
+        whether it writes removals at commit, on flush or straight to its
+        journal, so a crash in between leaves a pool in both places (the
+        store's copy wins), never in neither.
+        """
+        before = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._archive_lock, self.momentum_store.transaction():
+            idle = self.momentum_store.idle(before)
+            if not idle or not self._save_archived(idle):
+                return 0
+            expired = self.momentum_store.expire(before)
+            expired_keys = {(pool['guild_id'], pool['channel_id']) for pool in expired}
+            idle_keys = {(pool['guild_id'], pool['channel_id']) for pool in idle}
+            # Updated since the scan: the store keeps it, so its archived copy goes
+            for guild_id, channel_id in idle_keys - expired_keys:
+                self.momentum_archive.take(guild_id, channel_id)
+            # Gone idle since the scan (an old pool written back meanwhile)
+            late = [pool for pool in expired if (pool['guild_id'], pool['channel_id']) not in idle_keys]
+            if late and not self._save_archived(late):
+                for pool in late:
+                    self.momentum_store.put(pool)
+                return len(expired) - len(late)
+        return len(expired)
+    
+    def _save_archived(self, pools: List[Dict[str, Any]]) -> bool:
+        """Add pools to the archive and write it now. Returns False, leaving it unchanged, if that fails."""
+        self.momentum_archive.add(pools)
+        try:
+            self.momentum_archive.save()
+            return True
+        except OSError as e:
+            print(f"Error saving {MOMENTUM_ARCHIVE_FILE}: {e}")
+            for pool in pools:
+                self.momentum_archive.take(pool['guild_id'], pool['channel_id'])
+            return False
+    
+    def _pool_data(self, guild_id: int, channel_id: int, restore: bool = False) -> Optional[Dict[str, Any]]:
+        """A pool's data from the store, or from the archive if it was archived.
+        
+        With ``restore`` an archived pool is moved back into the store.
+        """
+        pool_data = self.momentum_store.get(guild_id, channel_id)
+        if pool_data is not None:
+            return pool_data
+        with self._archive_lock:
+            pool_data = self.momentum_store.get(guild_id, channel_id)
+            if pool_data is not None:
+                return pool_data
+            if not restore:
+                return self.momentum_archive.get(guild_id, channel_id)
+            pool_data = self.momentum_archive.take(guild_id, channel_id)
+            if pool_data is not None:
+                self.momentum_store.put(pool_data)
+            return pool_data
+    
+    def apply_mutations(self, mutations: Sequence[Tuple[str, tuple, dict]]) -> List[Any]:
+        """Run ``(method, args, kwargs)`` calls in one store transaction.
+        
+        Returns one result per call; a call that raised has its exception in
+        its place, so one bad call does not fail the others.
+        """
+        results = []
+        with self.momentum_store.transaction():
+            for name, args, kwargs in mutations:
+                try:
+                    results.append(getattr(self, name)(*args, **kwargs))
+                except Exception as e:
+                    results.append(e)
+        return results
     
     def get_momentum_pool(self, guild_id: int, channel_id: int) -> MomentumPool:
         """Get momentum pool for a specific guild/channel."""
-        pools = self.load_json('momentum_pools.json')
-        key = f"{guild_id}_{channel_id}"
-        
-        if key in pools:
-            pool_data = pools[key]
+        pool_data = self._pool_data(guild_id, channel_id)
+        if pool_data is not None:
             return MomentumPool(**pool_data)
         
         # Create new pool
@@ -65,55 +200,229 @@ class DataManager:
     
     def save_momentum_pool(self, pool: MomentumPool):
         """Save momentum pool data."""
-        pools = self.load_json('momentum_pools.json')
-        key = f"{pool.guild_id}_{pool.channel_id}"
-        
         pool.last_updated = datetime.now().isoformat()
-        pools[key] = asdict(pool)
-        
-        self.save_json('momentum_pools.json', pools)
+        # Drops any archived copy
+        self._pool_data(pool.guild_id, pool.channel_id, restore=True)
+        self.momentum_store.put(asdict(pool))
     
-    def update_momentum(self, guild_id: int, channel_id: int, momentum_change: int = 0, threat_change: int = 0):
-        """Update momentum and threat values."""
-        pool = self.get_momentum_pool(guild_id, channel_id)
-        pool.momentum = max(0, pool.momentum + momentum_change)
-        pool.threat = max(0, pool.threat + threat_change)
-        self.save_momentum_pool(pool)
+    def update_momentum(self, guild_id: int, channel_id: int, momentum_change: int = 0, threat_change: int = 0,
+                        user_id: int = 0):
+        """Update momentum and threat values, recording the change in the channel's history."""
+        now = datetime.now()
+        # History records the applied change, which differs from the request at zero.
+        # Exact when writes are serialised, as StorageService does.
+        before_data = self._pool_data(guild_id, channel_id, restore=True)
+        before = MomentumPool(**before_data) if before_data else MomentumPool(guild_id, channel_id)
+        pool = MomentumPool(**self.momentum_store.add(
+            guild_id, channel_id, momentum_change, threat_change, now.isoformat()
+        ))
+        self.momentum_history.record(
+            guild_id, channel_id, now.timestamp(),
+            pool.momentum - before.momentum, pool.threat - before.threat, user_id
+        )
         return pool
     
-    def reset_momentum_pool(self, guild_id: int, channel_id: int):
-        """Reset momentum pool to zero."""
+    def reset_momentum_pool(self, guild_id: int, channel_id: int, user_id: int = 0):
+        """Reset momentum pool to zero, recording the change in the channel's history."""
+        before = self.get_momentum_pool(guild_id, channel_id)
         pool = MomentumPool(guild_id=guild_id, channel_id=channel_id)
         self.save_momentum_pool(pool)
+        self.momentum_history.record(
+            guild_id, channel_id, datetime.now().timestamp(), -before.momentum, -before.threat, user_id
+        )
         return pool
     
+    def get_momentum_history(self, guild_id: int, channel_id: int) -> List[MomentumChange]:
+        """Recorded momentum/threat changes for a channel, newest first."""
+        return self.momentum_history.entries(guild_id, channel_id)
+    
     def get_all_momentum_pools(self, guild_id: int) -> Dict[int, MomentumPool]:
-        """Get all momentum pools for a guild."""
-        pools = self.load_json('momentum_pools.json')
-        guild_pools = {}
-        
-        for key, pool_data in pools.items():
-            if pool_data['guild_id'] == guild_id:
-                channel_id = pool_data['channel_id']
-                guild_pools[channel_id] = MomentumPool(**pool_data)
+        """Get all momentum pools for a guild, archived ones included."""
+        pools = {
+            pool_data['channel_id']: MomentumPool(**pool_data)
+            for pool_data in self.momentum_archive.guild_pools(guild_id)
+        }
+        pools.update(
+            (pool_data['channel_id'], MomentumPool(**pool_data))
+            for pool_data in self.momentum_store.guild_pools(guild_id)
+        )
+        return pools
+    
+    def save_extralife_cache(self, data: Dict[str, Any], validators: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Cache Extra-Life API data by endpoint, with each endpoint's HTTP validators (ETag, Last-Modified).
         
-        return guild_pools
+        Entries for endpoints not in ``data`` are kept. The file is written on
+        the next ``flush()``.
+        """
+        timestamp = datetime.now().isoformat()
+        validators = validators or {}
+        # Copied, not mutated, so readers on other threads see whole entries
+        cache = dict(self._extralife_entries())
+        for endpoint, payload in data.items():
+            cache[endpoint] = {'data': payload, 'validators': validators.get(endpoint) or {}, 'timestamp': timestamp}
+        self._extralife_cache = cache
+        self._extralife_dirty = True
     
-    def save_extralife_cache(self, data: Dict[str, Any]):
-        """Cache Extra-Life API data."""
-        cache_data = {
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.save_json('extralife_cache.json', cache_data)
-    
-    def load_extralife_cache(self) -> Optional[Dict[str, Any]]:
-        """Load cached Extra-Life data."""
-        cache = self.load_json('extralife_cache.json')
-        if cache and 'data' in cache:
-            # Check if cache is less than 5 minutes old
-            cache_time = datetime.fromisoformat(cache['timestamp'])
-            now = datetime.now()
-            if (now - cache_time).total_seconds() < 300:  # 5 minutes
-                return cache['data']
-        return None
+    def forget_extralife_cache(self, endpoints: Sequence[str]):
+        """Drop cached entries for endpoints nobody polls any more."""
+        cache = {key: entry for key, entry in self._extralife_entries().items() if key not in endpoints}
+        if len(cache) != len(self._extralife_cache):
+            self._extralife_cache = cache
+            self._extralife_dirty = True
+    
+    @property
+    def extralife_cache_loaded(self) -> bool:
+        """Whether Extra-Life cache reads are served from memory."""
+        return self._extralife_cache is not None
+    
+    def _extralife_entries(self) -> Dict[str, Dict[str, Any]]:
+        cache = self._extralife_cache
+        if cache is None:
+            # Files from before per-endpoint caching have no 'endpoints' and are dropped
+            cache = self._extralife_cache = self.load_json(EXTRALIFE_CACHE_FILE).get('endpoints') or {}
+        return cache
+    
+    def _flush_extralife_cache(self) -> bool:
+        if not self._extralife_dirty:
+            return False
+        self._extralife_dirty = False
+        if self.save_json(EXTRALIFE_CACHE_FILE, {'endpoints': self._extralife_cache}):
+            return True
+        self._extralife_dirty = True
+        return False
+    
+    def load_extralife_validators(self, endpoints: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Cached data and validators of ``endpoints`` at any age, for conditional requests."""
+        cache = self._extralife_entries()
+        entries = {key: cache[key] for key in endpoints if key in cache}
+        return (
+            {key: entry['data'] for key, entry in entries.items()},
+            {key: entry['validators'] for key, entry in entries.items()}
+        )
+    
+    def load_extralife_cache(self, endpoints: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Cached data of ``endpoints`` by endpoint, or None unless all of it is fresh."""
+        cache = self._extralife_entries()
+        now = datetime.now()
+        data = {}
+        for key in endpoints:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            if (now - datetime.fromisoformat(entry['timestamp'])).total_seconds() >= EXTRALIFE_CACHE_TTL:
+                return None
+            data[key] = entry['data']
+        return data if data else None
+    
+    def load_extralife_registrations(self) -> Dict[int, Dict[str, Any]]:
+        """Per-guild Extra-Life registrations by guild ID."""
+        return {int(guild_id): registration for guild_id, registration in self.load_json(EXTRALIFE_GUILDS_FILE).items()}
+    
+    def save_extralife_registration(self, guild_id: int, registration: Optional[Dict[str, Any]]):
+        """Store a guild's Extra-Life registration, or remove it when ``registration`` is None."""
+        registrations = self.load_json(EXTRALIFE_GUILDS_FILE)
+        if registration:
+            registrations[str(guild_id)] = registration
+        else:
+            registrations.pop(str(guild_id), None)
+        self.save_json(EXTRALIFE_GUILDS_FILE, registrations)
+    
+    def load_donation_cursors(self) -> Dict[str, Dict[str, Any]]:
+        """Last donation seen per Extra-Life endpoint."""
+        return self.load_json(EXTRALIFE_DONATIONS_FILE)
+    
+    def save_donation_cursor(self, endpoint: str, cursor: Dict[str, Any]):
+        """Store the last donation seen for an endpoint."""
+        cursors = self.load_json(EXTRALIFE_DONATIONS_FILE)
+        cursors[endpoint] = cursor
+        self.save_json(EXTRALIFE_DONATIONS_FILE, cursors)
+
+class AsyncDataManager:
+    """``DataManager`` for async code: every call runs on a dedicated executor.
+    
+    File and database work never blocks the event loop. The executor has as
+    many threads as the momentum store is sized for.
+    """
+    
+    def __init__(self, data_dir: str = 'data', database_url: Optional[str] = None,
+                 storage_mode: str = 'file', codec: str = 'json'):
+        self.sync = DataManager(data_dir, database_url, storage_mode, codec)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.sync.momentum_store.max_threads,
+            thread_name_prefix='storage'
+        )
+    
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    @property
+    def dirty(self) -> bool:
+        """Whether momentum changes are not yet persisted."""
+        return self.sync.dirty
+    
+    async def load_momentum_pools(self):
+        await self._run(self.sync.load_momentum_pools)
+    
+    async def flush(self) -> bool:
+        return await self._run(self.sync.flush)
+    
+    async def compact(self) -> bool:
+        return await self._run(self.sync.compact)
+    
+    async def close(self):
+        """Flush and close the store, then stop the executor."""
+        await self._run(self.sync.close)
+        self._executor.shutdown(wait=False)
+    
+    async def archive_idle_pools(self, max_age_days: float) -> int:
+        return await self._run(self.sync.archive_idle_pools, max_age_days)
+    
+    async def get_momentum_pool(self, guild_id: int, channel_id: int) -> MomentumPool:
+        return await self._run(self.sync.get_momentum_pool, guild_id, channel_id)
+    
+    async def save_momentum_pool(self, pool: MomentumPool):
+        await self._run(self.sync.save_momentum_pool, pool)
+    
+    async def update_momentum(self, guild_id: int, channel_id: int, momentum_change: int = 0,
+                              threat_change: int = 0, user_id: int = 0) -> MomentumPool:
+        return await self._run(self.sync.update_momentum, guild_id, channel_id,
+                               momentum_change=momentum_change, threat_change=threat_change, user_id=user_id)
+    
+    async def reset_momentum_pool(self, guild_id: int, channel_id: int, user_id: int = 0) -> MomentumPool:
+        return await self._run(self.sync.reset_momentum_pool, guild_id, channel_id, user_id=user_id)
+    
+    async def get_momentum_history(self, guild_id: int, channel_id: int) -> List[MomentumChange]:
+        return await self._run(self.sync.get_momentum_history, guild_id, channel_id)
+    
+    async def get_all_momentum_pools(self, guild_id: int) -> Dict[int, MomentumPool]:
+        return await self._run(self.sync.get_all_momentum_pools, guild_id)
+    
+    async def save_extralife_cache(self, data: Dict[str, Any], validators: Optional[Dict[str, Dict[str, Any]]] = None):
+        await self._run(self.sync.save_extralife_cache, data, validators)
+    
+    async def forget_extralife_cache(self, endpoints: Sequence[str]):
+        await self._run(self.sync.forget_extralife_cache, endpoints)
+    
+    async def load_extralife_validators(self, endpoints: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        if self.sync.extralife_cache_loaded:
+            return self.sync.load_extralife_validators(endpoints)
+        return await self._run(self.sync.load_extralife_validators, endpoints)
+    
+    async def load_extralife_cache(self, endpoints: Sequence[str]) -> Optional[Dict[str, Any]]:
+        # Once the cache is in memory, reads skip the executor as well as the disk
+        if self.sync.extralife_cache_loaded:
+            return self.sync.load_extralife_cache(endpoints)
+        return await self._run(self.sync.load_extralife_cache, endpoints)
+    
+    async def load_extralife_registrations(self) -> Dict[int, Dict[str, Any]]:
+        return await self._run(self.sync.load_extralife_registrations)
+    
+    async def save_extralife_registration(self, guild_id: int, registration: Optional[Dict[str, Any]]):
+        await self._run(self.sync.save_extralife_registration, guild_id, registration)
+    
+    async def load_donation_cursors(self) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self.sync.load_donation_cursors)
+    
+    async def save_donation_cursor(self, endpoint: str, cursor: Dict[str, Any]):
+        await self._run(self.sync.save_donation_cursor, endpoint, cursor)
@@ -1,88 +1,286 @@
 """Core dice rolling engines for different RPG systems."""
 
-import random
-from typing import List, Tuple, Dict, Any
+import math
+from typing import List, Tuple, Dict, Any, Optional, Sequence, Union
 from dataclasses import dataclass
-from enum import Enum
+from utils.dice_expressions import DiceExpression, compile_expression
+from utils.dice_results import (
+    DiceSystem, DiceResult, StandardResult, LargePoolResult, ExplodingResult, WoDResult, DuneResult,
+    DuneGroupResult, index_mask
+)
+from utils.dice_rng import RandomBackend, current_rng
 
-class DiceSystem(Enum):
-    """Supported dice systems."""
-    STANDARD = "standard"
-    EXPLODING = "exploding"
-    WORLD_OF_DARKNESS = "wod"
-    DUNE_2D20 = "dune"
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch rolls fall back to pure Python
+    np = None
+
+# Dice limits for regular rolls, where every die is kept in DiceResult.rolls
+MAX_DICE = 100
+MAX_SIDES = 1000
+
+# Large pools only keep a face histogram, so they can be much bigger
+MAX_LARGE_POOL_DICE = 5_000_000
+
+# Hard cap on explosions per die. A roll of N exploding dice draws at most
+# N * (MAX_EXPLOSIONS + 1) faces, whatever the sides or threshold.
+MAX_EXPLOSIONS = 20
+
+EXPLODE_MODES = ('explode', 'compound', 'penetrate')
 
 @dataclass
-class DiceResult:
-    """Result of a dice roll."""
-    rolls: List[int]
-    total: int
-    successes: int = 0
-    complications: int = 0
-    botch: bool = False
-    exploded_dice: List[int] = None
-    system: DiceSystem = DiceSystem.STANDARD
+class BatchResult:
+    """Columnar result of many independent rolls of the same system.
+    
+    Each column holds one entry per roll. Columns are NumPy arrays when
+    NumPy is installed and plain lists otherwise.
+    """
+    system: DiceSystem
+    totals: Sequence[int]
+    successes: Sequence[int]
+    complications: Sequence[int]
+    botches: Sequence[bool]
     details: Dict[str, Any] = None
     
     def __post_init__(self):
-        if self.exploded_dice is None:
-            self.exploded_dice = []
         if self.details is None:
             self.details = {}
+    
+    def __len__(self) -> int:
+        return len(self.totals)
+
+def _sample_binomial(rng: RandomBackend, n: int, p: float) -> int:
+    """Draw from Binomial(n, p) exactly, without rolling n dice one by one."""
+    if n <= 0 or p <= 0:
+        return 0
+    if p >= 1:
+        return n
+    if n < 64:
+        return sum(1 for _ in range(n) if rng.random() < p)
+    if p > 0.5:
+        return n - _sample_binomial(rng, n, 1 - p)
+    if n * p < 30:
+        # Inversion by geometric waiting times between successes
+        log_q = math.log1p(-p)
+        successes = 0
+        position = 0
+        while True:
+            position += int(math.log(1.0 - rng.random()) / log_q) + 1
+            if position > n:
+                return successes
+            successes += 1
+    # Inversion searching outward from the mode: one uniform, and about a
+    # standard deviation of steps, each updating the pmf by its ratio
+    q = 1 - p
+    mode = min(n, int((n + 1) * p))
+    mode_p = math.exp(
+        math.lgamma(n + 1) - math.lgamma(mode + 1) - math.lgamma(n - mode + 1)
+        + mode * math.log(p) + (n - mode) * math.log(q)
+    )
+    u = rng.random() - mode_p
+    if u < 0:
+        return mode
+    low, low_p, high, high_p = mode, mode_p, mode, mode_p
+    while low > 0 or high < n:
+        if high < n:
+            high_p *= (n - high) / (high + 1) * p / q
+            high += 1
+            u -= high_p
+            if u < 0:
+                return high
+        if low > 0:
+            low_p *= low / (n - low + 1) * q / p
+            low -= 1
+            u -= low_p
+            if u < 0:
+                return low
+    # Only rounding in the pmf sums leaves u >= 0 here
+    return mode
 
 class DiceEngine:
-    """Core dice rolling engine."""
+    """Core dice rolling engine.
+    
+    Randomness comes from ``utils.dice_rng.current_rng()``; wrap calls in
+    ``use_rng``/``channel_rng`` to pick a backend or per-channel stream.
+    """
     
     @staticmethod
     def roll_dice(count: int, sides: int) -> List[int]:
         """Roll a number of dice with specified sides."""
-        return [random.randint(1, sides) for _ in range(count)]
+        return current_rng().roll(count, sides)
     
     @staticmethod
-    def standard_roll(count: int, sides: int, modifier: int = 0) -> DiceResult:
+    def standard_roll(count: int, sides: int, modifier: int = 0) -> StandardResult:
         """Standard dice roll with optional modifier."""
         rolls = DiceEngine.roll_dice(count, sides)
         total = sum(rolls) + modifier
         
-        return DiceResult(
+        return StandardResult(rolls=rolls, total=total, modifier=modifier)
+    
+    @staticmethod
+    def expression_roll(expression: DiceExpression) -> StandardResult:
+        """Roll a compiled dice expression (multiple terms, keep/drop, rerolls)."""
+        outcome = expression.evaluate(DiceEngine.roll_dice, DiceEngine._explode_term)
+        
+        rolls = []
+        dropped = []
+        for term in outcome.terms:
+            for roll, kept in zip(term.rolls, term.kept):
+                if not kept:
+                    dropped.append(len(rolls))
+                rolls.append(roll)
+        
+        return StandardResult(
             rolls=rolls,
+            total=outcome.total,
+            modifier=expression.constant,
+            expression=expression.notation,
+            dropped_mask=index_mask(dropped)
+        )
+    
+    @staticmethod
+    def face_histogram(count: int, sides: int) -> List[int]:
+        """Sample how many of ``count`` dice landed on each face.
+        
+        Index ``i`` holds the number of dice showing ``i + 1``. This is a
+        single multinomial draw, so the cost depends on ``sides``, not ``count``.
+        """
+        rng = current_rng()
+        if np is not None:
+            return rng.numpy_generator().multinomial(count, np.full(sides, 1.0 / sides)).tolist()
+        
+        # Sequential conditional binomials: each face takes its share of what is left
+        histogram = []
+        remaining = count
+        for face in range(sides - 1):
+            drawn = _sample_binomial(rng, remaining, 1.0 / (sides - face))
+            histogram.append(drawn)
+            remaining -= drawn
+        histogram.append(remaining)
+        return histogram
+    
+    @staticmethod
+    def large_pool_roll(count: int, sides: int, modifier: int = 0,
+                        keep: Optional[Tuple[str, int]] = None) -> LargePoolResult:
+        """Roll a huge pool as a face histogram instead of individual dice.
+        
+        ``keep`` is an optional ('kh'|'kl'|'dh'|'dl', n) selection, applied by
+        walking the histogram from the highest or lowest face.
+        """
+        histogram = DiceEngine.face_histogram(count, sides)
+        kept = list(histogram)
+        
+        if keep:
+            mode, n = keep
+            # Dropping the n highest is keeping the count - n lowest, and vice versa
+            if mode == 'dh':
+                mode, n = 'kl', count - n
+            elif mode == 'dl':
+                mode, n = 'kh', count - n
+            faces = range(sides - 1, -1, -1) if mode == 'kh' else range(sides)
+            remaining = n
+            for face in faces:
+                kept[face] = min(kept[face], remaining)
+                remaining -= kept[face]
+        
+        total = sum((face + 1) * n for face, n in enumerate(kept)) + modifier
+        
+        return LargePoolResult(
             total=total,
-            system=DiceSystem.STANDARD,
-            details={'modifier': modifier}
+            histogram=histogram,
+            modifier=modifier,
+            kept_count=sum(kept),
+            keep=keep
         )
     
     @staticmethod
-    def exploding_roll(count: int, sides: int, modifier: int = 0) -> DiceResult:
-        """Exploding dice roll - reroll and add maximum results."""
+    def explosion_chain_length(sides: int, threshold: int, max_explosions: int = MAX_EXPLOSIONS) -> int:
+        """Sample how many times one die explodes, capped at ``max_explosions``.
+        
+        Each roll explodes with probability p = (sides - threshold + 1) / sides,
+        so the chain length is geometric: P(length >= k) = p ** k.
+        """
+        p = (sides - threshold + 1) / sides
+        u = 1.0 - current_rng().random()  # In (0, 1]
+        return min(max_explosions, int(math.log(u) / math.log(p)))
+    
+    @staticmethod
+    def _explode_term(term) -> List[int]:
+        """Roll an exploding expression term."""
+        mode, threshold = term.explode
+        return DiceEngine.explode_dice(term.count, term.sides, threshold, mode)[0]
+    
+    @staticmethod
+    def explode_dice(count: int, sides: int, threshold: Optional[int] = None, mode: str = 'compound',
+                     max_explosions: int = MAX_EXPLOSIONS) -> Tuple[List[int], List[int], int]:
+        """Roll exploding dice in bounded time.
+        
+        Returns (rolls, exploded faces, number of dice that hit the cap).
+        'compound' folds each chain into one value per die, 'explode' lists
+        every die rolled and 'penetrate' does the same with each extra die
+        reduced by one.
+        """
+        threshold = sides if threshold is None else threshold
+        rng = current_rng()
         rolls = []
         exploded = []
+        capped = 0
         
         for _ in range(count):
-            die_total = 0
-            while True:
-                roll = random.randint(1, sides)
-                die_total += roll
-                
-                if roll == sides:
-                    exploded.append(roll)
-                else:
-                    break
+            length = DiceEngine.explosion_chain_length(sides, threshold, max_explosions)
+            chain = [rng.randint(threshold, sides) for _ in range(length)]
+            exploded.extend(chain)
+            if length == max_explosions:
+                # The cap stops the chain, so the final face is unconstrained
+                chain.append(rng.randint(1, sides))
+                capped += 1
+            else:
+                chain.append(rng.randint(1, threshold - 1))
             
-            rolls.append(die_total)
+            if mode == 'penetrate':
+                chain = chain[:1] + [roll - 1 for roll in chain[1:]]
+            if mode == 'compound':
+                rolls.append(sum(chain))
+            else:
+                rolls.extend(chain)
+        
+        return rolls, exploded, capped
+    
+    @staticmethod
+    def exploding_roll(count: int, sides: int, modifier: int = 0, threshold: Optional[int] = None,
+                       mode: str = 'compound', max_explosions: int = MAX_EXPLOSIONS) -> ExplodingResult:
+        """Exploding dice roll - reroll and add results at or above ``threshold``.
         
+        ``threshold`` defaults to the maximum face. Worst case is
+        ``count * (max_explosions + 1)`` faces drawn.
+        """
+        threshold = sides if threshold is None else threshold
+        DiceParser.validate_explosion(sides, threshold, mode)
+        rolls, exploded, capped = DiceEngine.explode_dice(count, sides, threshold, mode, max_explosions)
         total = sum(rolls) + modifier
         
-        return DiceResult(
+        return ExplodingResult(
             rolls=rolls,
             total=total,
-            exploded_dice=exploded,
-            system=DiceSystem.EXPLODING,
-            details={'modifier': modifier, 'exploded_count': len(exploded)}
+            exploded=exploded,
+            modifier=modifier,
+            threshold=threshold,
+            mode=mode,
+            capped=capped
         )
     
     @staticmethod
-    def world_of_darkness_roll(count: int, difficulty: int = 6, specialty: bool = False) -> DiceResult:
-        """World of Darkness dice roll - count successes, handle botches."""
+    def world_of_darkness_roll(count: int, difficulty: int = 6, specialty: bool = False,
+                               show_dice: bool = True) -> WoDResult:
+        """World of Darkness dice roll - count successes, handle botches.
+        
+        With ``show_dice=False`` the pool is drawn as one multinomial sample
+        of face counts, so the cost no longer grows with ``count`` and
+        ``rolls`` is left empty.
+        """
+        if not show_dice:
+            return DiceEngine._world_of_darkness_counts(count, difficulty, specialty)
+        
         rolls = DiceEngine.roll_dice(count, 10)
         
         successes = 0
@@ -103,109 +301,322 @@ class DiceEngine:
         # Net successes (1s subtract from successes in some WoD variants)
         net_successes = max(0, successes - ones) if not specialty else successes
         
-        return DiceResult(
+        return WoDResult(
             rolls=rolls,
             total=sum(rolls),
             successes=net_successes,
             botch=botch,
-            system=DiceSystem.WORLD_OF_DARKNESS,
-            details={
-                'difficulty': difficulty,
-                'ones': ones,
-                'raw_successes': successes,
-                'specialty': specialty
-            }
+            difficulty=difficulty,
+            ones=ones,
+            raw_successes=successes,
+            specialty=specialty
         )
     
     @staticmethod
-    def dune_2d20_roll(target: int, bonus_dice: int = 0) -> DiceResult:
-        """Dune 2d20 system roll - count successes and complications."""
-        # Roll 2d20 + bonus dice
-        total_dice = 2 + bonus_dice
-        rolls = DiceEngine.roll_dice(total_dice, 20)
+    def _world_of_darkness_counts(count: int, difficulty: int, specialty: bool) -> WoDResult:
+        """WoD roll resolved from a face histogram instead of individual dice."""
+        histogram = DiceEngine.face_histogram(count, 10)
+        tens = histogram[9]
+        successes = sum(histogram[difficulty - 1:]) + (tens if specialty else 0)
+        ones = histogram[0] if difficulty > 1 else 0
         
-        successes = 0
-        complications = 0
+        return WoDResult(
+            rolls=(),
+            total=sum((face + 1) * n for face, n in enumerate(histogram)),
+            successes=successes if specialty else max(0, successes - ones),
+            botch=successes == 0 and ones > 0,
+            difficulty=difficulty,
+            ones=ones,
+            raw_successes=successes,
+            specialty=specialty,
+            tens=tens,
+            dice_count=count
+        )
+    
+    @staticmethod
+    def dune_2d20_roll(target: int, bonus_dice: int = 0, focus: Optional[int] = None) -> DuneResult:
+        """Dune 2d20 system roll - count successes and complications.
+        
+        With a ``focus`` (the skill rating), dice at or under it score two
+        successes.
+        """
+        # Roll 2d20 + bonus dice
+        rolls = DiceEngine.roll_dice(2 + bonus_dice, 20)
+        return DiceEngine._dune_result(rolls, target, bonus_dice, focus)
+    
+    @staticmethod
+    def _dune_result(rolls: List[int], target: int, bonus_dice: int, focus: Optional[int]) -> DuneResult:
+        """Score already-rolled Dune dice; only the two lowest (best) count."""
+        def die_successes(roll: int) -> int:
+            if focus is not None and roll <= focus:
+                return 2
+            return 1 if roll <= target else 0
         
         # Count successes (rolls <= target) and complications (20s)
-        for roll in rolls:
-            if roll <= target:
-                successes += 1
-            if roll == 20:
-                complications += 1
-        
-        # For bonus dice, only count the best results
-        if bonus_dice > 0:
-            # Sort rolls to identify which are the "main" 2d20
-            sorted_rolls = sorted(rolls)
-            main_rolls = sorted_rolls[:2]  # Take the two lowest (best) rolls
+        successes = sum(die_successes(roll) for roll in rolls)
+        complications = sum(1 for roll in rolls if roll == 20)
+        
+        # For bonus dice, only the two lowest (best) rolls count
+        used = sorted(range(len(rolls)), key=rolls.__getitem__)[:2]
+        main_rolls = [rolls[i] for i in used]
+        
+        return DuneResult(
+            rolls=rolls,
+            total=sum(rolls),
+            successes=sum(die_successes(roll) for roll in main_rolls),
+            complications=sum(1 for roll in main_rolls if roll == 20),
+            target=target,
+            bonus_dice=bonus_dice,
+            used_mask=index_mask(used),
+            all_successes=successes,
+            all_complications=complications,
+            focus=focus
+        )
+    
+    @staticmethod
+    def dune_group_roll(target: int, focus: Optional[int] = None, bonus_dice: int = 0,
+                        assistants: Sequence[Tuple[int, Optional[int]]] = ()) -> DuneGroupResult:
+        """Assisted Dune roll: the leader rolls 2d20 plus bonus dice, each
+        assistant one d20 against their own (target, focus).
+        
+        Every die is drawn in a single engine call. Assistants' successes
+        only count when the leader succeeds; all complications count.
+        """
+        leader_dice = 2 + bonus_dice
+        rolls = DiceEngine.roll_dice(leader_dice + len(assistants), 20)
+        
+        leader = DiceEngine._dune_result(rolls[:leader_dice], target, bonus_dice, focus)
+        helpers = tuple(
+            DiceEngine._dune_result(rolls[leader_dice + i:leader_dice + i + 1], assist_target, 0, assist_focus)
+            for i, (assist_target, assist_focus) in enumerate(assistants)
+        )
+        return DuneGroupResult(leader, helpers)
+    
+    @staticmethod
+    def roll_batch(system: Union[DiceSystem, str], n_rolls: int, count: int = 1, sides: int = 6,
+                   modifier: int = 0, difficulty: int = 6, specialty: bool = False,
+                   target: int = 10, bonus_dice: int = 0, threshold: Optional[int] = None,
+                   explode_mode: str = 'compound', max_explosions: int = MAX_EXPLOSIONS) -> BatchResult:
+        """Roll ``n_rolls`` independent rolls of one system in a single call.
+        
+        ``count``/``sides``/``modifier`` apply to standard and exploding rolls,
+        ``threshold``/``explode_mode``/``max_explosions`` to exploding rolls,
+        ``count``/``difficulty``/``specialty`` to World of Darkness and
+        ``target``/``bonus_dice`` to Dune 2d20.
+        """
+        system = DiceSystem(system)
+        if n_rolls < 1:
+            raise ValueError("Number of rolls must be at least 1")
+        
+        if system == DiceSystem.EXPLODING:
+            threshold = sides if threshold is None else threshold
+            DiceParser.validate_explosion(sides, threshold, explode_mode)
+        
+        if np is None:
+            return DiceEngine._roll_batch_python(
+                system, n_rolls, count, sides, modifier, difficulty, specialty, target, bonus_dice,
+                threshold, explode_mode, max_explosions
+            )
+        
+        rng = current_rng().numpy_generator()
+        zeros = np.zeros(n_rolls, dtype=np.int64)
+        no_botch = np.zeros(n_rolls, dtype=bool)
+        
+        if system == DiceSystem.STANDARD:
+            dice = rng.integers(1, sides + 1, size=(n_rolls, count))
+            return BatchResult(
+                system=system,
+                totals=dice.sum(axis=1) + modifier,
+                successes=zeros,
+                complications=zeros.copy(),
+                botches=no_botch,
+                details={'modifier': modifier}
+            )
+        
+        if system == DiceSystem.EXPLODING:
+            # Chain lengths are geometric, so every die is resolved in at most
+            # max_explosions vectorized passes
+            p = (sides - threshold + 1) / sides
+            lengths = np.minimum(rng.geometric(1 - p, size=(n_rolls, count)) - 1, max_explosions)
             
-            # Recalculate with only main rolls for final result
-            main_successes = sum(1 for roll in main_rolls if roll <= target)
-            main_complications = sum(1 for roll in main_rolls if roll == 20)
+            dice = np.zeros((n_rolls, count), dtype=np.int64)
+            for level in range(int(lengths.max(initial=0))):
+                live = lengths > level
+                dice[live] += rng.integers(threshold, sides + 1, size=int(live.sum()))
+            capped = lengths == max_explosions
+            dice[capped] += rng.integers(1, sides + 1, size=int(capped.sum()))
+            dice[~capped] += rng.integers(1, threshold, size=int((~capped).sum()))
+            if explode_mode == 'penetrate':
+                dice -= lengths
             
-            return DiceResult(
-                rolls=rolls,
-                total=sum(rolls),
-                successes=main_successes,
-                complications=main_complications,
-                system=DiceSystem.DUNE_2D20,
+            return BatchResult(
+                system=system,
+                totals=dice.sum(axis=1) + modifier,
+                successes=zeros,
+                complications=zeros.copy(),
+                botches=no_botch,
                 details={
-                    'target': target,
-                    'bonus_dice': bonus_dice,
-                    'main_rolls': main_rolls,
-                    'all_successes': successes,
-                    'all_complications': complications
+                    'modifier': modifier,
+                    'exploded_count': lengths.sum(axis=1),
+                    'threshold': threshold,
+                    'mode': explode_mode,
+                    'capped': capped.sum(axis=1)
                 }
             )
         
-        return DiceResult(
-            rolls=rolls,
-            total=sum(rolls),
-            successes=successes,
-            complications=complications,
-            system=DiceSystem.DUNE_2D20,
-            details={
-                'target': target,
-                'bonus_dice': bonus_dice
+        if system == DiceSystem.WORLD_OF_DARKNESS:
+            # One multinomial draw of face counts per roll, independent of pool size
+            faces = rng.multinomial(count, np.full(10, 0.1), size=n_rolls)
+            raw_successes = faces[:, difficulty - 1:].sum(axis=1)
+            if specialty:
+                raw_successes += faces[:, 9]
+            ones = faces[:, 0] if difficulty > 1 else np.zeros(n_rolls, dtype=np.int64)
+            if specialty:
+                successes = raw_successes
+            else:
+                successes = np.maximum(0, raw_successes - ones)
+            return BatchResult(
+                system=system,
+                totals=faces @ np.arange(1, 11),
+                successes=successes,
+                complications=zeros,
+                botches=(raw_successes == 0) & (ones > 0),
+                details={
+                    'difficulty': difficulty,
+                    'ones': ones,
+                    'raw_successes': raw_successes,
+                    'specialty': specialty
+                }
+            )
+        
+        # Dune 2d20: with bonus dice only the two lowest (best) dice count
+        dice = rng.integers(1, 21, size=(n_rolls, 2 + bonus_dice))
+        main = np.sort(dice, axis=1)[:, :2] if bonus_dice > 0 else dice
+        return BatchResult(
+            system=system,
+            totals=dice.sum(axis=1),
+            successes=(main <= target).sum(axis=1),
+            complications=(main == 20).sum(axis=1),
+            botches=no_botch,
+            details={'target': target, 'bonus_dice': bonus_dice}
+        )
+    
+    @staticmethod
+    def _roll_batch_python(system: DiceSystem, n_rolls: int, count: int, sides: int, modifier: int,
+                           difficulty: int, specialty: bool, target: int, bonus_dice: int,
+                           threshold: Optional[int], explode_mode: str, max_explosions: int) -> BatchResult:
+        """Pure-Python batch fallback built from the single-roll engines."""
+        if system == DiceSystem.STANDARD:
+            results = [DiceEngine.standard_roll(count, sides, modifier) for _ in range(n_rolls)]
+            details = {'modifier': modifier}
+        elif system == DiceSystem.EXPLODING:
+            results = [
+                DiceEngine.exploding_roll(count, sides, modifier, threshold, explode_mode, max_explosions)
+                for _ in range(n_rolls)
+            ]
+            details = {
+                'modifier': modifier,
+                'exploded_count': [r.exploded_count for r in results],
+                'threshold': threshold,
+                'mode': explode_mode,
+                'capped': [r.capped for r in results]
+            }
+        elif system == DiceSystem.WORLD_OF_DARKNESS:
+            results = [
+                DiceEngine.world_of_darkness_roll(count, difficulty, specialty, show_dice=False)
+                for _ in range(n_rolls)
+            ]
+            details = {
+                'difficulty': difficulty,
+                'ones': [r.ones for r in results],
+                'raw_successes': [r.raw_successes for r in results],
+                'specialty': specialty
             }
+        else:
+            results = [DiceEngine.dune_2d20_roll(target, bonus_dice) for _ in range(n_rolls)]
+            details = {'target': target, 'bonus_dice': bonus_dice}
+        
+        return BatchResult(
+            system=system,
+            totals=[r.total for r in results],
+            successes=[r.successes for r in results],
+            complications=[r.complications for r in results],
+            botches=[r.botch for r in results],
+            details=details
         )
 
 class DiceParser:
     """Parse dice notation strings."""
     
     @staticmethod
-    def parse_standard_notation(notation: str) -> Tuple[int, int, int]:
-        """Parse standard dice notation like '3d6+2' or '2d10-1'."""
-        # Remove spaces
-        notation = notation.replace(' ', '').lower()
-        
-        # Handle modifier
-        modifier = 0
-        if '+' in notation:
-            parts = notation.split('+')
-            notation = parts[0]
-            modifier = int(parts[1])
-        elif '-' in notation:
-            parts = notation.split('-')
-            notation = parts[0]
-            modifier = -int(parts[1])
-        
-        # Parse dice notation
-        if 'd' not in notation:
-            raise ValueError("Invalid dice notation - must contain 'd'")
+    def compile(notation: str, large_pool: bool = False) -> DiceExpression:
+        """Compile notation like '2d6+1d4+2' or '4d6kh3' and validate its dice.
         
-        count_str, sides_str = notation.split('d')
-        count = int(count_str) if count_str else 1
-        sides = int(sides_str)
+        Compiled expressions are cached by normalized notation, so repeat
+        inputs skip tokenizing and parsing. With ``large_pool`` a single
+        NdS term (optionally with keep/drop and a modifier) may exceed
+        MAX_DICE; roll it with ``DiceEngine.large_pool_roll``.
+        """
+        expression = compile_expression(notation)
+        if not expression.dice_terms:
+            raise ValueError("Invalid dice notation - must contain 'd'")
+        for term in expression.dice_terms:
+            DiceParser.validate_dice_parameters(term.count, term.sides, large_pool)
+            if term.explode:
+                DiceParser.validate_explosion(term.sides, term.explode[1], term.explode[0])
+        if expression.total_dice > MAX_DICE:
+            if not large_pool:
+                raise ValueError(f"Dice count must be between 1 and {MAX_DICE}")
+            single = expression.single_term()
+            if single is None or single[0].reroll or single[0].explode:
+                raise ValueError(
+                    f"Pools over {MAX_DICE} dice must be a single NdS term with optional keep/drop and modifier"
+                )
+        return expression
+    
+    @staticmethod
+    def parse_standard_notation(notation: str) -> Tuple[int, int, int]:
+        """Parse single-term dice notation like '3d6+2' or '2d10-1'."""
+        expression = compile_expression(notation)
+        simple = expression.as_simple()
+        if simple is None:
+            if not expression.dice_terms:
+                raise ValueError("Invalid dice notation - must contain 'd'")
+            raise ValueError(f"'{expression.notation}' must be a single NdS±M term for this system")
+        return simple
+    
+    @staticmethod
+    def parse_exploding_notation(notation: str) -> Tuple[int, int, int, str, int]:
+        """Parse exploding notation like '3d6', '3d6!>=5', '2d10!!' or '4d6!p+1'.
         
-        return count, sides, modifier
+        Returns (count, sides, modifier, mode, threshold). Without an explicit
+        '!' suffix, dice compound on their maximum face.
+        """
+        expression = compile_expression(notation)
+        single = expression.single_term()
+        if single is None or single[0].keep or single[0].reroll:
+            if not expression.dice_terms:
+                raise ValueError("Invalid dice notation - must contain 'd'")
+            raise ValueError(f"'{expression.notation}' must be a single NdS±M term for this system")
+        term, modifier = single
+        mode, threshold = term.explode or ('compound', term.sides)
+        return term.count, term.sides, modifier, mode, threshold
+    
+    @staticmethod
+    def validate_explosion(sides: int, threshold: int, mode: str) -> bool:
+        """Validate an explode threshold and mode."""
+        if mode not in EXPLODE_MODES:
+            raise ValueError(f"Explode mode must be one of: {', '.join(EXPLODE_MODES)}")
+        if threshold < 2 or threshold > sides:
+            raise ValueError(f"Explode threshold must be between 2 and {sides}")
+        return True
     
     @staticmethod
-    def validate_dice_parameters(count: int, sides: int) -> bool:
+    def validate_dice_parameters(count: int, sides: int, large_pool: bool = False) -> bool:
         """Validate dice parameters are reasonable."""
-        if count < 1 or count > 100:
-            raise ValueError("Dice count must be between 1 and 100")
-        if sides < 2 or sides > 1000:
-            raise ValueError("Dice sides must be between 2 and 1000")
+        max_count = MAX_LARGE_POOL_DICE if large_pool else MAX_DICE
+        if count < 1 or count > max_count:
+            raise ValueError(f"Dice count must be between 1 and {max_count:,}")
+        if sides < 2 or sides > MAX_SIDES:
+            raise ValueError(f"Dice sides must be between 2 and {MAX_SIDES}")
         return True
@@ -0,0 +1,393 @@
+"""Tokenizer and compiler for dice expressions like '2d6+1d4+2' or '4d6kh3'."""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union
+
+# Longest notation accepted, to keep parsing and caching cheap
+MAX_NOTATION_LENGTH = 100
+
+# Compiled expressions kept around for repeat rolls
+EXPRESSION_CACHE_SIZE = 256
+
+# Upper bound on rerolls for a single die, so reroll loops always terminate
+MAX_REROLLS = 100
+
+# Modifiers are matched before 'd' so 'dh'/'dl' are not read as dice
+_TOKEN_PATTERN = re.compile(r'(\d+)|(kh|kl|dh|dl|ro|k|r)|(d%|d)|(!!|!p|!)|([<>]=?|=)|([-+*/()])')
+
+# Explode suffixes and the mode each selects
+_EXPLODE_TOKENS = {'!': 'explode', '!!': 'compound', '!p': 'penetrate'}
+_EXPLODE_SUFFIXES = {mode: token for token, mode in _EXPLODE_TOKENS.items()}
+
+Roller = Callable[[int, int], List[int]]
+Exploder = Callable[['Dice'], List[int]]
+
+@dataclass(frozen=True)
+class Number:
+    """Integer constant."""
+    value: int
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+@dataclass(frozen=True)
+class Dice:
+    """A dice term with optional keep/drop and reroll modifiers."""
+    count: int
+    sides: int
+    keep: Optional[Tuple[str, int]] = None  # ('kh'|'kl'|'dh'|'dl', n)
+    reroll: Optional[Tuple[str, int, bool]] = None  # (comparison, value, once)
+    explode: Optional[Tuple[str, int]] = None  # (mode, threshold)
+
+    def __str__(self) -> str:
+        text = f"{self.count}d{self.sides}"
+        if self.explode:
+            mode, threshold = self.explode
+            text += _EXPLODE_SUFFIXES[mode] + ('' if threshold == self.sides else f">={threshold}")
+        if self.reroll:
+            comparison, value, once = self.reroll
+            text += f"{'ro' if once else 'r'}{'' if comparison == '=' else comparison}{value}"
+        if self.keep:
+            text += f"{self.keep[0]}{self.keep[1]}"
+        return text
+
+    def rerolls(self, roll: int) -> bool:
+        """Whether a face triggers this term's reroll condition."""
+        if not self.reroll:
+            return False
+        comparison, value, _ = self.reroll
+        return {
+            '=': roll == value,
+            '<': roll < value,
+            '<=': roll <= value,
+            '>': roll > value,
+            '>=': roll >= value,
+        }[comparison]
+
+@dataclass(frozen=True)
+class Negate:
+    """Unary minus."""
+    operand: 'Node'
+
+    def __str__(self) -> str:
+        if isinstance(self.operand, BinaryOp):
+            return f"-({self.operand})"
+        return f"-{self.operand}"
+
+@dataclass(frozen=True)
+class BinaryOp:
+    """Arithmetic on two sub-expressions. Division rounds down."""
+    op: str
+    left: 'Node'
+    right: 'Node'
+
+    def __str__(self) -> str:
+        right = f"({self.right})" if isinstance(self.right, BinaryOp) and self.op in '-*/' else str(self.right)
+        left = f"({self.left})" if isinstance(self.left, BinaryOp) and self.op in '*/' else str(self.left)
+        return f"{left}{self.op}{right}"
+
+Node = Union[Number, Dice, Negate, BinaryOp]
+
+@dataclass
+class TermResult:
+    """Dice rolled for one term of an expression."""
+    notation: str
+    rolls: List[int]
+    kept: List[bool]
+
+    @property
+    def kept_rolls(self) -> List[int]:
+        return [roll for roll, keep in zip(self.rolls, self.kept) if keep]
+
+@dataclass
+class ExpressionResult:
+    """Outcome of evaluating a compiled expression."""
+    total: int
+    terms: List[TermResult] = field(default_factory=list)
+
+class DiceExpression:
+    """A compiled, reusable dice expression."""
+
+    def __init__(self, root: Node):
+        self.root = root
+        self.notation = str(root)
+        self.dice_terms: List[Dice] = []
+        self._collect_dice(root)
+
+    def _collect_dice(self, node: Node):
+        if isinstance(node, Dice):
+            self.dice_terms.append(node)
+        elif isinstance(node, Negate):
+            self._collect_dice(node.operand)
+        elif isinstance(node, BinaryOp):
+            self._collect_dice(node.left)
+            self._collect_dice(node.right)
+
+    @property
+    def total_dice(self) -> int:
+        return sum(term.count for term in self.dice_terms)
+
+    @property
+    def constant(self) -> int:
+        """Sum of the constants added to or subtracted from the whole expression, e.g. 2 in ``4d6kh3+2``."""
+        return self._additive_constant(self.root)
+
+    def _additive_constant(self, node: Node, sign: int = 1) -> int:
+        if isinstance(node, Number):
+            return sign * node.value
+        if isinstance(node, Negate):
+            return self._additive_constant(node.operand, -sign)
+        if isinstance(node, BinaryOp) and node.op in '+-':
+            return (self._additive_constant(node.left, sign)
+                    + self._additive_constant(node.right, sign if node.op == '+' else -sign))
+        # Dice, and constants inside products, are not a flat modifier
+        return 0
+
+    def single_term(self) -> Optional[Tuple[Dice, int]]:
+        """Return (dice term, modifier) if this is one dice term plus constants."""
+        if len(self.dice_terms) != 1:
+            return None
+        term = self.dice_terms[0]
+        modifier = self._linear_modifier(self.root, term)
+        if modifier is None:
+            return None
+        return term, modifier
+
+    def as_simple(self) -> Optional[Tuple[int, int, int]]:
+        """Return (count, sides, modifier) if this is a plain NdS±M expression."""
+        single = self.single_term()
+        if single is None:
+            return None
+        term, modifier = single
+        if term.keep or term.reroll or term.explode:
+            return None
+        return term.count, term.sides, modifier
+
+    def _linear_modifier(self, node: Node, term: Dice, sign: int = 1) -> Optional[int]:
+        """Sum of constants added to ``term`` with a positive sign, if purely additive."""
+        if node is term:
+            return 0 if sign == 1 else None
+        if isinstance(node, Number):
+            return sign * node.value
+        if isinstance(node, Negate):
+            return self._linear_modifier(node.operand, term, -sign)
+        if isinstance(node, BinaryOp) and node.op in '+-':
+            left = self._linear_modifier(node.left, term, sign)
+            right = self._linear_modifier(node.right, term, sign if node.op == '+' else -sign)
+            if left is None or right is None:
+                return None
+            return left + right
+        return None
+
+    def evaluate(self, roller: Roller, exploder: Optional[Exploder] = None) -> ExpressionResult:
+        """Roll every dice term with ``roller(count, sides)`` and compute the total.
+
+        Exploding terms are rolled with ``exploder(term)``, which is required
+        when the expression contains any.
+        """
+        terms: List[TermResult] = []
+        total = self._evaluate(self.root, roller, exploder, terms)
+        return ExpressionResult(total=total, terms=terms)
+
+    def _evaluate(self, node: Node, roller: Roller, exploder: Optional[Exploder],
+                  terms: List[TermResult]) -> int:
+        if isinstance(node, Number):
+            return node.value
+        if isinstance(node, Negate):
+            return -self._evaluate(node.operand, roller, exploder, terms)
+        if isinstance(node, Dice):
+            term = self._roll_term(node, roller, exploder)
+            terms.append(term)
+            return sum(term.kept_rolls)
+
+        left = self._evaluate(node.left, roller, exploder, terms)
+        right = self._evaluate(node.right, roller, exploder, terms)
+        if node.op == '+':
+            return left + right
+        if node.op == '-':
+            return left - right
+        if node.op == '*':
+            return left * right
+        if right == 0:
+            raise ValueError("Division by zero in dice expression")
+        return left // right
+
+    @staticmethod
+    def _roll_term(node: Dice, roller: Roller, exploder: Optional[Exploder]) -> TermResult:
+        if node.explode:
+            if exploder is None:
+                raise ValueError(f"Exploding dice are not supported here: {node}")
+            rolls = exploder(node)
+        else:
+            rolls = roller(node.count, node.sides)
+
+        if node.reroll:
+            once = node.reroll[2]
+            for i, roll in enumerate(rolls):
+                attempts = 0
+                while node.rerolls(roll) and attempts < MAX_REROLLS:
+                    roll = roller(1, node.sides)[0]
+                    attempts += 1
+                    if once:
+                        break
+                rolls[i] = roll
+
+        kept = [True] * len(rolls)
+        if node.keep:
+            mode, n = node.keep
+            # Indices ordered from lowest to highest roll
+            order = sorted(range(len(rolls)), key=rolls.__getitem__)
+            if mode == 'kh':
+                dropped = order[:len(rolls) - n]
+            elif mode == 'kl':
+                dropped = order[n:]
+            elif mode == 'dh':
+                dropped = order[len(rolls) - n:]
+            else:
+                dropped = order[:n]
+            for i in dropped:
+                kept[i] = False
+
+        return TermResult(notation=str(node), rolls=rolls, kept=kept)
+
+class _Parser:
+    """Recursive-descent parser producing an expression AST."""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of dice notation")
+        self.pos += 1
+        return token
+
+    def take_number(self) -> int:
+        token = self.take()
+        if not token.isdigit():
+            raise ValueError(f"Expected a number, got '{token}'")
+        return int(token)
+
+    def parse(self) -> Node:
+        node = self.expression()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected '{self.peek()}' in dice notation")
+        return node
+
+    def expression(self) -> Node:
+        node = self.product()
+        while self.peek() in ('+', '-'):
+            op = self.take()
+            node = BinaryOp(op, node, self.product())
+        return node
+
+    def product(self) -> Node:
+        node = self.unary()
+        while self.peek() in ('*', '/'):
+            op = self.take()
+            node = BinaryOp(op, node, self.unary())
+        return node
+
+    def unary(self) -> Node:
+        if self.peek() == '-':
+            self.take()
+            return Negate(self.unary())
+        if self.peek() == '+':
+            self.take()
+            return self.unary()
+        return self.atom()
+
+    def atom(self) -> Node:
+        token = self.peek()
+        if token == '(':
+            self.take()
+            node = self.expression()
+            if self.take() != ')':
+                raise ValueError("Missing closing parenthesis")
+            return node
+
+        count = None
+        if token is not None and token.isdigit():
+            count = self.take_number()
+            if self.peek() not in ('d', 'd%'):
+                return Number(count)
+
+        if self.peek() not in ('d', 'd%'):
+            if token is None:
+                raise ValueError("Unexpected end of dice notation")
+            raise ValueError(f"Unexpected '{token}' in dice notation")
+        sides = 100 if self.take() == 'd%' else self.take_number()
+        return self.dice_modifiers(Dice(count if count is not None else 1, sides))
+
+    def dice_modifiers(self, dice: Dice) -> Dice:
+        keep = None
+        reroll = None
+        explode = None
+        while self.peek() in ('kh', 'kl', 'dh', 'dl', 'k', 'r', 'ro', '!', '!!', '!p'):
+            token = self.take()
+            if token in _EXPLODE_TOKENS:
+                if explode:
+                    raise ValueError(f"More than one explode modifier on {dice}")
+                threshold = dice.sides
+                if self.peek() in ('>', '>='):
+                    comparison = self.take()
+                    threshold = self.take_number() + (1 if comparison == '>' else 0)
+                explode = (_EXPLODE_TOKENS[token], threshold)
+            elif token in ('r', 'ro'):
+                if reroll:
+                    raise ValueError(f"More than one reroll modifier on {dice}")
+                comparison = '='
+                if self.peek() in ('<', '<=', '>', '>=', '='):
+                    comparison = self.take()
+                reroll = (comparison, self.take_number(), token == 'ro')
+            else:
+                if keep:
+                    raise ValueError(f"More than one keep or drop modifier on {dice}")
+                keep = ('kh' if token == 'k' else token, self.take_number())
+
+        if explode and reroll:
+            raise ValueError("Exploding dice cannot also reroll")
+        result = Dice(dice.count, dice.sides, keep, reroll, explode)
+        if keep:
+            mode, n = keep
+            limit = dice.count if mode in ('kh', 'kl') else dice.count - 1
+            if n < (1 if mode in ('kh', 'kl') else 0) or n > limit:
+                raise ValueError(f"Cannot apply '{mode}{n}' to {dice.count} dice")
+        if reroll and all(result.rerolls(face) for face in range(1, dice.sides + 1)):
+            raise ValueError(f"Reroll condition on {result} matches every face")
+        return result
+
+def tokenize(notation: str) -> List[str]:
+    """Split normalized notation into tokens."""
+    tokens = []
+    pos = 0
+    while pos < len(notation):
+        match = _TOKEN_PATTERN.match(notation, pos)
+        if not match:
+            raise ValueError(f"Unexpected character '{notation[pos]}' in dice notation")
+        tokens.append(match.group(0))
+        pos = match.end()
+    return tokens
+
+def normalize_notation(notation: str) -> str:
+    """Canonical cache key: lowercase with whitespace removed."""
+    return ''.join(notation.split()).lower()
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _compile_normalized(notation: str) -> DiceExpression:
+    if not notation:
+        raise ValueError("Dice notation is empty")
+    if len(notation) > MAX_NOTATION_LENGTH:
+        raise ValueError(f"Dice notation must be at most {MAX_NOTATION_LENGTH} characters")
+    return DiceExpression(_Parser(tokenize(notation)).parse())
+
+def compile_expression(notation: str) -> DiceExpression:
+    """Compile notation to a reusable expression, cached by normalized notation."""
+    return _compile_normalized(normalize_notation(notation))
@@ -0,0 +1,252 @@
+"""Exact outcome distributions for the dice engines."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import factorial
+from typing import Dict, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; convolution falls back to pure Python
+    np = None
+
+# Bounded memo size for every distribution below
+CACHE_SIZE = 512
+
+# Standard distributions with more possible totals than this (100d1000 has
+# about 100k, some 12 MB) get a memo of their own, LARGE_CACHE_SIZE entries long
+CACHED_OUTCOMES = 1_000
+LARGE_CACHE_SIZE = 4
+
+# Parameter space accepted by /dune-roll
+DUNE_TARGET_RANGE = range(1, 21)
+DUNE_BONUS_RANGE = range(0, 6)
+
+@dataclass(frozen=True)
+class Distribution:
+    """Discrete probability distribution over integer outcomes."""
+    outcomes: Tuple[Tuple[int, float], ...]
+
+    def as_dict(self) -> Dict[int, float]:
+        """Return the distribution as a value -> probability mapping."""
+        return dict(self.outcomes)
+
+    @property
+    def minimum(self) -> int:
+        return self.outcomes[0][0]
+
+    @property
+    def maximum(self) -> int:
+        return self.outcomes[-1][0]
+
+    @property
+    def mean(self) -> float:
+        return sum(value * p for value, p in self.outcomes)
+
+    def at_least(self, value: int) -> float:
+        """Probability of an outcome greater than or equal to ``value``."""
+        return sum(p for outcome, p in self.outcomes if outcome >= value)
+
+    def at_most(self, value: int) -> float:
+        """Probability of an outcome less than or equal to ``value``."""
+        return sum(p for outcome, p in self.outcomes if outcome <= value)
+
+    def exactly(self, value: int) -> float:
+        """Probability of exactly ``value``."""
+        return sum(p for outcome, p in self.outcomes if outcome == value)
+
+@dataclass(frozen=True)
+class WoDOdds:
+    """Exact odds for a World of Darkness pool."""
+    successes: Distribution
+    botch_chance: float
+
+    @property
+    def success_chance(self) -> float:
+        return self.successes.at_least(1)
+
+@dataclass(frozen=True)
+class DuneOdds:
+    """Exact odds for a Dune 2d20 roll."""
+    successes: Distribution
+    complications: Distribution
+
+    @property
+    def success_chance(self) -> float:
+        return self.successes.at_least(1)
+
+    @property
+    def critical_chance(self) -> float:
+        return self.successes.at_least(2)
+
+    @property
+    def complication_chance(self) -> float:
+        return self.complications.at_least(1)
+
+    @property
+    def expected_momentum(self) -> float:
+        """Expected momentum from successes beyond the first."""
+        return sum(max(0, value - 1) * p for value, p in self.successes.outcomes)
+
+def _to_distribution(probabilities: Dict[int, float]) -> Distribution:
+    """Freeze a probability mapping, dropping impossible outcomes."""
+    return Distribution(tuple(sorted((k, p) for k, p in probabilities.items() if p > 0)))
+
+def _multinomial(counts: Tuple[int, ...], probabilities: Tuple[float, ...]) -> float:
+    """Probability of exactly ``counts`` from a multinomial draw."""
+    coefficient = factorial(sum(counts))
+    result = 1.0
+    for k, p in zip(counts, probabilities):
+        coefficient //= factorial(k)
+        result *= p ** k
+    return coefficient * result
+
+def _standard(count: int, sides: int, modifier: int) -> Distribution:
+    """Distribution of the total of ``count``d``sides`` + ``modifier``."""
+    if np is not None:
+        face = np.full(sides, 1.0 / sides)
+        sums = np.ones(1)
+        for _ in range(count):
+            sums = np.convolve(sums, face)
+        # Index i of the convolution is a total of count + i
+        return _to_distribution({count + i + modifier: float(p) for i, p in enumerate(sums)})
+
+    # Sliding-window convolution: each new die averages a window of ``sides`` totals
+    sums = [1.0]
+    for _ in range(count):
+        prefix = [0.0]
+        for p in sums:
+            prefix.append(prefix[-1] + p)
+        width = len(sums) + sides - 1
+        sums = [
+            (prefix[min(i + 1, len(sums))] - prefix[max(0, i - sides + 1)]) / sides
+            for i in range(width)
+        ]
+    return _to_distribution({count + i + modifier: p for i, p in enumerate(sums)})
+
+_standard_small = lru_cache(maxsize=CACHE_SIZE)(_standard)
+_standard_large = lru_cache(maxsize=LARGE_CACHE_SIZE)(_standard)
+
+class DiceProbability:
+    """Exact, memoized outcome distributions per dice system."""
+
+    @staticmethod
+    def standard(count: int, sides: int, modifier: int = 0) -> Distribution:
+        """Distribution of the total of ``count``d``sides`` + ``modifier``."""
+        if count * (sides - 1) + 1 <= CACHED_OUTCOMES:
+            return _standard_small(count, sides, modifier)
+        return _standard_large(count, sides, modifier)
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def world_of_darkness(count: int, difficulty: int = 6, specialty: bool = False) -> WoDOdds:
+        """Net success distribution and botch chance for a WoD pool."""
+        # Per-die outcome classes matching DiceEngine.world_of_darkness_roll
+        double = 1 if specialty and difficulty <= 10 else 0
+        single = max(0, 10 - difficulty + 1) - double
+        one = 1 if difficulty > 1 else 0
+        other = 10 - double - single - one
+        faces = (
+            (2, 0, double / 10),
+            (1, 0, single / 10),
+            (0, 1, one / 10),
+            (0, 0, other / 10),
+        )
+
+        # Dynamic programming over (raw successes, ones)
+        states = {(0, 0): 1.0}
+        for _ in range(count):
+            next_states: Dict[Tuple[int, int], float] = {}
+            for (successes, ones), p in states.items():
+                for add_successes, add_ones, face_p in faces:
+                    if face_p == 0:
+                        continue
+                    key = (successes + add_successes, ones + add_ones)
+                    next_states[key] = next_states.get(key, 0.0) + p * face_p
+            states = next_states
+
+        net: Dict[int, float] = {}
+        botch = 0.0
+        for (successes, ones), p in states.items():
+            if successes == 0 and ones > 0:
+                botch += p
+            value = successes if specialty else max(0, successes - ones)
+            net[value] = net.get(value, 0.0) + p
+
+        return WoDOdds(successes=_to_distribution(net), botch_chance=botch)
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def dune_2d20(target: int, bonus_dice: int = 0) -> DuneOdds:
+        """Success and complication distributions for a Dune 2d20 roll."""
+        total_dice = 2 + bonus_dice
+        unused = total_dice - 2
+        # Faces split into successes below 20, natural 20s and plain failures
+        p_low = min(target, 19) / 20
+        p_twenty = 1 / 20
+        p_fail = 1 - p_low - p_twenty
+
+        successes: Dict[int, float] = {}
+        complications: Dict[int, float] = {}
+        for low in range(total_dice + 1):
+            for twenties in range(total_dice - low + 1):
+                fail = total_dice - low - twenties
+                p = _multinomial((low, twenties, fail), (p_low, p_twenty, p_fail))
+                if p == 0:
+                    continue
+                # The two kept dice are the lowest, so 20s only count once
+                # every other die has been used up
+                hits = low + (twenties if target >= 20 else 0)
+                kept_successes = min(2, hits)
+                kept_complications = max(0, twenties - unused)
+                successes[kept_successes] = successes.get(kept_successes, 0.0) + p
+                complications[kept_complications] = complications.get(kept_complications, 0.0) + p
+
+        return DuneOdds(
+            successes=_to_distribution(successes),
+            complications=_to_distribution(complications)
+        )
+
+    @staticmethod
+    def cache_clear():
+        """Drop all memoized distributions."""
+        _standard_small.cache_clear()
+        _standard_large.cache_clear()
+        DiceProbability.world_of_darkness.cache_clear()
+        DiceProbability.dune_2d20.cache_clear()
+
+@dataclass(frozen=True)
+class DuneOutcome:
+    """Headline chances for one (target, bonus dice) Dune roll."""
+    success: float
+    critical: float
+    complication: float
+    expected_momentum: float
+
+class DuneOutcomeTable:
+    """Precomputed outcomes for every valid Dune (target, bonus dice) pair."""
+
+    def __init__(self, outcomes: Dict[Tuple[int, int], DuneOutcome]):
+        self._outcomes = outcomes
+
+    @classmethod
+    def build(cls) -> 'DuneOutcomeTable':
+        """Compute the full table; 120 entries, built once at startup."""
+        outcomes = {}
+        for target in DUNE_TARGET_RANGE:
+            for bonus in DUNE_BONUS_RANGE:
+                odds = DiceProbability.dune_2d20(target, bonus)
+                outcomes[(target, bonus)] = DuneOutcome(
+                    success=odds.success_chance,
+                    critical=odds.critical_chance,
+                    complication=odds.complication_chance,
+                    expected_momentum=odds.expected_momentum
+                )
+        return cls(outcomes)
+
+    def lookup(self, target: int, bonus_dice: int = 0) -> DuneOutcome:
+        """Return the precomputed outcome for a roll."""
+        return self._outcomes[(target, bonus_dice)]
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
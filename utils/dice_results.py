@@ -0,0 +1,246 @@
+"""Compact, typed result objects for the dice engines."""
+
+from array import array
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+class DiceSystem(Enum):
+    """Supported dice systems."""
+    STANDARD = "standard"
+    EXPLODING = "exploding"
+    WORLD_OF_DARKNESS = "wod"
+    DUNE_2D20 = "dune"
+
+def _dice_array(values: Iterable[int]) -> array:
+    """Pack die faces as unsigned 16-bit values (faces and compound totals fit)."""
+    return values if isinstance(values, array) else array('H', values)
+
+def index_mask(indices: Iterable[int]) -> int:
+    """Bit mask with bit ``i`` set for every index ``i``."""
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+def mask_indices(mask: int) -> List[int]:
+    """Indices of the set bits in ``mask``."""
+    indices = []
+    i = 0
+    while mask:
+        if mask & 1:
+            indices.append(i)
+        mask >>= 1
+        i += 1
+    return indices
+
+class DiceResult:
+    """Result of a dice roll.
+
+    Results are slotted and keep their dice in an ``array('H')``, since views
+    and history hold on to them. Each system has its own subclass with typed
+    fields in place of a per-roll ``details`` dict.
+    """
+    __slots__ = ('rolls', 'total', 'successes', 'complications', 'botch')
+
+    system = DiceSystem.STANDARD
+
+    def __init__(self, rolls: Iterable[int], total: int, successes: int = 0,
+                 complications: int = 0, botch: bool = False):
+        self.rolls = _dice_array(rolls)
+        self.total = total
+        self.successes = successes
+        self.complications = complications
+        self.botch = botch
+
+    @property
+    def exploded_dice(self) -> Sequence[int]:
+        return ()
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        """System-specific fields as a dict, built on demand for older callers."""
+        return {}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._field_names())
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._field_names())
+
+    @classmethod
+    def _field_names(cls) -> List[str]:
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(name for name in getattr(klass, '__slots__', ()) if not name.startswith('_'))
+        return names
+
+class StandardResult(DiceResult):
+    """Standard roll or compiled expression; dropped dice are an index mask."""
+    __slots__ = ('modifier', 'expression', 'dropped_mask')
+
+    def __init__(self, rolls: Iterable[int], total: int, modifier: int = 0,
+                 expression: Optional[str] = None, dropped_mask: int = 0):
+        super().__init__(rolls, total)
+        self.modifier = modifier
+        self.expression = expression
+        self.dropped_mask = dropped_mask
+
+    def is_dropped(self, index: int) -> bool:
+        return bool(self.dropped_mask >> index & 1)
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        details = {'modifier': self.modifier}
+        if self.expression is not None:
+            details['expression'] = self.expression
+            details['dropped'] = mask_indices(self.dropped_mask)
+        return details
+
+class LargePoolResult(StandardResult):
+    """Large pool kept as a face histogram instead of individual dice."""
+    __slots__ = ('dice_count', 'sides', 'histogram', 'kept_count', 'keep')
+
+    def __init__(self, total: int, histogram: Iterable[int], modifier: int = 0,
+                 kept_count: Optional[int] = None, keep: Optional[Tuple[str, int]] = None):
+        super().__init__((), total, modifier)
+        self.histogram = array('L', histogram)
+        self.dice_count = sum(self.histogram)
+        self.sides = len(self.histogram)
+        self.kept_count = self.dice_count if kept_count is None else kept_count
+        self.keep = keep
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        return {
+            'modifier': self.modifier,
+            'large_pool': True,
+            'dice_count': self.dice_count,
+            'sides': self.sides,
+            'histogram': list(self.histogram),
+            'kept_count': self.kept_count,
+            'keep': self.keep
+        }
+
+class ExplodingResult(DiceResult):
+    """Exploding roll with the faces that triggered explosions."""
+    __slots__ = ('modifier', 'threshold', 'mode', 'capped', '_exploded')
+
+    system = DiceSystem.EXPLODING
+
+    def __init__(self, rolls: Iterable[int], total: int, exploded: Iterable[int], modifier: int = 0,
+                 threshold: int = 0, mode: str = 'compound', capped: int = 0):
+        super().__init__(rolls, total)
+        self._exploded = _dice_array(exploded)
+        self.modifier = modifier
+        self.threshold = threshold
+        self.mode = mode
+        self.capped = capped
+
+    @property
+    def exploded_dice(self) -> Sequence[int]:
+        return self._exploded
+
+    @property
+    def exploded_count(self) -> int:
+        return len(self._exploded)
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        return {
+            'modifier': self.modifier,
+            'exploded_count': self.exploded_count,
+            'threshold': self.threshold,
+            'mode': self.mode,
+            'capped': self.capped
+        }
+
+class WoDResult(DiceResult):
+    """World of Darkness roll.
+
+    Pools rolled without individual dice leave ``rolls`` empty; ``dice_count``
+    and ``tens`` are always filled in.
+    """
+    __slots__ = ('difficulty', 'ones', 'tens', 'raw_successes', 'specialty', 'dice_count')
+
+    system = DiceSystem.WORLD_OF_DARKNESS
+
+    def __init__(self, rolls: Iterable[int], total: int, successes: int, botch: bool,
+                 difficulty: int, ones: int, raw_successes: int, specialty: bool,
+                 tens: Optional[int] = None, dice_count: Optional[int] = None):
+        super().__init__(rolls, total, successes=successes, botch=botch)
+        self.difficulty = difficulty
+        self.ones = ones
+        self.raw_successes = raw_successes
+        self.specialty = specialty
+        self.tens = self.rolls.count(10) if tens is None else tens
+        self.dice_count = len(self.rolls) if dice_count is None else dice_count
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        return {
+            'difficulty': self.difficulty,
+            'ones': self.ones,
+            'tens': self.tens,
+            'raw_successes': self.raw_successes,
+            'specialty': self.specialty
+        }
+
+class DuneResult(DiceResult):
+    """Dune 2d20 roll; the dice that count are marked in ``used_mask``."""
+    __slots__ = ('target', 'bonus_dice', 'used_mask', 'all_successes', 'all_complications', 'focus')
+
+    system = DiceSystem.DUNE_2D20
+
+    def __init__(self, rolls: Iterable[int], total: int, successes: int, complications: int,
+                 target: int, bonus_dice: int, used_mask: int,
+                 all_successes: int, all_complications: int, focus: Optional[int] = None):
+        super().__init__(rolls, total, successes=successes, complications=complications)
+        self.target = target
+        self.bonus_dice = bonus_dice
+        self.used_mask = used_mask
+        self.all_successes = all_successes
+        self.all_complications = all_complications
+        self.focus = focus
+
+    def is_used(self, index: int) -> bool:
+        return bool(self.used_mask >> index & 1)
+
+    @property
+    def main_rolls(self) -> List[int]:
+        return [self.rolls[i] for i in mask_indices(self.used_mask)]
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        details = {'target': self.target, 'bonus_dice': self.bonus_dice}
+        if self.bonus_dice > 0:
+            details.update({
+                'main_rolls': sorted(self.main_rolls),
+                'all_successes': self.all_successes,
+                'all_complications': self.all_complications
+            })
+        return details
+
+class DuneGroupResult:
+    """Assisted Dune roll: a leader's result plus one per assistant."""
+    __slots__ = ('leader', 'assistants', 'successes', 'complications')
+
+    system = DiceSystem.DUNE_2D20
+
+    def __init__(self, leader: DuneResult, assistants: Tuple[DuneResult, ...]):
+        self.leader = leader
+        self.assistants = assistants
+        # Assistance only adds successes if the leader succeeds on their own
+        assisted = sum(result.successes for result in assistants)
+        self.successes = leader.successes + assisted if leader.successes > 0 else 0
+        self.complications = leader.complications + sum(result.complications for result in assistants)
+
+    @property
+    def assisted_successes(self) -> int:
+        return sum(result.successes for result in self.assistants)
+
+    def __repr__(self) -> str:
+        return (f"DuneGroupResult(leader={self.leader!r}, assistants={self.assistants!r}, "
+                f"successes={self.successes}, complications={self.complications})")
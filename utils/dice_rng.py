@@ -0,0 +1,238 @@
+"""Pluggable random number backends for the dice engines."""
+
+import hashlib
+import math
+import random
+import secrets
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; backends fall back to pure Python
+    np = None
+
+# Faces drawn per refill of the buffered backend
+BUFFER_SIZE = 4096
+# Per-channel PCG streams kept in memory; the least recently used one is
+# dropped beyond this, and that channel's stream starts again from its seed
+# on its next roll, as after a restart
+MAX_CHANNEL_STREAMS = 10_000
+
+_MASK64 = (1 << 64) - 1
+_PCG_MULTIPLIER = 6364136223846793005
+
+class RandomBackend(ABC):
+    """Base class for dice randomness sources."""
+
+    name = 'base'
+
+    @abstractmethod
+    def randint(self, low: int, high: int) -> int:
+        """Uniform integer in [low, high]."""
+
+    @abstractmethod
+    def random(self) -> float:
+        """Uniform float in [0, 1)."""
+
+    def roll(self, count: int, sides: int) -> List[int]:
+        """Roll ``count`` dice with ``sides`` faces."""
+        return [self.randint(1, sides) for _ in range(count)]
+
+    @abstractmethod
+    def numpy_generator(self):
+        """NumPy generator used by vectorized paths (NumPy must be installed)."""
+
+class StdlibBackend(RandomBackend):
+    """The global ``random`` module; the historical default."""
+
+    name = 'stdlib'
+
+    def __init__(self):
+        self._generator = np.random.default_rng() if np is not None else None
+
+    def randint(self, low: int, high: int) -> int:
+        return random.randint(low, high)
+
+    def random(self) -> float:
+        return random.random()
+
+    def numpy_generator(self):
+        return self._generator
+
+class BufferedBackend(StdlibBackend):
+    """Pre-draws blocks of faces per die size and hands out slices."""
+
+    name = 'buffered'
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        super().__init__()
+        self.buffer_size = buffer_size
+        self._buffers: Dict[int, Tuple[List[int], int]] = {}
+
+    def _refill(self, sides: int, needed: int) -> List[int]:
+        size = max(self.buffer_size, needed)
+        if self._generator is not None:
+            return self._generator.integers(1, sides + 1, size=size).tolist()
+        return random.choices(range(1, sides + 1), k=size)
+
+    def roll(self, count: int, sides: int) -> List[int]:
+        buffer, position = self._buffers.get(sides, ([], 0))
+        if len(buffer) - position < count:
+            buffer = buffer[position:] + self._refill(sides, count)
+            position = 0
+        self._buffers[sides] = (buffer, position + count)
+        return buffer[position:position + count]
+
+    def randint(self, low: int, high: int) -> int:
+        if low == 1:
+            return self.roll(1, high)[0]
+        return random.randint(low, high)
+
+class SecretsBackend(RandomBackend):
+    """Operating-system entropy via ``secrets``, for audited games."""
+
+    name = 'secrets'
+
+    def __init__(self):
+        self._system = secrets.SystemRandom()
+
+    def randint(self, low: int, high: int) -> int:
+        return low + secrets.randbelow(high - low + 1)
+
+    def random(self) -> float:
+        return self._system.random()
+
+    def numpy_generator(self):
+        # Fresh OS-seeded generator per batch, so no state outlives a call
+        return np.random.default_rng(secrets.randbits(128))
+
+class PCGBackend(RandomBackend):
+    """Deterministic PCG32 stream for reproducible load tests and replays."""
+
+    name = 'pcg'
+
+    def __init__(self, seed: int, stream: int = 0):
+        self.seed = seed
+        self.stream = stream
+        self._increment = ((stream << 1) | 1) & _MASK64
+        self._state = 0
+        self._next32()
+        self._state = (self._state + seed) & _MASK64
+        self._next32()
+        self._generator = None
+
+    def _next32(self) -> int:
+        old = self._state
+        self._state = (old * _PCG_MULTIPLIER + self._increment) & _MASK64
+        xorshifted = (((old >> 18) ^ old) >> 27) & 0xFFFFFFFF
+        rotation = old >> 59
+        return ((xorshifted >> rotation) | (xorshifted << ((-rotation) & 31))) & 0xFFFFFFFF
+
+    def randint(self, low: int, high: int) -> int:
+        span = high - low + 1
+        # Reject the low remainder so every face is equally likely
+        threshold = (1 << 32) % span
+        while True:
+            value = self._next32()
+            if value >= threshold:
+                return low + value % span
+
+    def random(self) -> float:
+        # 53 random bits, like random.random()
+        return ((self._next32() >> 5) * 67108864 + (self._next32() >> 6)) / 9007199254740992
+
+    def numpy_generator(self):
+        if self._generator is None:
+            self._generator = np.random.Generator(np.random.PCG64([self.seed, self.stream]))
+        return self._generator
+
+BACKENDS = {
+    'stdlib': StdlibBackend,
+    'buffered': BufferedBackend,
+    'secrets': SecretsBackend,
+}
+
+def channel_stream_id(guild_id: int, channel_id: int) -> int:
+    """Stable 64-bit PCG stream id for a (guild, channel) pair."""
+    digest = hashlib.blake2b(f"{guild_id}:{channel_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+class DiceRNG:
+    """Selects the backend used by DiceEngine."""
+
+    _default: RandomBackend = StdlibBackend()
+    _channel_seed: Optional[int] = None
+    _streams: 'OrderedDict[Tuple[int, int], PCGBackend]' = OrderedDict()
+
+    @classmethod
+    def configure(cls, backend: str = 'stdlib', seed: Optional[int] = None):
+        """Choose the default backend; 'pcg' gives each channel its own seeded stream."""
+        if backend == 'pcg':
+            cls._default = StdlibBackend()
+            cls._channel_seed = 0 if seed is None else seed
+        elif backend in BACKENDS:
+            cls._default = BACKENDS[backend]()
+            cls._channel_seed = None
+        else:
+            raise ValueError(f"Unknown RNG backend '{backend}'. Use: {', '.join([*BACKENDS, 'pcg'])}")
+        cls._streams = OrderedDict()
+
+    @classmethod
+    def default(cls) -> RandomBackend:
+        return cls._default
+
+    @classmethod
+    def for_channel(cls, guild_id: int, channel_id: int) -> RandomBackend:
+        """Backend for rolls in a channel: its PCG stream when seeding is on."""
+        if cls._channel_seed is None:
+            return cls._default
+        key = (guild_id, channel_id)
+        stream = cls._streams.get(key)
+        if stream is None:
+            stream = cls._streams[key] = PCGBackend(cls._channel_seed, channel_stream_id(guild_id, channel_id))
+            if len(cls._streams) > MAX_CHANNEL_STREAMS:
+                cls._streams.popitem(last=False)
+        else:
+            cls._streams.move_to_end(key)
+        return stream
+
+_current: ContextVar[Optional[RandomBackend]] = ContextVar('dice_rng', default=None)
+
+def current_rng() -> RandomBackend:
+    """Backend for the running roll: the active context's, else the default."""
+    return _current.get() or DiceRNG.default()
+
+@contextmanager
+def use_rng(backend: RandomBackend) -> Iterator[RandomBackend]:
+    """Route every DiceEngine draw inside the block to ``backend``."""
+    token = _current.set(backend)
+    try:
+        yield backend
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def channel_rng(guild_id: int, channel_id: int) -> Iterator[RandomBackend]:
+    """Shortcut for ``use_rng(DiceRNG.for_channel(guild_id, channel_id))``."""
+    with use_rng(DiceRNG.for_channel(guild_id, channel_id)) as backend:
+        yield backend
+
+def chi_square_fairness(backend: RandomBackend, sides: int = 6, rolls: int = 60000) -> Tuple[float, float]:
+    """Chi-square goodness-of-fit of ``backend`` against a fair die.
+
+    Returns (statistic, p-value); the p-value uses the Wilson-Hilferty
+    approximation, which is accurate for the degrees of freedom of real dice.
+    """
+    counts = [0] * sides
+    for face in backend.roll(rolls, sides):
+        counts[face - 1] += 1
+    expected = rolls / sides
+    statistic = sum((count - expected) ** 2 / expected for count in counts)
+
+    df = sides - 1
+    z = ((statistic / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+    return statistic, 0.5 * math.erfc(z / math.sqrt(2))
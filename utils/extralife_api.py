@@ -0,0 +1,107 @@
+"""Extra-Life (DonorDrive) API client."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from utils.codecs import CODECS
+
+# Seconds allowed for one API request, and for a whole fetch of every endpoint
+REQUEST_TIMEOUT = 5.0
+TOTAL_TIMEOUT = 8.0
+
+@dataclass
+class FetchResult:
+    """One endpoint's response.
+
+    ``validators`` holds the ``etag``/``last_modified`` headers and body
+    ``size`` to send back on the next poll. A 304 has ``not_modified`` set
+    and no ``data``; the caller's cached copy is still current.
+    """
+    data: Optional[Any] = None
+    validators: Dict[str, Any] = field(default_factory=dict)
+    not_modified: bool = False
+
+class ExtraLifeClient:
+    """Fetches Extra-Life endpoints concurrently over a shared session.
+
+    Each request is bounded by ``request_timeout`` and a whole fetch by
+    ``total_timeout``; an endpoint that is slow or failing is left out of
+    the result instead of holding up the others. Given validators from an
+    earlier response, requests are conditional, and an unchanged endpoint
+    costs a bodiless 304.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, request_timeout: float = REQUEST_TIMEOUT,
+                 total_timeout: float = TOTAL_TIMEOUT):
+        self.session = session
+        self.request_timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self.total_timeout = total_timeout
+        # Counters for logs and benchmarks
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_received = 0
+        # Body bytes that 304 responses did not have to resend
+        self.bytes_saved = 0
+
+    async def fetch(self, url: str, validators: Optional[Dict[str, Any]] = None) -> Optional[FetchResult]:
+        """Fetch ``url``, conditionally if ``validators`` are given.
+
+        Returns None on an error status, timeout or network error.
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        try:
+            async with self.session.get(url, headers=headers, timeout=self.request_timeout) as response:
+                self.requests += 1
+                if response.status == 304 and validators:
+                    self.not_modified += 1
+                    self.bytes_saved += validators.get('size', 0)
+                    return FetchResult(validators=dict(validators), not_modified=True)
+                if response.status != 200:
+                    print(f"Extra-Life API returned {response.status} for {url}")
+                    return None
+                body = await response.read()
+                self.bytes_received += len(body)
+                fresh = {'size': len(body)}
+                if response.headers.get('ETag'):
+                    fresh['etag'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    fresh['last_modified'] = response.headers['Last-Modified']
+                return FetchResult(CODECS['json'].decode(body), fresh)
+        except asyncio.TimeoutError:
+            print(f"Extra-Life API timed out after {self.request_timeout.total:g}s: {url}")
+        except (aiohttp.ClientError, ValueError) as e:
+            print(f"Error fetching {url}: {e}")
+        return None
+
+    async def fetch_many(self, urls: Dict[str, str],
+                         validators: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, FetchResult]:
+        """Fetch every ``name -> url`` at once; returns the ones that succeeded by name.
+
+        ``validators`` maps names to what an earlier ``FetchResult`` returned.
+        """
+        if not urls:
+            return {}
+        validators = validators or {}
+        tasks = {
+            name: asyncio.create_task(self.fetch(url, validators.get(name)))
+            for name, url in urls.items()
+        }
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.total_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            late = [name for name, task in tasks.items() if task in pending]
+            print(f"Extra-Life fetch gave up after {self.total_timeout:g}s on: {', '.join(late)}")
+        return {
+            name: task.result() for name, task in tasks.items()
+            if task not in pending and task.result() is not None
+        }
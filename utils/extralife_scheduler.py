@@ -0,0 +1,148 @@
+"""Shared, rate-limited polling of Extra-Life endpoints for every guild."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from utils.extralife_api import ExtraLifeClient
+from utils.rate_limit import RateLimiter
+from utils.singleflight import SingleFlight
+
+# Requests allowed per period across every guild, and the period in seconds
+RATE_LIMIT = 2
+RATE_PERIOD = 1.0
+
+# API path segment per kind of endpoint
+ENDPOINT_PATHS = {'team': 'teams', 'participant': 'participants'}
+
+def endpoint_key(kind: str, extralife_id: Any) -> str:
+    """Cache and scheduling key of an endpoint, e.g. ``team:12345``."""
+    return f"{kind}:{extralife_id}"
+
+def guild_endpoints(team_id: Optional[Any] = None, participant_id: Optional[Any] = None) -> Dict[str, str]:
+    """Endpoint keys by data name ('team', 'participant') for a registration."""
+    endpoints = {}
+    if team_id:
+        endpoints['team'] = endpoint_key('team', team_id)
+    if participant_id:
+        endpoints['participant'] = endpoint_key('participant', participant_id)
+    return endpoints
+
+class ExtraLifeScheduler:
+    """Fetches each unique endpoint once per poll and fans results out to guilds.
+
+    Guilds subscribe with their endpoint keys. Guilds watching the same team
+    share one request: concurrent fetches of an endpoint are coalesced and
+    every request holds a slot of a global rate limit until it has been
+    answered, so bursts stay within the limit at the server and API load
+    follows the number of unique endpoints, not the number of guilds.
+    Responses are cached in ``storage`` with their validators, and repeat
+    requests are conditional.
+    """
+
+    def __init__(self, client: ExtraLifeClient, storage, api_base: str,
+                 rate_limit: int = RATE_LIMIT, period: float = RATE_PERIOD):
+        self.client = client
+        self.storage = storage
+        self.api_base = api_base
+        self.throttler = RateLimiter(rate_limit, period)
+        self.flights = SingleFlight()
+        # guild_id -> {'team': 'team:123', ...}
+        self.subscriptions: Dict[int, Dict[str, str]] = {}
+        # Counters for logs and benchmarks
+        self.polls = 0
+        self.fetched = 0
+
+    def url(self, endpoint: str) -> str:
+        kind, extralife_id = endpoint.split(':', 1)
+        return f"{self.api_base}/{ENDPOINT_PATHS[kind]}/{extralife_id}"
+
+    @property
+    def unique_endpoints(self) -> Set[str]:
+        return {key for endpoints in self.subscriptions.values() for key in endpoints.values()}
+
+    def subscribe(self, guild_id: int, endpoints: Dict[str, str]) -> Set[str]:
+        """Poll ``endpoints`` for a guild, replacing its earlier ones. Returns endpoints no longer polled."""
+        before = self.unique_endpoints
+        if endpoints:
+            self.subscriptions[guild_id] = dict(endpoints)
+        else:
+            self.subscriptions.pop(guild_id, None)
+        return before - self.unique_endpoints
+
+    def unsubscribe(self, guild_id: int) -> Set[str]:
+        return self.subscribe(guild_id, {})
+
+    async def fetch_endpoint(self, endpoint: str) -> Optional[Tuple[Any, bool]]:
+        """An endpoint's data and whether it changed, or None if the request failed."""
+        return await self.flights.run(endpoint, lambda: self._fetch_endpoint(endpoint))
+
+    async def _fetch_endpoint(self, endpoint: str) -> Optional[Tuple[Any, bool]]:
+        cached, validators = await self.storage.load_extralife_validators([endpoint])
+        async with self.throttler:
+            result = await self.client.fetch(self.url(endpoint), validators.get(endpoint))
+        if result is None:
+            return None
+        self.fetched += 1
+        changed = not result.not_modified
+        data = result.data if changed else cached[endpoint]
+        # Saved even when unchanged: a 304 refreshes the entry's TTL
+        await self.storage.save_extralife_cache({endpoint: data}, {endpoint: result.validators})
+        return data, changed
+
+    async def fetch(self, endpoints: Dict[str, str]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Fetch a guild's endpoints within the client's total timeout.
+
+        Returns the data by name ('team', 'participant') and whether any of
+        it changed; endpoints that failed or timed out are left out.
+        """
+        if not endpoints:
+            return None, False
+        tasks = {name: asyncio.create_task(self.fetch_endpoint(key)) for name, key in endpoints.items()}
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.client.total_timeout)
+        for task in pending:
+            # Only this caller stops waiting; the shared fetch carries on
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            late = [endpoints[name] for name, task in tasks.items() if task in pending]
+            print(f"Extra-Life fetch gave up after {self.client.total_timeout:g}s on: {', '.join(late)}")
+        data, changed = {}, False
+        for name, task in tasks.items():
+            if task in pending or task.result() is None:
+                continue
+            data[name], endpoint_changed = task.result()
+            changed = changed or endpoint_changed
+        return (data or None), changed
+
+    async def cached(self, endpoints: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """A guild's data by name if all of it is cached and fresh, else None."""
+        data = await self.storage.load_extralife_cache(list(endpoints.values())) if endpoints else None
+        if data is None:
+            return None
+        return {name: data[key] for name, key in endpoints.items()}
+
+    async def poll(self, deliver: Callable[[int, Dict[str, Any], bool], Awaitable[None]]):
+        """Fetch every subscribed endpoint once and hand each guild its data.
+
+        ``deliver(guild_id, data, changed)`` is called per guild that got
+        data; an error in one delivery does not stop the others.
+        """
+        self.polls += 1
+        endpoints = sorted(self.unique_endpoints)
+        results = dict(zip(endpoints, await asyncio.gather(
+            *(self.fetch_endpoint(key) for key in endpoints), return_exceptions=True
+        )))
+        for guild_id, guild_endpoints in list(self.subscriptions.items()):
+            data, changed = {}, False
+            for name, key in guild_endpoints.items():
+                result = results.get(key)
+                if result is None or isinstance(result, BaseException):
+                    continue
+                data[name], endpoint_changed = result
+                changed = changed or endpoint_changed
+            if not data:
+                continue
+            try:
+                await deliver(guild_id, data, changed)
+            except Exception as e:
+                print(f"Error delivering Extra-Life update to guild {guild_id}: {e}")
@@ -0,0 +1,40 @@
+"""Crash-safe file writes."""
+
+import os
+import tempfile
+
+def fsync_directory(directory: str):
+    """Persist a rename in ``directory``; a no-op where directories cannot be opened."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_bytes_atomic(path: str, payload: bytes):
+    """Replace ``path`` with ``payload`` so readers never see a partial file.
+
+    The bytes go to a temporary file in the same directory, which is fsynced
+    and then renamed over ``path``. Raises OSError if any step fails;
+    ``path`` is left untouched in that case.
+    """
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory or '.', prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
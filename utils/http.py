@@ -0,0 +1,35 @@
+"""Bot-wide HTTP client session."""
+
+import aiohttp
+
+# Open connections across all hosts, and to any one host
+HTTP_CONNECTION_LIMIT = 100
+HTTP_CONNECTION_LIMIT_PER_HOST = 10
+
+# Seconds an idle keep-alive connection stays open for reuse
+HTTP_KEEPALIVE_TIMEOUT = 30
+
+# Seconds a resolved host name is cached
+HTTP_DNS_CACHE_TTL = 300
+
+# Ceiling for any request made without its own timeout
+HTTP_DEFAULT_TIMEOUT = 30
+
+def create_http_session(limit: int = HTTP_CONNECTION_LIMIT,
+                        limit_per_host: int = HTTP_CONNECTION_LIMIT_PER_HOST) -> aiohttp.ClientSession:
+    """Session with a pooled, keep-alive connector and DNS cache.
+
+    Create it inside the running event loop and share it; closing it closes
+    every pooled connection.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_DEFAULT_TIMEOUT)
+    )
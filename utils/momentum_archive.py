@@ -0,0 +1,170 @@
+"""Cold storage for momentum pools that have gone idle."""
+
+import gzip
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from utils.codecs import CODECS, Codec, decode, load_file
+from utils.files import write_bytes_atomic
+
+MOMENTUM_ARCHIVE_FILE = 'momentum_archive.gz'
+# Guild IDs in the archive, so listing a guild without archived pools
+# never decompresses it
+MOMENTUM_ARCHIVE_INDEX_FILE = 'momentum_archive_index.json'
+
+# zlib level for the archive; 9 is barely smaller and several times slower
+ARCHIVE_COMPRESSION = 6
+
+def _pool_key(guild_id: int, channel_id: int) -> str:
+    return f"{guild_id}_{channel_id}"
+
+def _file_stamp(path: str) -> Optional[List[int]]:
+    """Size and modification time of ``path``, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+class MomentumArchive:
+    """Archived pools in one gzip-compressed file, read only on a store miss.
+
+    The file holds the same mapping as ``momentum_pools.json`` in the
+    configured codec's format, compressed. It is loaded on first use and
+    rewritten atomically by ``save()``.
+
+    ``save()`` also writes ``MOMENTUM_ARCHIVE_INDEX_FILE`` next to it with
+    the archived guild IDs and the archive's size and mtime. Until the
+    archive is loaded, ``guild_pools()`` answers from that index for
+    guilds with nothing archived; an index that does not match the
+    archive file is ignored.
+    """
+
+    def __init__(self, path: str, codec: Optional[Codec] = None):
+        self.path = path
+        self.codec = codec or CODECS['json']
+        self.index_path = os.path.join(os.path.dirname(path), MOMENTUM_ARCHIVE_INDEX_FILE)
+        self._pools: Optional[Dict[str, Dict[str, Any]]] = None
+        # Pool keys per guild, kept with _pools
+        self._guilds: Dict[int, Set[str]] = {}
+        # Guild IDs from the index file; None until read or if it is unusable
+        self._indexed_guilds: Optional[Set[int]] = None
+        self._index_read = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return the archived pools, reading the file on first use."""
+        with self._lock:
+            if self._pools is None:
+                self._pools = self._read()
+                for key, pool in self._pools.items():
+                    self._guilds.setdefault(pool['guild_id'], set()).add(key)
+            return self._pools
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                return decode(f.read())
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Error loading {os.path.basename(self.path)}: {e}")
+            return {}
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def add(self, pools: List[Dict[str, Any]]):
+        """Archive pools, replacing older copies of the same channels."""
+        archived = self.load()
+        with self._lock:
+            for pool in pools:
+                key = _pool_key(pool['guild_id'], pool['channel_id'])
+                archived[key] = dict(pool)
+                self._guilds.setdefault(pool['guild_id'], set()).add(key)
+            self._dirty = True
+
+    def get(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
+        pool = self.load().get(_pool_key(guild_id, channel_id))
+        return dict(pool) if pool is not None else None
+
+    def take(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
+        """Remove and return an archived pool, or None if it is not archived."""
+        archived = self.load()
+        with self._lock:
+            key = _pool_key(guild_id, channel_id)
+            pool = archived.pop(key, None)
+            if pool is not None:
+                keys = self._guilds[guild_id]
+                keys.discard(key)
+                if not keys:
+                    del self._guilds[guild_id]
+                self._dirty = True
+            return pool
+
+    def guild_pools(self, guild_id: int) -> List[Dict[str, Any]]:
+        if self._pools is None:
+            indexed = self._read_index()
+            if indexed is not None and guild_id not in indexed:
+                return []
+        archived = self.load()
+        with self._lock:
+            return [dict(archived[key]) for key in self._guilds.get(guild_id, ())]
+
+    def _read_index(self) -> Optional[Set[int]]:
+        """Archived guild IDs from the index file, or None if it is missing or stale."""
+        with self._lock:
+            if not self._index_read:
+                self._index_read = True
+                try:
+                    index = load_file(self.index_path)
+                except FileNotFoundError:
+                    index = None
+                except (OSError, ValueError) as e:
+                    print(f"Error loading {os.path.basename(self.index_path)}: {e}")
+                    index = None
+                archive_stamp = _file_stamp(self.path)
+                if archive_stamp is None:
+                    self._indexed_guilds = set()
+                elif index is not None and index.get('archive') == archive_stamp:
+                    self._indexed_guilds = set(index['guilds'])
+            return self._indexed_guilds
+
+    def save(self):
+        """Write the archive now. Raises OSError on failure."""
+        # Serialised so an older snapshot can never replace a newer one
+        with self._save_lock:
+            with self._lock:
+                if self._pools is None:
+                    return
+                snapshot = dict(self._pools)
+                guilds = sorted(self._guilds)
+                self._dirty = False
+            try:
+                write_bytes_atomic(self.path, gzip.compress(self.codec.encode(snapshot), ARCHIVE_COMPRESSION))
+            except OSError:
+                self._dirty = True
+                raise
+            # Best effort: without a matching index the archive is simply loaded
+            try:
+                CODECS['json'].save(self.index_path, {'archive': _file_stamp(self.path), 'guilds': guilds})
+            except OSError as e:
+                print(f"Error saving {os.path.basename(self.index_path)}: {e}")
+
+    def flush(self) -> bool:
+        """Write the archive if pools were restored from it. Returns True if written."""
+        if not self._dirty:
+            return False
+        try:
+            self.save()
+            return True
+        except OSError as e:
+            print(f"Error saving {os.path.basename(self.path)}: {e}")
+            return False
@@ -0,0 +1,195 @@
+"""Bounded per-channel history of momentum and threat changes."""
+
+import os
+import struct
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.files import write_bytes_atomic
+
+MOMENTUM_HISTORY_FILE = 'momentum_history.bin'
+
+# Changes remembered per channel; older ones are overwritten
+HISTORY_SIZE = 100
+
+_MAGIC = b'MHIST1\n'
+# guild_id, channel_id, entry count
+_CHANNEL_HEADER = struct.Struct('<QQH')
+_DELTA_LIMIT = 2 ** 15 - 1
+
+@dataclass(frozen=True)
+class MomentumChange:
+    """One recorded change to a channel's pools."""
+    timestamp: float
+    momentum_change: int
+    threat_change: int
+    user_id: int = 0
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _from_little_endian(typecode: str, payload: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+class ChannelHistory:
+    """Ring buffer of changes kept as parallel typed arrays.
+
+    Each entry costs 20 bytes (timestamp, two deltas, user id) and the
+    buffer never grows past ``capacity`` entries.
+    """
+    __slots__ = ('capacity', 'timestamps', 'momentum', 'threat', 'users', '_next', '_count')
+
+    def __init__(self, capacity: int = HISTORY_SIZE):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.momentum = array('h', bytes(2 * capacity))
+        self.threat = array('h', bytes(2 * capacity))
+        self.users = array('Q', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, timestamp: float, momentum_change: int, threat_change: int, user_id: int = 0):
+        """Add a change, overwriting the oldest once full."""
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.momentum[i] = max(-_DELTA_LIMIT, min(_DELTA_LIMIT, momentum_change))
+        self.threat[i] = max(-_DELTA_LIMIT, min(_DELTA_LIMIT, threat_change))
+        self.users[i] = user_id
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _indices(self) -> Iterator[int]:
+        """Slot indices from oldest to newest."""
+        start = (self._next - self._count) % self.capacity
+        return ((start + k) % self.capacity for k in range(self._count))
+
+    def entries(self, newest_first: bool = True) -> List[MomentumChange]:
+        changes = [
+            MomentumChange(self.timestamps[i], self.momentum[i], self.threat[i], self.users[i])
+            for i in self._indices()
+        ]
+        if newest_first:
+            changes.reverse()
+        return changes
+
+    def to_bytes(self) -> bytes:
+        """Entries oldest first as four little-endian arrays."""
+        order = list(self._indices())
+        return b''.join(
+            _little_endian(array(values.typecode, (values[i] for i in order)))
+            for values in (self.timestamps, self.momentum, self.threat, self.users)
+        )
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, count: int, capacity: int = HISTORY_SIZE) -> 'ChannelHistory':
+        history = cls(capacity)
+        offset = 0
+        columns = []
+        for typecode in ('d', 'h', 'h', 'Q'):
+            size = array(typecode).itemsize * count
+            columns.append(_from_little_endian(typecode, payload[offset:offset + size]))
+            offset += size
+        # Keep the newest entries if the capacity shrank since the file was written
+        for timestamp, momentum, threat, user in list(zip(*columns))[-capacity:]:
+            history.record(timestamp, momentum, threat, user)
+        return history
+
+    @staticmethod
+    def encoded_size(count: int) -> int:
+        return count * (8 + 2 + 2 + 8)
+
+class MomentumHistoryStore:
+    """Every channel's ``ChannelHistory``, persisted to one binary file."""
+
+    def __init__(self, path: str, capacity: int = HISTORY_SIZE):
+        self.path = path
+        self.capacity = capacity
+        self._channels: Optional[Dict[Tuple[int, int], ChannelHistory]] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+
+    def load(self) -> Dict[Tuple[int, int], ChannelHistory]:
+        """Return the per-channel buffers, reading the file on first use."""
+        with self._lock:
+            if self._channels is None:
+                self._channels = self._read()
+            return self._channels
+
+    def _read(self) -> Dict[Tuple[int, int], ChannelHistory]:
+        channels: Dict[Tuple[int, int], ChannelHistory] = {}
+        if not os.path.exists(self.path):
+            return channels
+        try:
+            with open(self.path, 'rb') as f:
+                payload = f.read()
+        except OSError as e:
+            print(f"Error loading {os.path.basename(self.path)}: {e}")
+            return channels
+        if not payload.startswith(_MAGIC):
+            print(f"Ignoring {os.path.basename(self.path)}: unknown format")
+            return channels
+        offset = len(_MAGIC)
+        while offset + _CHANNEL_HEADER.size <= len(payload):
+            guild_id, channel_id, count = _CHANNEL_HEADER.unpack_from(payload, offset)
+            offset += _CHANNEL_HEADER.size
+            size = ChannelHistory.encoded_size(count)
+            channels[(guild_id, channel_id)] = ChannelHistory.from_bytes(
+                payload[offset:offset + size], count, self.capacity
+            )
+            offset += size
+        return channels
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def record(self, guild_id: int, channel_id: int, timestamp: float,
+               momentum_change: int, threat_change: int, user_id: int = 0):
+        channels = self.load()
+        with self._lock:
+            history = channels.get((guild_id, channel_id))
+            if history is None:
+                history = channels[(guild_id, channel_id)] = ChannelHistory(self.capacity)
+            history.record(timestamp, momentum_change, threat_change, user_id)
+            self._dirty = True
+
+    def entries(self, guild_id: int, channel_id: int) -> List[MomentumChange]:
+        """A channel's recorded changes, newest first."""
+        channels = self.load()
+        with self._lock:
+            history = channels.get((guild_id, channel_id))
+            return history.entries() if history is not None else []
+
+    def flush(self) -> bool:
+        """Write the file if anything was recorded. Returns True if written."""
+        # Serialised so an older snapshot can never replace a newer one
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty or self._channels is None:
+                    return False
+                parts = [_MAGIC]
+                for (guild_id, channel_id), history in self._channels.items():
+                    parts.append(_CHANNEL_HEADER.pack(guild_id, channel_id, len(history)))
+                    parts.append(history.to_bytes())
+                self._dirty = False
+            try:
+                write_bytes_atomic(self.path, b''.join(parts))
+                return True
+            except OSError as e:
+                print(f"Error saving {os.path.basename(self.path)}: {e}")
+                self._dirty = True
+                return False
@@ -0,0 +1,777 @@
+"""Storage backends for momentum pools.
+
+Stores deal in plain pool dicts (the ``MomentumPool`` fields); ``DataManager``
+wraps them in dataclasses. ``open_momentum_store`` picks a backend from a
+``DATABASE_URL``.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.codecs import CODECS, Codec, load_file
+
+MOMENTUM_POOLS_FILE = 'momentum_pools.json'
+
+# Lock stripes per JSON store; pools hashing to the same stripe share a lock
+LOCK_STRIPES = 64
+
+# Executor threads for the JSON store (see AsyncDataManager)
+STORE_THREADS = 4
+
+# Journal next to the JSON snapshot, and the segment being folded into a new snapshot
+JOURNAL_SUFFIX = '.journal'
+ROTATED_SUFFIX = '.old'
+
+# Layouts for file-based storage (when DATABASE_URL is not SQLite)
+STORAGE_MODES = ('file', 'journal', 'sharded')
+
+# Directory of per-guild shard files inside the data directory
+SHARD_DIR = 'guilds'
+
+# Guild shards kept open at once, and seconds before an unused shard is closed
+SHARD_CACHE_SIZE = 256
+SHARD_IDLE_SECONDS = 600
+
+# Connections kept open by each SQLite store
+SQLITE_POOL_SIZE = 4
+
+# Milliseconds a connection waits on a locked database before failing
+SQLITE_BUSY_TIMEOUT = 5000
+
+# Rows are clustered by (guild_id, channel_id), so the primary key doubles as
+# the guild index: a guild's pools are one contiguous range scan.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS momentum_pools (
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    momentum INTEGER NOT NULL DEFAULT 0,
+    threat INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT NOT NULL,
+    PRIMARY KEY (guild_id, channel_id)
+) WITHOUT ROWID
+"""
+
+# Statements are module constants so each connection's statement cache
+# reuses the compiled form
+_SELECT_POOL = (
+    "SELECT guild_id, channel_id, momentum, threat, last_updated "
+    "FROM momentum_pools WHERE guild_id = ? AND channel_id = ?"
+)
+_SELECT_GUILD = (
+    "SELECT guild_id, channel_id, momentum, threat, last_updated "
+    "FROM momentum_pools WHERE guild_id = ?"
+)
+_UPSERT_POOL = (
+    "INSERT INTO momentum_pools (guild_id, channel_id, momentum, threat, last_updated) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (guild_id, channel_id) DO UPDATE SET "
+    "momentum = excluded.momentum, threat = excluded.threat, last_updated = excluded.last_updated"
+)
+_ADD_TO_POOL = (
+    "INSERT INTO momentum_pools (guild_id, channel_id, momentum, threat, last_updated) "
+    "VALUES (?, ?, max(0, ?), max(0, ?), ?) "
+    "ON CONFLICT (guild_id, channel_id) DO UPDATE SET "
+    "momentum = max(0, momentum + ?), threat = max(0, threat + ?), last_updated = excluded.last_updated"
+)
+_IMPORT_POOL = (
+    "INSERT INTO momentum_pools (guild_id, channel_id, momentum, threat, last_updated) "
+    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (guild_id, channel_id) DO NOTHING"
+)
+_COUNT_POOLS = "SELECT count(*) FROM momentum_pools"
+# ISO timestamps sort as text
+_SELECT_IDLE = (
+    "SELECT guild_id, channel_id, momentum, threat, last_updated "
+    "FROM momentum_pools WHERE last_updated < ?"
+)
+_DELETE_IDLE = "DELETE FROM momentum_pools WHERE last_updated < ?"
+
+def _pool_key(guild_id: int, channel_id: int) -> str:
+    return f"{guild_id}_{channel_id}"
+
+class JSONMomentumStore:
+    """All pools in one JSON file behind an in-memory write-back cache.
+
+    Reads are dict lookups and writes only mark the cache dirty; ``flush()``
+    persists it atomically. Updates to a pool hold that pool's lock stripe,
+    so the store is safe to share between threads.
+    """
+
+    def __init__(self, path: str, stripes: int = LOCK_STRIPES, codec: Optional[Codec] = None):
+        self.path = path
+        self.codec = codec or CODECS['json']
+        self._pools: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._load_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.max_threads = STORE_THREADS
+
+    def _lock_for(self, guild_id: int, channel_id: int) -> threading.Lock:
+        """Lock stripe guarding a (guild, channel) pool."""
+        return self._locks[hash((guild_id, channel_id)) % len(self._locks)]
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return the pool cache, reading the file on first use."""
+        if self._pools is None:
+            with self._load_lock:
+                if self._pools is None:
+                    self._pools = self._read_snapshot()
+        return self._pools
+
+    def _read_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        if os.path.exists(self.path):
+            try:
+                return load_file(self.path)
+            except (ValueError, OSError):
+                pass
+        return {}
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def get(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
+        pool = self.load().get(_pool_key(guild_id, channel_id))
+        return dict(pool) if pool is not None else None
+
+    def put(self, pool: Dict[str, Any]):
+        pools = self.load()
+        with self._lock_for(pool['guild_id'], pool['channel_id']):
+            # Cached entries are replaced, never mutated, so flush snapshots stay consistent
+            pools[_pool_key(pool['guild_id'], pool['channel_id'])] = dict(pool)
+            self._dirty = True
+
+    def add(self, guild_id: int, channel_id: int, momentum_change: int, threat_change: int,
+            timestamp: str) -> Dict[str, Any]:
+        """Apply momentum/threat deltas (floored at zero) and return the pool."""
+        pools = self.load()
+        key = _pool_key(guild_id, channel_id)
+        with self._lock_for(guild_id, channel_id):
+            pool = dict(pools.get(key) or {
+                'guild_id': guild_id, 'channel_id': channel_id, 'momentum': 0, 'threat': 0
+            })
+            pool['momentum'] = max(0, pool['momentum'] + momentum_change)
+            pool['threat'] = max(0, pool['threat'] + threat_change)
+            pool['last_updated'] = timestamp
+            pools[key] = pool
+            self._dirty = True
+        return dict(pool)
+
+    def guild_pools(self, guild_id: int) -> List[Dict[str, Any]]:
+        return [dict(pool) for pool in list(self.load().values()) if pool['guild_id'] == guild_id]
+
+    def idle(self, before: str) -> List[Dict[str, Any]]:
+        """Pools last updated before the ISO timestamp ``before``."""
+        return [dict(pool) for pool in list(self.load().values()) if (pool.get('last_updated') or '') < before]
+
+    def expire(self, before: str) -> List[Dict[str, Any]]:
+        """Remove and return pools last updated before the ISO timestamp ``before``."""
+        pools = self.load()
+        expired = []
+        for key, pool in list(pools.items()):
+            if (pool.get('last_updated') or '') >= before:
+                continue
+            with self._lock_for(pool['guild_id'], pool['channel_id']):
+                # Re-checked under the stripe in case the pool was just updated
+                pool = pools.get(key)
+                if pool is None or (pool.get('last_updated') or '') >= before:
+                    continue
+                del pools[key]
+                self._removed(pool)
+                self._dirty = True
+            expired.append(dict(pool))
+        return expired
+
+    def _removed(self, pool: Dict[str, Any]):
+        """Hook for a pool dropped by ``expire()``; the caller holds its stripe."""
+
+    def flush(self) -> bool:
+        """Write the cache to disk if it changed. Returns True if written."""
+        with self._flush_lock:
+            if not self._dirty or self._pools is None:
+                return False
+            # Cleared first so changes made during the write mark it dirty again
+            self._dirty = False
+            snapshot = dict(self._pools)
+            try:
+                self.codec.save(self.path, snapshot)
+                return True
+            except OSError as e:
+                print(f"Error saving {os.path.basename(self.path)}: {e}")
+                self._dirty = True
+                return False
+
+    def transaction(self):
+        """Group writes; cache writes are already applied one by one, so a no-op."""
+        return nullcontext()
+
+    def compact(self) -> bool:
+        """Nothing to compact: every flush rewrites the whole file."""
+        return False
+
+    def close(self):
+        self.flush()
+
+class JournaledMomentumStore(JSONMomentumStore):
+    """JSON snapshot plus an append-only journal of pool changes.
+
+    Every change appends one compact line holding the pool's new values and
+    the deltas that produced it, so a write costs the same at any pool
+    count. Startup loads the snapshot and replays the journal; ``compact()``
+    folds the journal into a new snapshot. Records carry absolute values, so
+    replaying one that the snapshot already includes is harmless.
+    """
+
+    def __init__(self, path: str, stripes: int = LOCK_STRIPES, codec: Optional[Codec] = None):
+        super().__init__(path, stripes, codec)
+        self.journal_path = os.path.splitext(path)[0] + JOURNAL_SUFFIX
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        self._journal_records = 0
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return the pool cache, replaying the journal over the snapshot on first use."""
+        if self._pools is None:
+            with self._load_lock:
+                if self._pools is None:
+                    pools = self._read_snapshot()
+                    # A compaction interrupted before cleanup leaves the rotated segment behind
+                    for segment in (self.journal_path + ROTATED_SUFFIX, self.journal_path):
+                        for record in self._read_journal(segment):
+                            key = _pool_key(record['g'], record['c'])
+                            if record.get('x'):
+                                pools.pop(key, None)
+                            else:
+                                pools[key] = _record_pool(record)
+                            if segment == self.journal_path:
+                                self._journal_records += 1
+                    _trim_torn_tail(self.journal_path)
+                    self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                    self._pools = pools
+        return self._pools
+
+    @staticmethod
+    def _read_journal(path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves a torn last line; everything before it is intact
+                    continue
+
+    def _append(self, pool: Dict[str, Any], momentum_change: int, threat_change: int):
+        """Journal a pool's new state; the caller holds the pool's stripe."""
+        record = {
+            'g': pool['guild_id'], 'c': pool['channel_id'],
+            'm': pool['momentum'], 't': pool['threat'],
+            'dm': momentum_change, 'dt': threat_change, 'ts': pool['last_updated']
+        }
+        self._write_record(record)
+
+    def _removed(self, pool: Dict[str, Any]):
+        """Journal a pool's removal; the caller holds the pool's stripe."""
+        self._write_record({'g': pool['guild_id'], 'c': pool['channel_id'], 'x': 1})
+
+    def _write_record(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._journal_lock:
+            self._journal.write(line)
+            self._journal.flush()
+            self._journal_records += 1
+            self._dirty = True
+
+    def put(self, pool: Dict[str, Any]):
+        pools = self.load()
+        key = _pool_key(pool['guild_id'], pool['channel_id'])
+        with self._lock_for(pool['guild_id'], pool['channel_id']):
+            previous = pools.get(key) or {'momentum': 0, 'threat': 0}
+            pools[key] = dict(pool)
+            self._append(pool, pool['momentum'] - previous['momentum'], pool['threat'] - previous['threat'])
+
+    def add(self, guild_id: int, channel_id: int, momentum_change: int, threat_change: int,
+            timestamp: str) -> Dict[str, Any]:
+        """Apply momentum/threat deltas (floored at zero) and return the pool."""
+        pools = self.load()
+        key = _pool_key(guild_id, channel_id)
+        with self._lock_for(guild_id, channel_id):
+            previous = pools.get(key) or {'momentum': 0, 'threat': 0}
+            pool = {
+                'guild_id': guild_id, 'channel_id': channel_id,
+                'momentum': max(0, previous['momentum'] + momentum_change),
+                'threat': max(0, previous['threat'] + threat_change),
+                'last_updated': timestamp
+            }
+            pools[key] = pool
+            # Journal the applied change, which differs from the request at the floor
+            self._append(pool, pool['momentum'] - previous['momentum'], pool['threat'] - previous['threat'])
+        return dict(pool)
+
+    @property
+    def journal_records(self) -> int:
+        """Records appended since the last compaction."""
+        return self._journal_records
+
+    def flush(self) -> bool:
+        """fsync journal appends made since the last flush. Returns True if any were synced."""
+        with self._journal_lock:
+            if not self._dirty or self._journal is None:
+                return False
+            self._dirty = False
+            try:
+                os.fsync(self._journal.fileno())
+                return True
+            except OSError as e:
+                print(f"Error syncing {os.path.basename(self.journal_path)}: {e}")
+                self._dirty = True
+                return False
+
+    def compact(self) -> bool:
+        """Write a new snapshot and start an empty journal. Returns True if compacted."""
+        self.load()
+        with self._flush_lock:
+            with self._journal_lock:
+                if self._journal_records == 0:
+                    return False
+                # Rotate and snapshot together: every record in the rotated
+                # segment is already in the snapshot, later ones go to the new journal
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._journal.close()
+                rotated = self.journal_path + ROTATED_SUFFIX
+                if os.path.exists(rotated):
+                    # An earlier compaction failed; its segment must survive until a snapshot lands
+                    with open(self.journal_path, 'r', encoding='utf-8') as source, \
+                            open(rotated, 'a', encoding='utf-8') as target:
+                        target.write(source.read())
+                        target.flush()
+                        os.fsync(target.fileno())
+                    self._journal = open(self.journal_path, 'w', encoding='utf-8')
+                else:
+                    os.replace(self.journal_path, rotated)
+                    self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                self._journal_records = 0
+                self._dirty = False
+                snapshot = dict(self._pools)
+            try:
+                self.codec.save(self.path, snapshot)
+            except OSError as e:
+                # The rotated segment stays and is replayed at the next startup
+                print(f"Error saving {os.path.basename(self.path)}: {e}")
+                return False
+            os.unlink(rotated)
+            return True
+
+    def close(self):
+        """Compact, sync and close the journal."""
+        if self._journal is None:
+            return
+        self.compact()
+        self.flush()
+        with self._journal_lock:
+            self._journal.close()
+            self._journal = None
+        self._pools = None
+
+def _trim_torn_tail(path: str):
+    """Cut a partial last line so new appends start on a line of their own."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+def _record_pool(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Pool dict from a journal record."""
+    return {
+        'guild_id': record['g'], 'channel_id': record['c'],
+        'momentum': record['m'], 'threat': record['t'], 'last_updated': record['ts']
+    }
+
+class ShardedMomentumStore:
+    """One JSON file per guild under ``directory``, opened on demand.
+
+    Open shards sit in an LRU capped at ``max_open``; ``flush()`` also
+    closes shards idle for ``idle_seconds``. A guild's pools are a single
+    small file, so busy guilds never rewrite anyone else's data.
+    """
+
+    def __init__(self, directory: str, max_open: int = SHARD_CACHE_SIZE,
+                 idle_seconds: float = SHARD_IDLE_SECONDS, import_from: Optional[str] = None,
+                 codec: Optional[Codec] = None):
+        self.directory = directory
+        self.codec = codec or CODECS['json']
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self.import_from = import_from
+        # guild_id -> [store, last used, callers using it]
+        self._shards: 'OrderedDict[int, list]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = False
+        self.max_threads = STORE_THREADS
+
+    def shard_path(self, guild_id: int) -> str:
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def load(self):
+        """Create the shard directory, splitting the global JSON file into a new one."""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            fresh = not os.path.isdir(self.directory)
+            os.makedirs(self.directory, exist_ok=True)
+            if fresh and self.import_from and os.path.exists(self.import_from):
+                count = self._split(self.import_from)
+                print(f"Split {count} momentum pools from {self.import_from} into guild shards")
+            self._ready = True
+
+    def _split(self, path: str) -> int:
+        pools = load_file(path)
+        guilds: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        for key, pool in pools.items():
+            guilds.setdefault(pool['guild_id'], {})[key] = pool
+        for guild_id, guild_pools in guilds.items():
+            self.codec.save(self.shard_path(guild_id), guild_pools)
+        return len(pools)
+
+    @contextmanager
+    def _shard(self, guild_id: int) -> Iterator[JSONMomentumStore]:
+        """Use a guild's shard, opening it and evicting the least recently used if full."""
+        self.load()
+        with self._lock:
+            entry = self._shards.get(guild_id)
+            if entry is None:
+                entry = [JSONMomentumStore(self.shard_path(guild_id), codec=self.codec), 0.0, 0]
+                self._shards[guild_id] = entry
+            else:
+                self._shards.move_to_end(guild_id)
+            entry[1] = time.monotonic()
+            entry[2] += 1
+            if len(self._shards) > self.max_open:
+                self._evict(len(self._shards) - self.max_open)
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                entry[2] -= 1
+
+    def _evict(self, count: int, idle_before: Optional[float] = None) -> int:
+        """Close up to ``count`` unused shards, oldest first; the caller holds the lock."""
+        evicted = 0
+        for guild_id, (store, last_used, users) in list(self._shards.items()):
+            if evicted >= count:
+                break
+            if users or (idle_before is not None and last_used > idle_before):
+                continue
+            # Flushed under the lock so a reopen cannot read the file before the write lands
+            store.close()
+            if store.dirty:
+                continue
+            del self._shards[guild_id]
+            evicted += 1
+        return evicted
+
+    @property
+    def open_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def dirty(self) -> bool:
+        return any(entry[0].dirty for entry in list(self._shards.values()))
+
+    def get(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
+        with self._shard(guild_id) as shard:
+            return shard.get(guild_id, channel_id)
+
+    def put(self, pool: Dict[str, Any]):
+        with self._shard(pool['guild_id']) as shard:
+            shard.put(pool)
+
+    def add(self, guild_id: int, channel_id: int, momentum_change: int, threat_change: int,
+            timestamp: str) -> Dict[str, Any]:
+        with self._shard(guild_id) as shard:
+            return shard.add(guild_id, channel_id, momentum_change, threat_change, timestamp)
+
+    def guild_pools(self, guild_id: int) -> List[Dict[str, Any]]:
+        with self._shard(guild_id) as shard:
+            return shard.guild_pools(guild_id)
+
+    def _guild_ids(self) -> List[int]:
+        """Guilds with an open shard or a shard file."""
+        self.load()
+        with self._lock:
+            guild_ids = set(self._shards)
+        for name in os.listdir(self.directory):
+            guild_id, extension = os.path.splitext(name)
+            if extension == '.json' and guild_id.isdigit():
+                guild_ids.add(int(guild_id))
+        return sorted(guild_ids)
+
+    def idle(self, before: str) -> List[Dict[str, Any]]:
+        """Pools last updated before ``before`` in every shard; opens each shard in turn."""
+        pools = []
+        for guild_id in self._guild_ids():
+            with self._shard(guild_id) as shard:
+                pools.extend(shard.idle(before))
+        return pools
+
+    def expire(self, before: str) -> List[Dict[str, Any]]:
+        """Remove and return pools last updated before ``before`` from every shard.
+
+        Opens each shard in turn, so it is meant for an occasional sweep.
+        """
+        expired = []
+        for guild_id in self._guild_ids():
+            with self._shard(guild_id) as shard:
+                expired.extend(shard.expire(before))
+        return expired
+
+    def flush(self) -> bool:
+        """Write changed shards, then close shards idle too long. Returns True if any were written."""
+        with self._lock:
+            shards = [entry[0] for entry in self._shards.values()]
+        written = False
+        for shard in shards:
+            written = shard.flush() or written
+        with self._lock:
+            self._evict(len(self._shards), idle_before=time.monotonic() - self.idle_seconds)
+        return written
+
+    def transaction(self):
+        return nullcontext()
+
+    def compact(self) -> bool:
+        return False
+
+    def close(self):
+        """Flush and drop every open shard."""
+        with self._lock:
+            self._evict(len(self._shards))
+            for store, _, _ in self._shards.values():
+                store.close()
+
+class SQLiteMomentumStore:
+    """Pools in an SQLite database in WAL mode.
+
+    Every write commits on its own unless made inside ``transaction()``, so
+    there is nothing to flush. Connections come from a small pool and may be
+    used from any thread.
+    """
+
+    def __init__(self, path: str, pool_size: int = SQLITE_POOL_SIZE, import_from: Optional[str] = None):
+        self.path = path
+        # Each connection to ':memory:' would be a separate database
+        self.pool_size = 1 if path == ':memory:' else pool_size
+        self.import_from = import_from
+        self.max_threads = self.pool_size
+        self._connections: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        # Connection pinned by transaction() for the calling thread
+        self._local = threading.local()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly where needed
+        connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT / 1000,
+                                     isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode = WAL")
+        # Safe with WAL: a crash can lose the last commits but never corrupts
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, opening one if the pool is not full yet."""
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+        try:
+            connection = self._connections.get_nowait()
+        except queue.Empty:
+            with self._open_lock:
+                grow = self._opened < self.pool_size
+                if grow:
+                    self._opened += 1
+            connection = self._connect() if grow else self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    @staticmethod
+    @contextmanager
+    def _write(connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Write transaction, or join the one already open on ``connection``."""
+        if connection.in_transaction:
+            yield connection
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run every store call made by this thread inside the block as one commit."""
+        self.load()
+        if getattr(self._local, 'connection', None) is not None:
+            # Nested: the outer block commits
+            yield
+            return
+        with self._connection() as connection, self._write(connection):
+            self._local.connection = connection
+            try:
+                yield
+            finally:
+                self._local.connection = None
+
+    def load(self):
+        """Create the schema, importing the JSON file into a new database."""
+        if self._ready:
+            return
+        with self._connection() as connection:
+            connection.execute(_SCHEMA)
+            empty = connection.execute(_COUNT_POOLS).fetchone()[0] == 0
+        self._ready = True
+        if empty and self.import_from and os.path.exists(self.import_from):
+            imported = self.import_json(self.import_from)
+            print(f"Imported {imported} momentum pools from {self.import_from}")
+
+    @property
+    def dirty(self) -> bool:
+        return False
+
+    def get(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
+        self.load()
+        with self._connection() as connection:
+            row = connection.execute(_SELECT_POOL, (guild_id, channel_id)).fetchone()
+        return dict(row) if row is not None else None
+
+    def put(self, pool: Dict[str, Any]):
+        self.load()
+        with self._connection() as connection, self._write(connection):
+            connection.execute(_UPSERT_POOL, (
+                pool['guild_id'], pool['channel_id'], pool['momentum'], pool['threat'], pool['last_updated']
+            ))
+
+    def add(self, guild_id: int, channel_id: int, momentum_change: int, threat_change: int,
+            timestamp: str) -> Dict[str, Any]:
+        """Apply momentum/threat deltas (floored at zero) and return the pool."""
+        self.load()
+        # One write transaction, so concurrent updates cannot interleave
+        with self._connection() as connection, self._write(connection):
+            connection.execute(_ADD_TO_POOL, (
+                guild_id, channel_id, momentum_change, threat_change, timestamp,
+                momentum_change, threat_change
+            ))
+            row = connection.execute(_SELECT_POOL, (guild_id, channel_id)).fetchone()
+        return dict(row)
+
+    def guild_pools(self, guild_id: int) -> List[Dict[str, Any]]:
+        self.load()
+        with self._connection() as connection:
+            rows = connection.execute(_SELECT_GUILD, (guild_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def idle(self, before: str) -> List[Dict[str, Any]]:
+        """Pools last updated before the ISO timestamp ``before``."""
+        self.load()
+        with self._connection() as connection:
+            rows = connection.execute(_SELECT_IDLE, (before,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def expire(self, before: str) -> List[Dict[str, Any]]:
+        """Remove and return pools last updated before the ISO timestamp ``before``."""
+        self.load()
+        with self._connection() as connection, self._write(connection):
+            rows = connection.execute(_SELECT_IDLE, (before,)).fetchall()
+            connection.execute(_DELETE_IDLE, (before,))
+        return [dict(row) for row in rows]
+
+    def import_json(self, path: str) -> int:
+        """Copy pools from a momentum JSON file; existing rows are kept. Returns rows added."""
+        self.load()
+        pools = load_file(path)
+        rows = [
+            (pool['guild_id'], pool['channel_id'], pool.get('momentum', 0),
+             pool.get('threat', 0), pool.get('last_updated') or '')
+            for pool in pools.values()
+        ]
+        with self._connection() as connection:
+            before = connection.total_changes
+            with self._write(connection):
+                connection.executemany(_IMPORT_POOL, rows)
+            return connection.total_changes - before
+
+    def flush(self) -> bool:
+        return False
+
+    def compact(self) -> bool:
+        """Checkpoint the WAL into the database file and truncate it."""
+        self.load()
+        with self._connection() as connection:
+            busy, _, _ = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return not busy
+
+    def close(self):
+        """Close every pooled connection."""
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
+
+def sqlite_path(database_url: str) -> Optional[str]:
+    """Database path of a ``sqlite:///`` URL, or None for other schemes."""
+    prefix = 'sqlite:///'
+    if not database_url.startswith(prefix):
+        return None
+    path = database_url[len(prefix):]
+    return path or ':memory:'
+
+def _file_store(json_path: str, mode: str, codec: Optional[Codec]):
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode '{mode}'. Use: {', '.join(STORAGE_MODES)}")
+    if mode == 'journal':
+        return JournaledMomentumStore(json_path, codec=codec)
+    if mode == 'sharded':
+        return ShardedMomentumStore(os.path.join(os.path.dirname(json_path), SHARD_DIR),
+                                    import_from=json_path, codec=codec)
+    return JSONMomentumStore(json_path, codec=codec)
+
+def open_momentum_store(database_url: Optional[str], data_dir: str, mode: str = 'file',
+                        codec: Optional[Codec] = None):
+    """Store for ``database_url``; files under ``data_dir`` in layout ``mode`` when no URL is given.
+
+    A new SQLite database or shard directory is seeded from the JSON file on
+    first use.
+    """
+    json_path = os.path.join(data_dir, MOMENTUM_POOLS_FILE)
+    if not database_url:
+        return _file_store(json_path, mode, codec)
+    path = sqlite_path(database_url)
+    if path is None:
+        scheme = database_url.split(':', 1)[0]
+        print(f"Unsupported DATABASE_URL scheme '{scheme}', using JSON files")
+        return _file_store(json_path, mode, codec)
+    return SQLiteMomentumStore(path, import_from=json_path)
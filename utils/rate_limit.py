@@ -0,0 +1,33 @@
+"""Rate limiting of outgoing requests, counted while they are in flight."""
+
+import asyncio
+import time
+
+from asyncio_throttle import Throttler
+
+class RateLimiter(Throttler):
+    """At most ``rate_limit`` requests per ``period`` seconds, as the server sees them.
+
+    Used as ``async with limiter:`` around one request. ``Throttler`` logs a
+    request when it is let through, so requests that then queue for a
+    pooled connection can reach the server in a burst. Here a request
+    counts against the limit while in flight and is logged when it
+    finishes, so every request the server sees within any ``period`` held
+    its own slot.
+    """
+
+    def __init__(self, rate_limit: int, period: float = 1.0, retry_interval: float = 0.01):
+        super().__init__(rate_limit, period, retry_interval)
+        self.in_flight = 0
+
+    async def acquire(self):
+        while True:
+            self.flush()
+            if len(self._task_logs) + self.in_flight < self.rate_limit:
+                break
+            await asyncio.sleep(self.retry_interval)
+        self.in_flight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._task_logs.append(time.monotonic())
@@ -0,0 +1,34 @@
+"""Coalescing of concurrent identical async calls."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving meanwhile share its result.
+
+    The shared call is shielded, so a caller that is cancelled (an expired
+    interaction, say) does not cancel it for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        # Counters for logs and benchmarks
+        self.calls = 0
+        self.executions = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await ``func()``, or the call already running for ``key``."""
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            self.executions += 1
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
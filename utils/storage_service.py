@@ -0,0 +1,161 @@
+"""Bot-wide storage service with a single group-committing writer."""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.database import AsyncDataManager, MomentumPool
+
+# Queue entry that tells the writer to finish
+_STOP = object()
+
+class StorageService(AsyncDataManager):
+    """The one data manager shared by every cog.
+
+    Reads go straight to the store. Writes are queued for a single writer
+    task, which applies whatever has queued up as one store transaction,
+    answers each caller as soon as its change is applied, and commits
+    (flushes) at most once per ``commit_interval``. It also compacts every
+    ``compact_interval`` and, when ``archive_after_days`` is set, archives
+    pools idle that long every ``archive_interval``, so no other task writes
+    to the data directory.
+    """
+
+    def __init__(self, data_dir: str = 'data', database_url: Optional[str] = None,
+                 storage_mode: str = 'file', codec: str = 'json', commit_interval: float = 5.0,
+                 compact_interval: float = 300.0, archive_after_days: float = 0,
+                 archive_interval: float = 3600.0):
+        super().__init__(data_dir, database_url, storage_mode, codec)
+        self.commit_interval = commit_interval
+        self.compact_interval = compact_interval
+        self.archive_after_days = archive_after_days
+        self.archive_interval = archive_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        # Counters for logs and benchmarks
+        self.mutations = 0
+        self.groups = 0
+        self.commits = 0
+        self.archived = 0
+
+    async def start(self):
+        """Open the store and start the writer task."""
+        await self.load_momentum_pools()
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop(), name='storage-writer')
+
+    async def close(self):
+        """Drain queued writes, commit them and close the store."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            await self._queue.put(_STOP)
+            await self._writer
+            self._writer = None
+        await super().close()
+
+    async def _submit(self, method: str, *args, **kwargs) -> Any:
+        """Queue a DataManager write and wait until it is applied."""
+        if self._writer is None:
+            raise RuntimeError("StorageService is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((method, args, kwargs, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        last_commit = last_compact = loop.time()
+        # Sweep once at startup, then every archive_interval
+        last_archive = last_commit - self.archive_interval
+        stopping = False
+        while not stopping:
+            deadline = min(last_commit + self.commit_interval, last_compact + self.compact_interval)
+            if self.archive_after_days > 0:
+                deadline = min(deadline, last_archive + self.archive_interval)
+            batch: List[Tuple[str, tuple, dict, asyncio.Future]] = []
+            try:
+                entry = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                # Everything that queued up behind the first write joins its group
+                while True:
+                    if entry is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(entry)
+                    entry = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                pass
+
+            if batch:
+                await self._apply(batch)
+
+            now = loop.time()
+            if stopping or now - last_commit >= self.commit_interval:
+                last_commit = now
+                try:
+                    if await self.flush():
+                        self.commits += 1
+                except Exception as e:
+                    print(f"Error committing storage writes: {e}")
+            if not stopping and now - last_compact >= self.compact_interval:
+                last_compact = now
+                try:
+                    await self.compact()
+                except Exception as e:
+                    print(f"Error compacting storage: {e}")
+            if not stopping and self.archive_after_days > 0 and now - last_archive >= self.archive_interval:
+                last_archive = now
+                await self._archive()
+
+    async def _archive(self):
+        try:
+            archived = await self._run(self.sync.archive_idle_pools, self.archive_after_days)
+        except Exception as e:
+            print(f"Error archiving idle momentum pools: {e}")
+            return
+        self.archived += archived
+        if archived:
+            print(f"Archived {archived} momentum pools idle for over {self.archive_after_days:g} days")
+
+    async def _apply(self, batch: List[Tuple[str, tuple, dict, asyncio.Future]]):
+        mutations = [(method, args, kwargs) for method, args, kwargs, _ in batch]
+        try:
+            results = await self._run(self.sync.apply_mutations, mutations)
+        except Exception as e:
+            # The whole group was rolled back
+            results = [e] * len(batch)
+        self.mutations += len(batch)
+        self.groups += 1
+        for (_, _, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def archive_idle_pools(self, max_age_days: float) -> int:
+        return await self._submit('archive_idle_pools', max_age_days)
+
+    async def save_momentum_pool(self, pool: MomentumPool):
+        await self._submit('save_momentum_pool', pool)
+
+    async def update_momentum(self, guild_id: int, channel_id: int, momentum_change: int = 0,
+                              threat_change: int = 0, user_id: int = 0) -> MomentumPool:
+        return await self._submit('update_momentum', guild_id, channel_id, momentum_change=momentum_change,
+                                  threat_change=threat_change, user_id=user_id)
+
+    async def reset_momentum_pool(self, guild_id: int, channel_id: int, user_id: int = 0) -> MomentumPool:
+        return await self._submit('reset_momentum_pool', guild_id, channel_id, user_id=user_id)
+
+    async def save_extralife_cache(self, data: Dict[str, Any], validators: Optional[Dict[str, Dict[str, Any]]] = None):
+        await self._submit('save_extralife_cache', data, validators)
+
+    async def forget_extralife_cache(self, endpoints: Sequence[str]):
+        await self._submit('forget_extralife_cache', endpoints)
+
+    async def save_extralife_registration(self, guild_id: int, registration: Optional[Dict[str, Any]]):
+        await self._submit('save_extralife_registration', guild_id, registration)
+
+    async def save_donation_cursor(self, endpoint: str, cursor: Dict[str, Any]):
+        await self._submit('save_donation_cursor', endpoint, cursor)